@@ -1,15 +1,33 @@
 import time
 import random
-from rpi_ws281x import Color
+from array import array
+from rpi_ws281x import Color, pack_rgbw, mirror_mapping, reverse_mapping
 import colorsys
 import math
 import time
+from ledEngine import Engine, FrameClock, show_strips, sleep
 
 def fill_color(strip, color):
     """Set all pixels on the strip to the given (r, g, b, w) color tuple."""
-    for i in range(strip.numPixels()):
-        strip[i] = Color(*color)
-    strip.show()
+    strip.fill_and_show(color)
+
+def fade_out(*strips, duration=2.0, curve="sine", fps=60):
+    """Fade the strips to black over duration seconds by ramping their
+    brightness, without rewriting any pixels, then clear them and restore
+    their brightness.
+    """
+    strips = [strip for strip in strips if strip]
+    levels = [strip.getBrightness() for strip in strips]
+    for strip in strips:
+        strip.ramp_brightness(0, duration, curve)
+    for t in FrameClock(fps):
+        if not any(strip.ramping for strip in strips):
+            break
+        show_strips(*strips)
+    for strip, level in zip(strips, levels):
+        strip.clear()
+        strip.setBrightness(level)
+    show_strips(*strips)
 
 import time
 import math
@@ -26,13 +44,10 @@ def sinister_pulse(strip1, strip2, duration: float = 20.0, fps: int = 30):
     :param fps: Frames per second
     """
     num_leds = strip1.numPixels()
-    start_time = time.time()
-    frame_delay = 1.0 / fps
-    phase = 0.0
     eye_active = False
     eye_position = 0
     eye_direction = 1
-    next_eye_time = time.time() + random.uniform(3.0, 8.0)
+    next_eye_time = random.uniform(3.0, 8.0)
 
     def pulse_color(intensity):
         # Base red/purple tone with low intensity
@@ -42,42 +57,44 @@ def sinister_pulse(strip1, strip2, duration: float = 20.0, fps: int = 30):
         w = 0
         return Color(r, g, b, w)
 
-    while time.time() - start_time < duration:
-        frame_start = time.perf_counter()
-
-        # Breathing effect using sine wave
-        intensity = (1 + math.sin(phase)) / 2  # Range [0, 1]
-        base_color = pulse_color(intensity)
-
-        for i in range(num_leds):
-            strip1.setPixelColor(i, base_color)
-            strip2.setPixelColor(i, base_color)
-
-        # Occasionally scan an "eye" of bright red
-        if eye_active:
-            eye_col = Color(255, 0, 0, 50)
-            if 0 <= eye_position < num_leds:
-                strip1.setPixelColor(eye_position, eye_col)
-                strip2.setPixelColor(eye_position, eye_col)
-            eye_position += eye_direction
-            if eye_position >= num_leds or eye_position < 0:
-                eye_active = False
-                next_eye_time = time.time() + random.uniform(3.0, 8.0)
-        elif time.time() >= next_eye_time:
-            eye_active = True
-            eye_position = 0 if random.random() < 0.5 else num_leds - 1
-            eye_direction = 1 if eye_position == 0 else -1
-
-        strip1.show()
-        strip2.show()
-
-        phase += 0.1
-
-        # Maintain consistent FPS
-        elapsed = time.perf_counter() - frame_start
-        sleep_time = frame_delay - elapsed
-        if sleep_time > 0:
-            time.sleep(sleep_time)
+    # The breathing is a brightness ramp on each strip between the levels
+    # the sine wave used to give, so only the eye changes the pixels
+    base_color = pulse_color(1.0)
+    strips = (strip1, strip2)
+    original = [strip.getBrightness() for strip in strips]
+    half_period = math.pi / (0.1 * fps)
+    rising = False
+
+    try:
+        for t in FrameClock(fps, duration):
+            # Breathing effect, half a sine wave at a time
+            if not strip1.ramping:
+                for strip, level in zip(strips, original):
+                    strip.ramp_brightness(level if rising else level * 40 // 140, half_period, "sine")
+                rising = not rising
+
+            strip1.fill(base_color)
+            strip2.fill(base_color)
+
+            # Occasionally scan an "eye" of bright red
+            if eye_active:
+                eye_col = Color(255, 0, 0, 50)
+                if 0 <= eye_position < num_leds:
+                    strip1.setPixelColor(eye_position, eye_col)
+                    strip2.setPixelColor(eye_position, eye_col)
+                eye_position += eye_direction
+                if eye_position >= num_leds or eye_position < 0:
+                    eye_active = False
+                    next_eye_time = t + random.uniform(3.0, 8.0)
+            elif t >= next_eye_time:
+                eye_active = True
+                eye_position = 0 if random.random() < 0.5 else num_leds - 1
+                eye_direction = 1 if eye_position == 0 else -1
+
+            show_strips(strip1, strip2)
+    finally:
+        for strip, level in zip(strips, original):
+            strip.setBrightness(level)
 
 def morse_band_scroll(strip1, strip2, text, duration=10, direction=1, fps=30):
     """
@@ -131,8 +148,6 @@ def morse_band_scroll(strip1, strip2, text, duration=10, direction=1, fps=30):
 
     num_pixels = strip1.numPixels()
     band_width = 10
-    frame_delay = 1.0 / fps
-    start_time = time.time()
 
     # Pad pattern and duplicate for scrolling
     scroll_pattern = ['off'] * num_pixels + morse_pattern + ['off'] * num_pixels
@@ -140,35 +155,34 @@ def morse_band_scroll(strip1, strip2, text, duration=10, direction=1, fps=30):
         scroll_pattern = list(reversed(scroll_pattern))
     pattern_len = len(scroll_pattern)
 
-    offset = 0
-    while time.time() - start_time < duration:
-        frame_start = time.perf_counter()
-
-        # Determine center of band
-        band_center = offset % (pattern_len + num_pixels)
-        for i in range(num_pixels):
-            pos = i if direction > 0 else num_pixels - 1 - i
-            pattern_index = (band_center - band_width // 2 + i) % pattern_len
+    # Draw left to right and let the strips reverse it when rendering
+    for strip in (strip1, strip2):
+        strip.set_mapping(reverse_mapping(strip.numPixels()) if direction < 0 else None)
 
-            symbol = scroll_pattern[pattern_index] if 0 <= pattern_index < pattern_len else 'off'
-            color = COLORS.get(symbol, COLORS['bg'])
+    offset = 0
+    try:
+        for t in FrameClock(fps, duration):
+            # Determine center of band
+            band_center = offset % (pattern_len + num_pixels)
+            for i in range(num_pixels):
+                pattern_index = (band_center - band_width // 2 + i) % pattern_len
 
-            # Add a white flashing edge
-            if i == (num_pixels - band_width) // 2 or i == (num_pixels + band_width) // 2:
-                color = COLORS['flash']
+                symbol = scroll_pattern[pattern_index] if 0 <= pattern_index < pattern_len else 'off'
+                color = COLORS.get(symbol, COLORS['bg'])
 
-            strip1.setPixelColor(pos, Color(*color))
-            strip2.setPixelColor(pos, Color(*color))
+                # Add a white flashing edge
+                if i == (num_pixels - band_width) // 2 or i == (num_pixels + band_width) // 2:
+                    color = COLORS['flash']
 
-        strip1.show()
-        strip2.show()
+                strip1.setPixelColor(i, Color(*color))
+                strip2.setPixelColor(i, Color(*color))
 
-        offset = (offset + 1) % pattern_len
+            show_strips(strip1, strip2)
 
-        frame_elapsed = time.perf_counter() - frame_start
-        sleep_time = frame_delay - frame_elapsed
-        if sleep_time > 0:
-            time.sleep(sleep_time)
+            offset = (offset + 1) % pattern_len
+    finally:
+        strip1.set_mapping(None)
+        strip2.set_mapping(None)
 
 def ce3k_signal(strip1, strip2, note_delay=0.8):
     import time
@@ -184,19 +198,17 @@ def ce3k_signal(strip1, strip2, note_delay=0.8):
         blackout(strip1)
         blackout(strip2)
 
-        for i in range(note["start"], note["end"]):
-            strip1.setPixelColor(i, Color(*note["color"]))
-            strip2.setPixelColor(i, Color(*note["color"]))
+        strip1[note["start"]:note["end"]] = Color(*note["color"])
+        strip2[note["start"]:note["end"]] = Color(*note["color"])
         
-        strip1.show()
-        strip2.show()
-        time.sleep(note_delay)
+        show_strips(strip1, strip2)
+        sleep(note_delay)
 
     # End with blackout
     blackout(strip1)
     blackout(strip2)
 
-def mirror_bounce(stripA, stripB=None, color=(0, 0, 255, 0), duration=10):
+def mirror_bounce(stripA, stripB=None, color=(0, 0, 255, 0), duration=10, fps=40):
     """
     Mirror bounce effect: pulses move from ends to center and back.
 
@@ -204,7 +216,7 @@ def mirror_bounce(stripA, stripB=None, color=(0, 0, 255, 0), duration=10):
     :param stripB: Optional second strip
     :param color: RGB tuple for pulse color
     :param duration: Duration in seconds
-    :param speed: Delay between frames in seconds
+    :param fps: Frames per second
     """
     num_pixels = stripA.numPixels()
     if stripB:
@@ -212,49 +224,44 @@ def mirror_bounce(stripA, stripB=None, color=(0, 0, 255, 0), duration=10):
 
     midpoint = num_pixels // 2
     total_steps = midpoint + 1
-    start_time = time.time()
 
     direction = 1  # 1 for inward, -1 for outward
     step = 0
 
-    while time.time() - start_time < duration:
-        # Clear strips
-        for i in range(num_pixels):
-            stripA.setPixelColor(i, Color(0, 0, 0, 0))
-            if stripB:
-                stripB.setPixelColor(i, Color(0, 0, 0, 0))
-
-        # Draw pulses on both sides
-        if direction == 1:
-            # Moving inward: light from edges towards center
-            if step <= midpoint:
-                # Light pixels from both ends up to current step
-                for i in range(step + 1):
-                    stripA.setPixelColor(i, Color(*color))
-                    stripA.setPixelColor(num_pixels - 1 - i, Color(*color))
-                    if stripB:
-                        stripB.setPixelColor(i, Color(*color))
-                        stripB.setPixelColor(num_pixels - 1 - i, Color(*color))
-        else:
-            # Moving outward: light pulses from center back to ends
-            if step <= midpoint:
-                for i in range(step, midpoint + 1):
-                    stripA.setPixelColor(i, Color(*color, 0))
-                    stripA.setPixelColor(num_pixels - 1 - i, Color(*color))
-                    if stripB:
-                        stripB.setPixelColor(i, Color(*color, 0))
-                        stripB.setPixelColor(num_pixels - 1 - i, Color(*color))
-
-        stripA.show()
-        if stripB:
-            stripB.show()
+    # Only the first half is drawn; the strips mirror it onto the second
+    # half when rendering
+    strips = [strip for strip in (stripA, stripB) if strip]
+    for strip in strips:
+        strip.set_mapping(mirror_mapping(strip.numPixels()))
+
+    try:
+        for t in FrameClock(fps, duration):
+            # Clear strips
+            for strip in strips:
+                strip[:num_pixels] = Color(0, 0, 0, 0)
+
+            # Draw pulses on both sides
+            if direction == 1:
+                # Moving inward: light from edges towards center
+                if step <= midpoint:
+                    # Light pixels from both ends up to current step
+                    for strip in strips:
+                        strip[:step + 1] = Color(*color)
+            else:
+                # Moving outward: light pulses from center back to ends
+                if step <= midpoint:
+                    for strip in strips:
+                        strip[step:midpoint + 1] = Color(*color)
 
-        step += 1
-        if step > total_steps:
-            step = 0
-            direction *= -1  # Reverse direction
+            show_strips(*strips)
 
-        #time.sleep(speed)
+            step += 1
+            if step > total_steps:
+                step = 0
+                direction *= -1  # Reverse direction
+    finally:
+        for strip in strips:
+            strip.set_mapping(None)
 
 def fireflies(stripA, stripB=None, duration=30, max_fireflies=20, frame_rate=30):
     """
@@ -266,16 +273,10 @@ def fireflies(stripA, stripB=None, duration=30, max_fireflies=20, frame_rate=30)
     :param max_fireflies: Max number of simultaneous fireflies
     :param frame_rate: Frames per second
     """
-    
-    start_time = time.time()
-    
     num_pixels = stripA.numPixels()
     if stripB:
         num_pixels = min(num_pixels, stripB.numPixels())
 
-    frame_delay = 1.0 / frame_rate
-    total_frames = int(duration * frame_rate)
-
     # Firefly state: each firefly is (pixel_index, brightness, fading_in)
     fireflies = []
 
@@ -285,8 +286,7 @@ def fireflies(stripA, stripB=None, duration=30, max_fireflies=20, frame_rate=30)
         scaled_color = tuple(int(c * brightness) for c in base_color)
         return scaled_color
 
-    while time.time() - start_time < duration:
-        # start = time.perf_counter()
+    for t in FrameClock(frame_rate, duration):
         # Occasionally spawn a new firefly if under max count
         if len(fireflies) < max_fireflies and random.random() < 0.1:
             new_pixel = random.randint(0, num_pixels - 1)
@@ -295,10 +295,9 @@ def fireflies(stripA, stripB=None, duration=30, max_fireflies=20, frame_rate=30)
                 fireflies.append([new_pixel, 0.0, True])  # start faded out, fading in
 
         # Clear strip to black before drawing
-        for i in range(num_pixels):
-            stripA.setPixelColor(i, Color(0, 0, 0, 0))
-            if stripB:
-                stripB.setPixelColor(i, Color(0, 0, 0, 0))
+        stripA[:num_pixels] = Color(0, 0, 0, 0)
+        if stripB:
+            stripB[:num_pixels] = Color(0, 0, 0, 0)
 
         # Update fireflies brightness
         to_remove = []
@@ -317,22 +316,15 @@ def fireflies(stripA, stripB=None, duration=30, max_fireflies=20, frame_rate=30)
 
             # Set pixel color based on brightness
             color = set_pixel_brightness(pixel, brightness)
-            stripA.setPixelColor(pixel, Color(*color, 0))
+            stripA.set_pixel(pixel, color)
             if stripB:
-                stripB.setPixelColor(pixel, Color(*color, 0))
+                stripB.set_pixel(pixel, color)
 
         # Remove fully faded fireflies
         for index in reversed(to_remove):
             fireflies.pop(index)
 
-        stripA.show()
-        if stripB:
-            stripB.show()
-
-        #end = time.perf_counter()
-        #print(f"Function took {end - start:.6f} seconds")
-
-        time.sleep(frame_delay)
+        show_strips(stripA, stripB)
 
 
 def rainbow_with_sparkles(stripA, stripB=None, duration=10, sparkle_chance=0.05, frame_rate=30):
@@ -360,16 +352,12 @@ def rainbow_with_sparkles(stripA, stripB=None, duration=10, sparkle_chance=0.05,
     if stripB:
         num_pixels = min(num_pixels, stripB.numPixels())
 
-    total_frames = int(duration * frame_rate)
-    frame_delay = 1.0 / frame_rate
     color_offset = 0
 
     # Initialize sparkle fade trackers
     sparkle_fade = [0] * num_pixels
 
-    start_time = time.time()
-
-    while time.time() - start_time < duration:
+    for t in FrameClock(frame_rate, duration):
         for i in range(num_pixels):
             # Sparkle logic
             if sparkle_fade[i] > 0:
@@ -390,12 +378,9 @@ def rainbow_with_sparkles(stripA, stripB=None, duration=10, sparkle_chance=0.05,
             if stripB:
                 stripB.setPixelColor(i, Color(*color, 0))
 
-        stripA.show()
-        if stripB:
-            stripB.show()
+        show_strips(stripA, stripB)
 
         color_offset = (color_offset + 1) % 256
-        #time.sleep(frame_delay)
 
 
 
@@ -409,22 +394,14 @@ def timer_effect(stripA, stripB=None, duration=10, reverse=False, frame_rate=30)
     :param reverse: If True, counts down from duration to 0
     :param frame_rate: Frames per second for smooth animation
     """
-    start_time = time.time()
     num_pixels = stripA.numPixels()
     if stripB:
         num_pixels = min(num_pixels, stripB.numPixels())
 
-    frame_delay = 1.0 / frame_rate
     last_flash_time = 0
     flash_state = True
 
-    while True:
-        frame_start = time.time()
-
-        elapsed = frame_start - start_time
-        if elapsed >= duration:
-            break
-
+    for elapsed in FrameClock(frame_rate, duration):
         progress = elapsed / duration
         active_pixels = int(progress * num_pixels)
         if reverse:
@@ -432,9 +409,9 @@ def timer_effect(stripA, stripB=None, duration=10, reverse=False, frame_rate=30)
 
         # Flash logic (toggle every 0.5s in last 5 seconds)
         if elapsed >= duration - 5:
-            if frame_start - last_flash_time >= 0.5:
+            if elapsed - last_flash_time >= 0.5:
                 flash_state = not flash_state
-                last_flash_time = frame_start
+                last_flash_time = elapsed
         else:
             flash_state = True
 
@@ -465,17 +442,7 @@ def timer_effect(stripA, stripB=None, duration=10, reverse=False, frame_rate=30)
             if stripB:
                 stripB.setPixelColor(i, Color(*pixel_color))
 
-        stripA.show()
-        if stripB:
-            stripB.show()
-
-        # Maintain consistent frame rate
-        frame_end = time.time()
-        elapsed_frame_time = frame_end - frame_start
-        sleep_time = frame_delay - elapsed_frame_time
-        if sleep_time > 0:
-            print(f"Sleeping for {sleep_time:.3f} seconds to maintain frame rate")
-            time.sleep(sleep_time)
+        show_strips(stripA, stripB)
 
 
 
@@ -497,8 +464,6 @@ def fire_effect(stripA, stripB, duration=10.0, cooling=55, sparking=120, frame_r
     num_pixels = min(stripA.numPixels(), stripB.numPixels())
     heatA = [0] * num_pixels
     heatB = [0] * num_pixels
-    frame_delay = 1.0 / frame_rate
-    start_time = time.time()
 
     def heat_to_color(heat):
         """Convert heat value (0–255) to flame color."""
@@ -531,20 +496,11 @@ def fire_effect(stripA, stripB, duration=10.0, cooling=55, sparking=120, frame_r
         for j in range(num_pixels):
             color = heat_to_color(heat[j])
             strip.setPixelColor(j, Color(*color))
-        strip.show()
-
-    while (time.time() - start_time) < duration:
-        frame_start = time.time()
 
+    for t in FrameClock(frame_rate, duration):
         update_fire(heatA, stripA)
         update_fire(heatB, stripB)
-
-        frame_end = time.time()
-        elapsed = frame_end - frame_start
-        sleep_time = frame_delay - elapsed
-        if sleep_time > 0:
-            print(f"Sleeping for {sleep_time:.3f} seconds to maintain frame rate")
-            time.sleep(sleep_time)
+        show_strips(stripA, stripB)
 
 
 def union_jack_scroll_sparkle(stripA, stripB, duration=10.0, frame_rate=20, sparkle_chance=0.1, fade_steps=8):
@@ -559,8 +515,6 @@ def union_jack_scroll_sparkle(stripA, stripB, duration=10.0, frame_rate=20, spar
     :param fade_steps: How long sparkles fade (in frames).
     """
     num_pixels = min(stripA.numPixels(), stripB.numPixels())
-    frame_delay = 1.0 / frame_rate
-    start_time = time.time()
 
     # Color definitions
     RED   = (255, 0, 0, 0)
@@ -599,30 +553,21 @@ def union_jack_scroll_sparkle(stripA, stripB, duration=10.0, frame_rate=20, spar
             if step + 1 < fade_steps:
                 next_sparkles.append([idx, col, step + 1])
 
-        strip.show()
         return next_sparkles
 
     frame = 0
-    while time.time() - start_time < duration:
-        frame_start = time.time()
-
+    for t in FrameClock(frame_rate, duration):
         sparklesA = update_strip(stripA, frame, sparklesA)
         sparklesB = update_strip(stripB, frame, sparklesB)
+        show_strips(stripA, stripB)
 
         frame += 1
-        elapsed = time.time() - frame_start
-        sleep_time = frame_delay - elapsed
-        if sleep_time > 0:
-            print(f"Sleeping for {sleep_time:.3f} seconds to maintain frame rate")
-            time.sleep(sleep_time)
 
 
 def matrix_effect(stripA, stripB, duration=10.0, frame_rate=30, min_trail=8, max_trail=20, reverse=False):
 
     rand1 = 20
     rand2 = 30
-    frame_time = 1.0 / frame_rate
-    start_time = time.perf_counter()
     num_pixels = min(stripA.numPixels(), stripB.numPixels())
 
     dropsA = []
@@ -634,18 +579,13 @@ def matrix_effect(stripA, stripB, duration=10.0, frame_rate=30, min_trail=8, max
 
     # Color phase timing variables
     color_phase = 'green'  # start phase
-    next_phase_time = start_time + random.uniform(rand1, rand2)  # initial random duration
-
-    while True:
-        frame_start = time.perf_counter()
-        elapsed = frame_start - start_time
-        if elapsed >= duration:
-            break
+    next_phase_time = random.uniform(rand1, rand2)  # initial random duration
 
+    for t in FrameClock(frame_rate, duration):
         # Switch color phase if time elapsed
-        if frame_start >= next_phase_time:
+        if t >= next_phase_time:
             color_phase = 'blue' if color_phase == 'green' else 'green'
-            next_phase_time = frame_start + random.uniform(rand1, rand2)
+            next_phase_time = t + random.uniform(rand1, rand2)
 
         # Possibly add new drops to each strip
         if random.random() < 0.3:
@@ -660,9 +600,8 @@ def matrix_effect(stripA, stripB, duration=10.0, frame_rate=30, min_trail=8, max
             })
 
         # Clear background to very dark green
-        for i in range(num_pixels):
-            stripA.setPixelColor(i, Color(0, 8, 0, 0))  # Very dark green background
-            stripB.setPixelColor(i, Color(0, 8, 0, 0))
+        stripA[:num_pixels] = Color(0, 8, 0, 0)  # Very dark green background
+        stripB[:num_pixels] = Color(0, 8, 0, 0)
 
         def update_drops(drops, strip):
             new_drops = []
@@ -703,13 +642,7 @@ def matrix_effect(stripA, stripB, duration=10.0, frame_rate=30, min_trail=8, max
         dropsA = update_drops(dropsA, stripA)
         dropsB = update_drops(dropsB, stripB)
 
-        stripA.show()
-        stripB.show()
-
-        # Maintain frame rate accounting for processing time
-        time_to_sleep = frame_time - (time.perf_counter() - frame_start)
-        if time_to_sleep > 0:
-            time.sleep(time_to_sleep)
+        show_strips(stripA, stripB)
 
 
 
@@ -732,7 +665,6 @@ def sparkle_dual_fade(stripA, stripB,
     import time
 
     num_pixels = min(stripA.numPixels(), stripB.numPixels())
-    total_frames = int(duration / frame_delay)
 
     # Active sparkles: list of (pixel index, [r, g, b, w], fade_step)
     activeA, activeB = [], []
@@ -755,12 +687,11 @@ def sparkle_dual_fade(stripA, stripB,
         strip.show()
         return remaining
 
-    for _ in range(total_frames):
+    for t in FrameClock(1.0 / frame_delay, duration):
         add_sparkles(activeA)
         add_sparkles(activeB)
         activeA = fade_and_draw(stripA, activeA)
         activeB = fade_and_draw(stripB, activeB)
-        time.sleep(frame_delay)
 
 
 def sparkle_dual_fade(stripA, stripB, 
@@ -785,22 +716,16 @@ def sparkle_dual_fade(stripA, stripB,
     def scale_color(color, scale):
         """Scale RGBW tuple by scale (0.0 to 1.0)."""
         return tuple(int(c * scale) for c in color)
-    
-    frame_time = 1.0 / frame_rate
-    start_time = time.perf_counter()
+
     num_pixels = min(stripA.numPixels(), stripB.numPixels())
 
     sparklesA = []  # list of [index, age]
     sparklesB = []
 
-    while True:
-        frame_start = time.perf_counter()
-        if frame_start - start_time >= duration:
-            break
-
+    for t in FrameClock(frame_rate, duration):
         # Clear background first
-        fill_color(stripA, background)
-        fill_color(stripB, background)
+        stripA.fill(background)
+        stripB.fill(background)
 
         # Add new sparkles randomly on strip A
         for _ in range(sparkles_per_frame):
@@ -833,14 +758,7 @@ def sparkle_dual_fade(stripA, stripB,
         sparklesA = new_sparklesA
         sparklesB = new_sparklesB
 
-        stripA.show()
-        stripB.show()
-
-        # Maintain consistent frame rate
-        elapsed = time.perf_counter() - frame_start
-        sleep_time = frame_time - elapsed
-        if sleep_time > 0:
-            time.sleep(sleep_time)
+        show_strips(stripA, stripB)
 
 def alternate_flash_varied_colors(stripA, stripB, colors=None, off=(0, 0, 0, 0), flashes=10, delay=0.5):
     """
@@ -864,31 +782,21 @@ def alternate_flash_varied_colors(stripA, stripB, colors=None, off=(0, 0, 0, 0),
             (255, 255, 255, 0), # White (all RGB channels)
         ]
 
+    # Every swap is shown, however late
+    clock = FrameClock(1.0 / delay, policy="catch_up")
     for i in range(flashes):
-        cycle_start = time.perf_counter()
         color = colors[i % len(colors)]
 
-        fill_color(stripA, color)
-        fill_color(stripB, off)
-        stripA.show()
-        stripB.show()
-
-        # Wait remaining time considering processing
-        elapsed = time.perf_counter() - cycle_start
-        to_sleep = delay - elapsed
-        if to_sleep > 0:
-            time.sleep(to_sleep)
+        clock.tick()
+        stripA.fill(color)
+        stripB.fill(off)
+        show_strips(stripA, stripB)
 
-        cycle_start = time.perf_counter()
-        fill_color(stripA, off)
-        fill_color(stripB, color)
-        stripA.show()
-        stripB.show()
-
-        elapsed = time.perf_counter() - cycle_start
-        to_sleep = delay - elapsed
-        if to_sleep > 0:
-            time.sleep(to_sleep)
+        clock.tick()
+        stripA.fill(off)
+        stripB.fill(color)
+        show_strips(stripA, stripB)
+    clock.tick()
 
 
 def move_band(strip1, strip2,
@@ -927,12 +835,14 @@ def move_band(strip1, strip2,
         pos = start_pos + i * dir
         strip1.setPixelColor(pos, Color(*foreground_colour))
         strip2.setPixelColor(pos, Color(*foreground_colour))
-    strip1.show()
-    strip2.show()
+    show_strips(strip1, strip2)
 
+    # The band moves a pixel a frame, so frames running late are caught up
+    # rather than skipped
     pos = start_pos
-    while pos != end_pos + step:
-        frame_start = time.perf_counter()
+    for t in FrameClock(1.0 / speed, policy="catch_up"):
+        if pos == end_pos + step:
+            break
 
         trailing_pixel = pos - dir
         if 0 <= trailing_pixel < num_pixels:
@@ -944,17 +854,10 @@ def move_band(strip1, strip2,
             strip1.setPixelColor(leading_pixel, Color(*foreground_colour))
             strip2.setPixelColor(leading_pixel, Color(*foreground_colour))
 
-        strip1.show()
-        strip2.show()
+        show_strips(strip1, strip2)
 
         pos += step
 
-        frame_end = time.perf_counter()
-        elapsed = frame_end - frame_start
-        sleep_time = speed - elapsed
-        if sleep_time > 0:
-            time.sleep(sleep_time)
-
 
 def multiColorWipe(strip1, strip2, color1, color2, wait_ms=5):
     """Wipe color across multiple LED strips a pixel at a time."""
@@ -962,8 +865,7 @@ def multiColorWipe(strip1, strip2, color1, color2, wait_ms=5):
     for i in range(strip1.numPixels()):
             strip1.setPixelColor(i, color1)
             strip2.setPixelColor(i, color2)
-            strip1.show()
-            strip2.show()
+            show_strips(strip1, strip2)
             #time.sleep(wait_ms / 1000.0)
 
 def dice_visualizer_scaled(strip, roll=None, color=(255, 255, 255), roll_duration=2, frame_delay=0.08):
@@ -996,8 +898,7 @@ def dice_visualizer_scaled(strip, roll=None, color=(255, 255, 255), roll_duratio
     }
 
     def clear_strip():
-        for i in range(num_leds):
-            strip.setPixelColor(i, Color(0, 0, 0, 0))
+        strip[:num_leds] = Color(0, 0, 0, 0)
         strip.show()
 
     def show_roll(roll_number):
@@ -1009,16 +910,14 @@ def dice_visualizer_scaled(strip, roll=None, color=(255, 255, 255), roll_duratio
         strip.show()
 
     # Rolling animation
-    end_time = time.time() + roll_duration
-    while time.time() < end_time:
+    for t in FrameClock(1.0 / frame_delay, roll_duration):
         temp_roll = random.randint(1, 6)
         show_roll(temp_roll)
-        time.sleep(frame_delay)
 
     # Final roll
     final_roll = roll if roll else random.randint(1, 6)
     show_roll(final_roll)
-    time.sleep(2)
+    sleep(2)
     clear_strip()
 
     return final_roll
@@ -1052,8 +951,7 @@ def wave_ripple_dual(strip1, strip2, duration=10, speed=0.05, ripple_spacing=15,
             return (255, 0, 255 - (i - 1280))
 
     def clear(strip):
-        for i in range(strip.numPixels()):
-            strip.setPixelColor(i, Color(0, 0, 0, 0))
+        strip.clear()
 
     def update_ripples(strip, ripples):
         num_leds = strip.numPixels()
@@ -1081,8 +979,7 @@ def wave_ripple_dual(strip1, strip2, duration=10, speed=0.05, ripple_spacing=15,
     ripples1 = []
     ripples2 = [] if independent else ripples1
 
-    start_time = time.time()
-    while time.time() - start_time < duration:
+    for t in FrameClock(1.0 / speed, duration):
         clear(strip1)
         clear(strip2)
 
@@ -1101,14 +998,11 @@ def wave_ripple_dual(strip1, strip2, duration=10, speed=0.05, ripple_spacing=15,
 
         ripples1 = update_ripples(strip1, ripples1)
         ripples2 = update_ripples(strip2, ripples2)
-        strip1.show()
-        strip2.show()
-        time.sleep(speed)
+        show_strips(strip1, strip2)
 
     clear(strip1)
     clear(strip2)
-    strip1.show()
-    strip2.show()
+    show_strips(strip1, strip2)
 
 
 
@@ -1126,8 +1020,6 @@ def color_wave_brightness(strip1, strip2, duration=15, fps=60,
     :param wave_frequency: Number of wave peaks across the strip
     """
     num_pixels = strip1.numPixels()
-    frame_interval = 1 / fps
-    start_time = time.perf_counter()
 
     def apply_wave(strip, base_color, t):
         for i in range(strip.numPixels()):
@@ -1141,14 +1033,8 @@ def color_wave_brightness(strip1, strip2, duration=15, fps=60,
             w = int(base_color[3] * brightness)
 
             strip.setPixelColor(i, Color(r, g, b, w))
-        strip.show()
-
-    while True:
-        now = time.perf_counter()
-        elapsed = now - start_time
-        if elapsed > duration:
-            break
 
+    for elapsed in FrameClock(fps, duration):
         # Hue cycles at 1 cycle every 10 seconds
         hue = (elapsed / 10.0) % 1.0
         r, g, b = [int(c * 255) for c in colorsys.hsv_to_rgb(hue, 1.0, 1.0)]
@@ -1156,11 +1042,7 @@ def color_wave_brightness(strip1, strip2, duration=15, fps=60,
 
         apply_wave(strip1, base_color, elapsed)
         apply_wave(strip2, base_color, elapsed)
-
-        frame_time = time.perf_counter() - now
-        sleep_time = frame_interval - frame_time
-        if sleep_time > 0:
-            time.sleep(sleep_time)
+        show_strips(strip1, strip2)
 
 
 def theater_chase_effect(strip_a, strip_b, color=(255, 0, 0),
@@ -1175,12 +1057,9 @@ def theater_chase_effect(strip_a, strip_b, color=(255, 0, 0),
     chase_color = Color(*color)
     off_color = Color(0, 0, 0)
 
-    frame_duration = 1.0 / fps
-    start_time = time.time()
-    next_frame_time = start_time + frame_duration
     offset = 0
 
-    while (time.time() - start_time) < duration:
+    for t in FrameClock(fps, duration):
         # Draw current frame
         for i in range(num_pixels):
             if (i + offset) % spacing == 0:
@@ -1190,18 +1069,11 @@ def theater_chase_effect(strip_a, strip_b, color=(255, 0, 0),
                 strip_a.setPixelColor(i, off_color)
                 strip_b.setPixelColor(i, off_color)
 
-        strip_a.show()
-        strip_b.show()
+        show_strips(strip_a, strip_b)
 
         # Step offset for next frame
         offset = (offset + 1) % spacing
 
-        # Time adjustment for consistent fps
-        sleep_time = next_frame_time - time.time()
-        if sleep_time > 0:
-            time.sleep(sleep_time)
-        next_frame_time += frame_duration
-
 
 import time
 import math
@@ -1232,23 +1104,17 @@ def blood_artery_effect(strip_a, strip_b, speed=30, bpm=60, pulse_depth=0.3,
     blob_color = (255, 0, 0)
     blobs = []  # List of (pos, length)
 
-    frame_duration = 1.0 / fps
-    start_time = time.time()
-    next_frame_time = start_time + frame_duration
-
     beat_interval = 60.0 / bpm
-    next_beat_time = start_time
-
-    while (time.time() - start_time) < duration:
-        now = time.time()
-        elapsed = now - start_time
+    next_beat_time = 0.0
 
+    clock = FrameClock(fps, duration)
+    for elapsed in clock:
         # Global heartbeat pulse modulation
         pulse = heartbeat_wave(elapsed, bpm)
         pulse = 1.0 - pulse * pulse_depth
 
         # Spawn a blob at each heartbeat
-        if now >= next_beat_time:
+        if elapsed >= next_beat_time:
             blob_len = math.floor(min_blob_len + (max_blob_len - min_blob_len) * 0.5)
             blobs.append((-blob_len, blob_len))  # Start off-screen
             next_beat_time += beat_interval
@@ -1256,7 +1122,7 @@ def blood_artery_effect(strip_a, strip_b, speed=30, bpm=60, pulse_depth=0.3,
         # Update blobs' positions
         updated_blobs = []
         for pos, length in blobs:
-            new_pos = pos + speed * frame_duration
+            new_pos = pos + speed * clock.dt
             if new_pos - length < num_pixels:
                 updated_blobs.append((new_pos, length))
         blobs = updated_blobs
@@ -1279,14 +1145,7 @@ def blood_artery_effect(strip_a, strip_b, speed=30, bpm=60, pulse_depth=0.3,
             strip_a.setPixelColor(i, color)
             strip_b.setPixelColor(i, color)
 
-        strip_a.show()
-        strip_b.show()
-
-        # Maintain frame timing with processing time accounted for
-        sleep_time = next_frame_time - time.time()
-        if sleep_time > 0:
-            time.sleep(sleep_time)
-        next_frame_time += frame_duration
+        show_strips(strip_a, strip_b)
 
 
 
@@ -1300,17 +1159,12 @@ def starfield_effect(strip_a, strip_b,
                      direction=1):
 
     num_leds = strip_a.numPixels()
-    frame_delay = 1.0 / fps
     pixels = [(0, 0, 0, 0)] * num_leds
     stars = []
     spawn_interval = 1.0 / spawn_rate
-    last_spawn_time = time.time()
-    start_time = time.time()
-    next_frame_time = time.time()
-
-    while time.time() - start_time < duration:
-        frame_start = time.time()
+    last_spawn_time = 0.0
 
+    for frame_start in FrameClock(fps, duration):
         # Fade all pixels
         pixels = [tuple(int(c * fade) for c in px) for px in pixels]
 
@@ -1333,33 +1187,22 @@ def starfield_effect(strip_a, strip_b,
         stars = new_stars
 
         # Update strips
-        for i in range(num_leds):
-            strip_a.setPixelColor(i, Color(*pixels[i]))
-            strip_b.setPixelColor(i, Color(*pixels[i]))
-
-        strip_a.show()
-        strip_b.show()
-
-        # Frame pacing — subtract processing time
-        frame_end = time.time()
-        next_frame_time += frame_delay
-        sleep_time = next_frame_time - frame_end
-        if sleep_time > 0:
-            time.sleep(sleep_time)
-        else:
-            next_frame_time = time.time()  # reset if behind
+        frame = array('I', [pack_rgbw(*px) for px in pixels])
+        strip_a.set_pixels(frame)
+        strip_b.set_pixels(frame)
 
+        show_strips(strip_a, strip_b)
 
 
-def aurora_effect(strip_a, strip_b,
+
+def aurora_frames(frames,
                   palette=[(0, 255, 100, 0), (0, 100, 255, 0), (100, 0, 255, 0)],
                   speed=0.5,
                   fade=0.9,
-                  duration=20,
-                  fps=60,
                   scale=0.1,
                   background_color=(0, 0, 0, 0)):
-    
+    """Frame effect for aurora_effect(), see ledEngine.Engine."""
+
     def lerp_color(c1, c2, t):
         return tuple(int(c1[i] * (1 - t) + c2[i] * t) for i in range(4))
 
@@ -1371,15 +1214,12 @@ def aurora_effect(strip_a, strip_b,
         blend_t = (wave * (len(palette) - 1)) % 1.0
         return lerp_color(palette[i], palette[j], blend_t)
 
-    num_leds = strip_a.numPixels()
-    frame_delay = 1.0 / fps
+    num_leds = min(len(frame) for frame in frames)
     pixels = [background_color] * num_leds
-    start_time = time.time()
-    next_frame_time = time.time()
 
-    while time.time() - start_time < duration:
-        frame_start = time.time()
-        t = (frame_start - start_time) * speed
+    while True:
+        t, dt = yield
+        t *= speed
 
         # Fade existing pixels
         pixels = [tuple(int(c * fade) for c in px) for px in pixels]
@@ -1389,21 +1229,22 @@ def aurora_effect(strip_a, strip_b,
             color = get_aurora_color(i, t, palette, scale)
             pixels[i] = tuple(min(255, max(p, c)) for p, c in zip(pixels[i], color))
 
-        # Output to strips
-        for i in range(num_leds):
-            strip_a.setPixelColor(i, Color(*pixels[i]))
-            strip_b.setPixelColor(i, Color(*pixels[i]))
-        strip_a.show()
-        strip_b.show()
-
-        # Frame timing
-        frame_end = time.time()
-        next_frame_time += frame_delay
-        sleep_time = next_frame_time - frame_end
-        if sleep_time > 0:
-            time.sleep(sleep_time)
-        else:
-            next_frame_time = time.time()
+        frame = array('I', [pack_rgbw(*px) for px in pixels])
+        for out in frames:
+            out[:num_leds] = frame
+
+
+def aurora_effect(strip_a, strip_b,
+                  palette=[(0, 255, 100, 0), (0, 100, 255, 0), (100, 0, 255, 0)],
+                  speed=0.5,
+                  fade=0.9,
+                  duration=20,
+                  fps=60,
+                  scale=0.1,
+                  background_color=(0, 0, 0, 0)):
+    return Engine(strip_a, strip_b).run(aurora_frames, duration=duration, fps=fps,
+                                        palette=palette, speed=speed, fade=fade,
+                                        scale=scale, background_color=background_color)
 
 
 def comet_effect(strip_a, strip_b,
@@ -1438,10 +1279,6 @@ def comet_effect(strip_a, strip_b,
     if num_comets * min_spacing > num_pixels:
         raise ValueError(f"Too many comets for spacing: {num_comets} × {min_spacing} > {num_pixels}")
 
-    frame_duration = 1.0 / fps
-    start_time = time.time()
-    next_frame_time = start_time + frame_duration
-
     r_base, g_base, b_base, w_base = color
     r_bg, g_bg, b_bg, w_bg = background_color
     packed_bg = Color(r_bg, g_bg, b_bg, w_bg)
@@ -1456,14 +1293,10 @@ def comet_effect(strip_a, strip_b,
             comet_offsets.append(pos)
             taken.append(pos)
 
-    while (time.time() - start_time) < duration:
+    for elapsed in FrameClock(fps, duration):
         # Fill background first
-        for i in range(num_pixels):
-            strip_a.setPixelColor(i, packed_bg)
-            strip_b.setPixelColor(i, packed_bg)
-
-        now = time.time()
-        elapsed = now - start_time
+        strip_a[:num_pixels] = packed_bg
+        strip_b[:num_pixels] = packed_bg
 
         for offset in comet_offsets:
             base_pos = offset + direction * speed * elapsed
@@ -1477,17 +1310,11 @@ def comet_effect(strip_a, strip_b,
                     g = int(g_base * fade)
                     b = int(b_base * fade)
                     w = int(w_base * fade)
-                    packed = Color(r, g, b, w)
-                    strip_a.setPixelColor(pos, packed)
-                    strip_b.setPixelColor(pos, packed)
+                    packed = pack_rgbw(r, g, b, w)
+                    strip_a.set_pixel(pos, packed)
+                    strip_b.set_pixel(pos, packed)
 
-        strip_a.show()
-        strip_b.show()
-
-        sleep_time = next_frame_time - time.time()
-        if sleep_time > 0:
-            time.sleep(sleep_time)
-        next_frame_time += frame_duration
+        show_strips(strip_a, strip_b)
 
 
 
@@ -1509,8 +1336,7 @@ def color_bounce(strip1, strip2, duration=15, num_bouncers=3, fps=60,
                 return color
 
     def clear(strip):
-        for i in range(strip.numPixels()):
-            strip.setPixelColor(i, Color(0, 0, 0, 0))
+        strip.clear()
 
     def init_bouncers(num_leds, count):
         spacing = num_leds // (count + 1)
@@ -1553,24 +1379,18 @@ def color_bounce(strip1, strip2, duration=15, num_bouncers=3, fps=60,
     # Main loop (unchanged except call updated functions)
     num_leds_1 = strip1.numPixels()
     num_leds_2 = strip2.numPixels()
-    delay = 1.0 / fps
 
     bouncers1 = init_bouncers(num_leds_1, num_bouncers)
     bouncers2 = init_bouncers(num_leds_2, num_bouncers) if independent else bouncers1
 
-    start_time = time.perf_counter()
-
-    while time.perf_counter() - start_time < duration:
-        frame_start = time.perf_counter()
-
+    for t in FrameClock(fps, duration):
         clear(strip1)
         clear(strip2)
 
         draw_bouncers(strip1, bouncers1, num_leds_1)
         draw_bouncers(strip2, bouncers2, num_leds_2)
 
-        strip1.show()
-        strip2.show()
+        show_strips(strip1, strip2)
 
         for b in bouncers1:
             b['pos'] += b['dir']
@@ -1593,32 +1413,11 @@ def color_bounce(strip1, strip2, duration=15, num_bouncers=3, fps=60,
         if independent:
             detect_collisions(bouncers2, num_leds_2)
 
-        elapsed = time.perf_counter() - frame_start
-        if (sleep := delay - elapsed) > 0:
-            time.sleep(sleep)
 
-
-def wormhole_vortex(strip1, strip2, duration=15, fps=60, 
-                    direction='inward', wave_density=0.1, 
+def wormhole_frames(frames, direction='inward', wave_density=0.1,
                     hue_speed=0.02, base_saturation=1.0, base_value=1.0):
-    """
-    Wormhole vortex visual effect with flowing bands and rotating color.
-
-    :param strip1: First NeoPixel strip
-    :param strip2: Second NeoPixel strip
-    :param duration: Duration in seconds
-    :param fps: Frames per second
-    :param direction: 'inward' or 'outward'
-    :param wave_density: Number of wave peaks per strip length (higher = tighter waves)
-    :param hue_speed: Rate of hue rotation per frame
-    :param base_saturation: HSV saturation (0-1)
-    :param base_value: HSV brightness (0-1)
-    """
-    import colorsys
-
-    num_pixels = min(strip1.numPixels(), strip2.numPixels())
-    frame_delay = 1.0 / fps
-    start_time = time.time()
+    """Frame effect for wormhole_vortex(), see ledEngine.Engine."""
+    num_pixels = min(len(frame) for frame in frames)
     hue_offset = 0.0
 
     def get_brightness(i, t):
@@ -1626,9 +1425,9 @@ def wormhole_vortex(strip1, strip2, duration=15, fps=60,
         phase = 2 * math.pi * (wave_density * i / num_pixels + t)
         return (math.sin(phase) + 1) / 2  # [0,1]
 
-    while time.time() - start_time < duration:
-        frame_start = time.perf_counter()
-        t = (time.time() - start_time)
+    frame = array('I', bytes(4 * num_pixels))
+    while True:
+        t, dt = yield
 
         for i in range(num_pixels):
             index = i if direction == 'outward' else num_pixels - 1 - i
@@ -1637,20 +1436,34 @@ def wormhole_vortex(strip1, strip2, duration=15, fps=60,
             # Rotate hue over time
             hue = (hue_offset + i / num_pixels) % 1.0
             r, g, b = colorsys.hsv_to_rgb(hue, base_saturation, base_value * brightness)
-            color = Color(int(r * 255), int(g * 255), int(b * 255), 0)
+            frame[i] = Color(int(r * 255), int(g * 255), int(b * 255), 0)
 
-            strip1.setPixelColor(i, color)
-            strip2.setPixelColor(i, color)
-
-        strip1.show()
-        strip2.show()
+        for out in frames:
+            out[:num_pixels] = frame
 
         hue_offset = (hue_offset + hue_speed) % 1.0
 
-        elapsed = time.perf_counter() - frame_start
-        sleep_time = frame_delay - elapsed
-        if sleep_time > 0:
-            time.sleep(sleep_time)
+
+def wormhole_vortex(strip1, strip2, duration=15, fps=60, 
+                    direction='inward', wave_density=0.1, 
+                    hue_speed=0.02, base_saturation=1.0, base_value=1.0):
+    """
+    Wormhole vortex visual effect with flowing bands and rotating color.
+
+    :param strip1: First NeoPixel strip
+    :param strip2: Second NeoPixel strip
+    :param duration: Duration in seconds
+    :param fps: Frames per second
+    :param direction: 'inward' or 'outward'
+    :param wave_density: Number of wave peaks per strip length (higher = tighter waves)
+    :param hue_speed: Rate of hue rotation per frame
+    :param base_saturation: HSV saturation (0-1)
+    :param base_value: HSV brightness (0-1)
+    """
+    return Engine(strip1, strip2).run(wormhole_frames, duration=duration, fps=fps,
+                                      direction=direction, wave_density=wave_density,
+                                      hue_speed=hue_speed, base_saturation=base_saturation,
+                                      base_value=base_value)
 
 
 def neural_pulse(strip1, strip2,
@@ -1676,13 +1489,11 @@ def neural_pulse(strip1, strip2,
     """
 
     num_pixels = min(strip1.numPixels(), strip2.numPixels())
-    frame_delay = 1.0 / fps
-    last_spawn = 0
+    last_spawn = -spawn_interval
     pulses = []  # list of {'head': float}
 
     def clear(strip):
-        for i in range(num_pixels):
-            strip.setPixelColor(i, Color(0, 0, 0, 0))
+        strip[:num_pixels] = Color(0, 0, 0, 0)
 
     def draw_pulses(strip, pulses):
         for pulse in pulses:
@@ -1691,18 +1502,15 @@ def neural_pulse(strip1, strip2,
                 pos = int(head - i if direction == 'inward' else head + i)
                 if 0 <= pos < num_pixels:
                     fade = max(0.0, 1.0 - (i / trail_length))
-                    color = tuple(int(c * fade) for c in pulse_color)
-                    strip.setPixelColor(pos, Color(*color))
-
-    start_time = time.time()
-    while time.time() - start_time < duration:
-        frame_start = time.time()
+                    strip.set_pixel(pos, [int(c * fade) for c in pulse_color])
 
+    clock = FrameClock(fps, duration)
+    for t in clock:
         clear(strip1)
         clear(strip2)
 
         # Update pulse positions
-        delta = speed / fps
+        delta = speed * clock.dt
         for pulse in pulses:
             if direction == 'inward':
                 pulse['head'] += delta
@@ -1716,7 +1524,7 @@ def neural_pulse(strip1, strip2,
         ]
 
         # Spawn new pulse pair
-        if time.time() - last_spawn >= spawn_interval:
+        if t - last_spawn >= spawn_interval:
             if direction == 'inward':
                 pulses.append({'head': 0.0})
                 pulses.append({'head': num_pixels - 1.0})
@@ -1724,17 +1532,12 @@ def neural_pulse(strip1, strip2,
                 center = (num_pixels - 1) / 2
                 pulses.append({'head': center})
                 pulses.append({'head': center})
-            last_spawn = time.time()
+            last_spawn = t
 
         draw_pulses(strip1, pulses)
         draw_pulses(strip2, pulses)
 
-        strip1.show()
-        strip2.show()
-
-        elapsed = time.time() - frame_start
-        sleep_time = max(0.0, frame_delay - elapsed)
-        time.sleep(sleep_time)
+        show_strips(strip1, strip2)
 
 
 def ghost_fade(strip1, strip2,
@@ -1746,12 +1549,10 @@ def ghost_fade(strip1, strip2,
                color=(255, 255, 255, 0)):
 
     num_pixels = min(strip1.numPixels(), strip2.numPixels())
-    frame_delay = 1.0 / fps
     ghosts = []
 
     def clear_buffer(strip):
-        for i in range(num_pixels):
-            strip.setPixelColor(i, Color(0, 0, 0, 0))
+        strip[:num_pixels] = Color(0, 0, 0, 0)
 
     class Ghost:
         def __init__(self, position):
@@ -1778,13 +1579,11 @@ def ghost_fade(strip1, strip2,
         def is_alive(self):
             return self.age < fade_time
 
-    start = time.time()
-    last_spawn = 0.0
+    last_spawn = -1.0 / spawn_rate
 
-    while time.time() - start < duration:
-        now = time.time()
-        elapsed = now - start
-        dt = frame_delay
+    clock = FrameClock(fps, duration)
+    for now in clock:
+        dt = clock.dt
 
         # Spawn new ghost
         if now - last_spawn >= 1.0 / spawn_rate:
@@ -1804,10 +1603,7 @@ def ghost_fade(strip1, strip2,
             g.draw(strip1)
             g.draw(strip2)
 
-        strip1.show()
-        strip2.show()
-
-        time.sleep(max(0.0, frame_delay - (time.time() - now)))
+        show_strips(strip1, strip2)
 
 def slot_machine_roll(strip1, strip2,
                       duration=30,
@@ -1818,21 +1614,15 @@ def slot_machine_roll(strip1, strip2,
                       final_color=(255, 255, 255, 0),
                       fps=60):
     num_pixels = min(strip1.numPixels(), strip2.numPixels())
-    frame_delay = 1.0 / fps
-    start_time = time.time()
-    prev_time = start_time
-    elapsed = 0
     offset = 0.0
 
     def get_color_at(i, offset):
         index = int((i + offset) / 10) % len(palette)
         return palette[index]
 
-    while elapsed < duration:
-        now = time.time()
-        dt = now - prev_time
-        prev_time = now
-        elapsed = now - start_time
+    clock = FrameClock(fps, duration)
+    for elapsed in clock:
+        dt = clock.dt
         t = min(elapsed / duration, 1.0)
 
         # Interpolated speed with easing
@@ -1847,17 +1637,12 @@ def slot_machine_roll(strip1, strip2,
             strip1.setPixelColor(i, Color(*color))
             strip2.setPixelColor(i, Color(*color))
 
-        strip1.show()
-        strip2.show()
-
-        time.sleep(max(0, frame_delay - (time.time() - now)))  # sleep only the remaining time
+        show_strips(strip1, strip2)
 
     # Final locked-in color
-    for i in range(num_pixels):
-        strip1.setPixelColor(i, Color(*final_color))
-        strip2.setPixelColor(i, Color(*final_color))
-    strip1.show()
-    strip2.show()
+    strip1[:num_pixels] = Color(*final_color)
+    strip2[:num_pixels] = Color(*final_color)
+    show_strips(strip1, strip2)
 
 
 def star_snake(strip1, strip2,
@@ -1872,7 +1657,6 @@ def star_snake(strip1, strip2,
     from rpi_ws281x import Color
 
     num_pixels = min(strip1.numPixels(), strip2.numPixels())
-    frame_delay = 1.0 / fps
     position = 0.0
     direction = 1
 
@@ -1884,15 +1668,12 @@ def star_snake(strip1, strip2,
             strip1.setPixelColor(i, Color(*c))
             strip2.setPixelColor(i, Color(*c))
 
-    last_change_time = time.time()
+    last_change_time = 0.0
     next_change_interval = random.uniform(min_interval, max_interval)
-    start_time = time.time()
-    prev_time = start_time
 
-    while time.time() - start_time < duration:
-        now = time.time()
-        dt = now - prev_time
-        prev_time = now
+    clock = FrameClock(fps, duration)
+    for now in clock:
+        dt = clock.dt
 
         # Direction change + color update
         if now - last_change_time >= next_change_interval:
@@ -1914,19 +1695,12 @@ def star_snake(strip1, strip2,
 
         # Draw and show
         draw_snake(position, color)
-        strip1.show()
-        strip2.show()
-
-        time.sleep(max(0, frame_delay - (time.time() - now)))
+        show_strips(strip1, strip2)
 
 def blackout(strip):
-    for i in range(max(strip.numPixels(), strip.numPixels())):
-        strip.setPixelColor(i, Color(0, 0, 0, 0))
-    
+    strip.clear()
     strip.show()
 
 def fill_color(strip, color):
     """Set all pixels on the strip to the given (r, g, b, w) color tuple."""
-    for i in range(strip.numPixels()):
-        strip[i] = Color(*color)
-    strip.show()
\ No newline at end of file
+    strip.fill_and_show(color)
\ No newline at end of file
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# Shows the frames sent over the network by a NetworkMultiChannelPixelStrip,
+# so the effects can run on a faster machine and the Pi only drives the LEDs.
+# On the other machine, use eg.
+#
+#   strips = NetworkMultiChannelPixelStrip([dict(num=600), dict(num=600)], 'pi.local')
+#
+# in place of MultiChannelPixelStrip, or run ledWeb.py with LED_REMOTE=pi.local.
+import argparse
+
+from rpi_ws281x import ws, MultiChannelPixelStrip, NetworkReceiver
+from rpi_ws281x.network import DEFAULT_PORT
+
+# LED strip configuration:
+LED_1_COUNT = 600       # Number of LED pixels.
+LED_1_PIN = 18          # GPIO pin connected to the pixels (must support PWM! GPIO 13 and 18 on RPi 3).
+LED_1_INVERT = False    # True to invert the signal (when using NPN transistor level shift)
+LED_1_STRIP = ws.SK6812_STRIP_GRBW
+
+LED_2_COUNT = 600       # Number of LED pixels.
+LED_2_PIN = 13          # GPIO pin connected to the pixels (must support PWM! GPIO 13 or 18 on RPi 3).
+LED_2_INVERT = False    # True to invert the signal (when using NPN transistor level shift)
+LED_2_STRIP = ws.SK6812_STRIP_GRBW
+
+LED_FREQ_HZ = 800000    # LED signal frequency in hertz (usually 800khz)
+LED_DMA = 10            # DMA channel to use for generating signal (Between 1 and 14)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-p', '--port', type=int, default=DEFAULT_PORT, help='UDP port to listen on')
+    args = parser.parse_args()
+
+    strips = MultiChannelPixelStrip([
+        dict(num=LED_1_COUNT, pin=LED_1_PIN, invert=LED_1_INVERT, strip_type=LED_1_STRIP),
+        dict(num=LED_2_COUNT, pin=LED_2_PIN, invert=LED_2_INVERT, strip_type=LED_2_STRIP),
+    ], freq_hz=LED_FREQ_HZ, dma=LED_DMA)
+    strips.begin()
+
+    receiver = NetworkReceiver(strips, port=args.port)
+    print('Listening on port {0}, press Ctrl-C to quit.'.format(args.port))
+    try:
+        receiver.serve_forever()
+    except KeyboardInterrupt:
+        print('{0} frames shown, {1} dropped'.format(receiver.frames, receiver.dropped_frames))
+        receiver.close()
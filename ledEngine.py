@@ -0,0 +1,575 @@
+import ctypes
+import gc
+import inspect
+import os
+import queue
+import sys
+from array import array
+import threading
+import time
+
+
+class Cancelled(Exception):
+    """Raised in an effect when the engine running it is stopped."""
+
+
+class CancelToken:
+    """Set by Engine.stop() to end the effect it was created for.  Frame
+    effects are stopped by the engine between frames; effects that run
+    their own loop stop at their next sleep() or show_strips(), which raise
+    Cancelled, or can poll cancelled.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        # time.monotonic() when cancel() was called
+        self.requested = None
+
+    def cancel(self):
+        if self.requested is None:
+            self.requested = time.monotonic()
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def wait(self, seconds):
+        """Sleep for seconds, or until cancelled.  Returns True if
+        cancelled."""
+        return self._event.wait(max(0.0, seconds))
+
+
+# The token of the effect running in each thread, the FrameClocks it has
+# created, see Engine.run(), and the thread's Realtime mode, if any
+_local = threading.local()
+
+
+def current_token():
+    """The CancelToken of the effect running in this thread, or None."""
+    return getattr(_local, "token", None)
+
+
+def check_cancelled():
+    """Raise Cancelled if the effect running in this thread was stopped."""
+    token = current_token()
+    if token is not None and token.cancelled:
+        raise Cancelled()
+
+
+def sleep(seconds):
+    """time.sleep() for effects: raises Cancelled as soon as the effect
+    running in this thread is stopped, rather than sleeping on."""
+    token = current_token()
+    if token is None:
+        time.sleep(seconds)
+    elif token.wait(seconds):
+        raise Cancelled()
+
+
+class FrameClock:
+    """Paces an effect at fps frames per second for duration seconds (or
+    for ever if None), against absolute deadlines on the monotonic clock:
+    frame n is due n / fps seconds after the first, however long each
+    takes to compute, so the rate doesn't drift and clock changes don't
+    matter.  It sleeps with sleep() between frames, so stopping the effect
+    interrupts it.
+
+        for t in FrameClock(fps, duration):
+            ...draw the frame for t seconds in...
+            show_strips(strip1, strip2)
+
+    Policy decides what happens to frames that fall behind by a whole
+    frame or more: "skip" (the default) drops the deadlines missed and
+    carries on from the next one, keeping animations that follow t in time,
+    while "catch_up" runs the missed frames back to back, for effects that
+    move a step per frame, but still skips if more than a second behind.
+
+    Waking from a sleep can take a few milliseconds on a loaded Pi, so the
+    clock sleeps until spin seconds before each deadline and busy-waits the
+    rest.  It is set per deployment on the class, eg. FrameClock.spin =
+    0.002, trading CPU time for timing; 0 (the default) sleeps all the way.
+    How late each frame starts is kept, see stats().
+    """
+
+    POLICIES = ("skip", "catch_up")
+    # Seconds before each deadline to stop sleeping and spin
+    spin = 0.0
+    # Frames starting more than this many seconds late missed their deadline
+    tolerance = 0.001
+
+    def __init__(self, fps=30, duration=None, policy="skip", spin=None):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown frame clock policy {policy!r}")
+        self.fps = fps
+        # Nanoseconds between frames
+        self.period = int(round(1e9 / fps))
+        self.duration = None if duration is None else int(duration * 1e9)
+        self.policy = policy
+        if spin is not None:
+            self.spin = spin
+        # Seconds since the first frame, and since the previous one
+        self.t = 0.0
+        self.dt = 0.0
+        # Frames run, started after their deadline, and dropped by "skip"
+        self.frames = 0
+        self.late_frames = 0
+        self.skipped_frames = 0
+        # Nanoseconds each frame after the first started after its deadline
+        self.jitter = array("q")
+        self._start = None
+        self._deadline = None
+        self._previous = None
+        clocks = getattr(_local, "clocks", None)
+        if clocks is not None:
+            clocks.append(self)
+
+    def tick(self):
+        """Wait until the next frame is due.  Returns False, at once, if
+        it would be after duration has passed."""
+        if self._start is None:
+            now = self._start = self._deadline = time.monotonic_ns()
+        else:
+            self._deadline += self.period
+            now = time.monotonic_ns()
+            behind = now - self._deadline
+            if behind < 0:
+                if self.duration is not None and self._deadline - self._start >= self.duration:
+                    return False
+                self._wait(now)
+                now = time.monotonic_ns()
+            else:
+                if behind > 0:
+                    self.late_frames += 1
+                if behind >= self.period and (self.policy == "skip" or behind >= 1_000_000_000):
+                    missed = behind // self.period
+                    self.skipped_frames += missed
+                    self._deadline += missed * self.period
+            self.jitter.append(now - self._deadline)
+
+        elapsed = now - self._start
+        if self.duration is not None and elapsed >= self.duration:
+            return False
+        self.t = elapsed / 1e9
+        self.dt = (now - self._previous) / 1e9 if self._previous is not None else 0.0
+        self._previous = now
+        self.frames += 1
+        return True
+
+    def _wait(self, now):
+        # Sleep until spin before the deadline, which can take a little
+        # more or less than asked, then spin until it has passed
+        spin = int(self.spin * 1e9)
+        realtime = getattr(_local, "realtime", None)
+        if realtime is not None and realtime.collect((self._deadline - now - spin) / 1e9):
+            now = time.monotonic_ns()
+        while now < self._deadline:
+            if self._deadline - now > spin:
+                sleep((self._deadline - now - spin) / 1e9)
+            else:
+                check_cancelled()
+            now = time.monotonic_ns()
+
+    def __iter__(self):
+        while self.tick():
+            yield self.t
+
+    def stats(self):
+        """Timing of the frames so far, as a dict of:
+
+        late_frames, skipped_frames: as the attributes
+        missed_deadlines: frames started more than tolerance late
+        jitter_p50, jitter_p90, jitter_p99, jitter_max: seconds after its
+            deadline that half, 90%, 99% and all of the frames started by
+        """
+        return timing_stats([self])
+
+
+def timing_stats(clocks):
+    """FrameClock.stats() for all of clocks together."""
+    jitter = sorted(sample for clock in clocks for sample in clock.jitter)
+
+    def percentile(p):
+        return jitter[min(len(jitter) - 1, int(p * len(jitter)))] / 1e9 if jitter else 0.0
+
+    return {
+        "late_frames": sum(clock.late_frames for clock in clocks),
+        "skipped_frames": sum(clock.skipped_frames for clock in clocks),
+        "missed_deadlines": sum(sum(1 for sample in clock.jitter if sample > clock.tolerance * 1e9)
+                                for clock in clocks),
+        "jitter_p50": percentile(0.5),
+        "jitter_p90": percentile(0.9),
+        "jitter_p99": percentile(0.99),
+        "jitter_max": jitter[-1] / 1e9 if jitter else 0.0,
+    }
+
+
+class Realtime:
+    """Real-time mode for the thread an Engine runs effects on, so they
+    keep time while the rest of the process is busy:
+
+    cpu: pin the thread to this core (best kept free of other work, eg.
+        with isolcpus=), or None to leave it
+    priority: run it SCHED_FIFO at this priority (1-99), or None; if that
+        isn't permitted, nice is tried instead
+    nice: niceness to give the thread if SCHED_FIFO isn't used, or None
+    lock_memory: mlockall() the process, so frames never wait on a page
+        fault
+    switch_interval: sys.setswitchinterval() for the process, so the
+        thread gets the GIL back from other threads soon after waking
+    gc_slack: the cyclic garbage collector only runs between frames, when
+        at least this many seconds are left to the next one, rather than
+        whenever allocations trigger it
+
+    Everything asked for is best effort: what couldn't be done is in
+    failed after apply(), with the reason.
+    """
+
+    def __init__(self, cpu=None, priority=10, nice=-10, lock_memory=False,
+                 switch_interval=0.0005, gc_slack=0.005):
+        self.cpu = cpu
+        self.priority = priority
+        self.nice = nice
+        self.lock_memory = lock_memory
+        self.switch_interval = switch_interval
+        self.gc_slack = gc_slack
+        # What apply() did and failed to do
+        self.applied = []
+        self.failed = []
+        self._collecting = False
+
+    def _try(self, name, function, *args):
+        try:
+            function(*args)
+        except (OSError, AttributeError) as e:
+            self.failed.append(f"{name}: {e}")
+            return False
+        self.applied.append(name)
+        return True
+
+    def apply(self):
+        """Apply the mode to the calling thread, and the process-wide
+        settings to the process.  Returns failed."""
+        if self.cpu is not None:
+            self._try(f"cpu {self.cpu}", os.sched_setaffinity, 0, {self.cpu})
+        if self.priority is None or not self._try(
+                f"SCHED_FIFO {self.priority}", os.sched_setscheduler, 0, os.SCHED_FIFO,
+                os.sched_param(self.priority)):
+            if self.nice is not None:
+                self._try(f"nice {self.nice}", os.setpriority, os.PRIO_PROCESS,
+                          threading.get_native_id(), self.nice)
+        if self.lock_memory:
+            self._try("mlockall", _mlockall)
+        if self.switch_interval is not None:
+            sys.setswitchinterval(self.switch_interval)
+            self.applied.append(f"switch interval {self.switch_interval}")
+        if self.gc_slack is not None:
+            # Everything allocated while starting up is there to stay, so
+            # take it out of the collections made between frames
+            gc.collect()
+            gc.freeze()
+            self.applied.append("gc.freeze")
+        _local.realtime = self
+        return self.failed
+
+    def start_effect(self):
+        # Hold the collector back while the effect runs, see collect()
+        if self.gc_slack is not None and gc.isenabled():
+            gc.disable()
+            self._collecting = True
+
+    def end_effect(self):
+        if self._collecting:
+            self._collecting = False
+            gc.enable()
+
+    def collect(self, slack):
+        """Run the collections the allocations since the last one call
+        for, if slack seconds are left before the next frame.  Returns True
+        if any were run."""
+        if not self._collecting or slack < self.gc_slack:
+            return False
+        count = gc.get_count()
+        threshold = gc.get_threshold()
+        for generation in (2, 1, 0):
+            if threshold[generation] and count[generation] >= threshold[generation]:
+                gc.collect(generation)
+                return True
+        return False
+
+
+def _mlockall():
+    libc = ctypes.CDLL(None, use_errno=True)
+    # MCL_CURRENT | MCL_FUTURE
+    if libc.mlockall(1 | 2) != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno))
+
+
+def show_strips(*strips):
+    """Show each strip, rendering strips that share a controller (the
+    channels of a MultiChannelPixelStrip) in a single pass.  Returns once
+    the frame is on its way, so the next one can be computed while it is
+    clocked out.  Raises Cancelled first if the effect running in this
+    thread was stopped.
+    """
+    check_cancelled()
+    rendered = []
+    for strip in strips:
+        if not strip:
+            continue
+        controller = getattr(strip, "controller", strip)
+        if controller not in rendered:
+            rendered.append(controller)
+            controller.show(block=False)
+
+
+def _controllers(strips):
+    controllers = []
+    for strip in strips:
+        controller = getattr(strip, "controller", strip)
+        if controller not in controllers:
+            controllers.append(controller)
+    return controllers
+
+
+class FrameEffect:
+    """Base class for effects run by an Engine, as an alternative to a
+    generator function.  It is created with the frames to draw into (one
+    pixel_view() per strip) and the effect's parameters, then render() is
+    called once per frame.
+    """
+
+    def __init__(self, frames, **params):
+        self.frames = frames
+
+    def render(self, t, dt):
+        """Draw the frame for t seconds after the start of the effect, dt
+        seconds after the previous one, into self.frames.  Return False to
+        end the effect.
+        """
+        raise NotImplementedError
+
+
+def is_frame_effect(effect):
+    """True if effect is a generator function or FrameEffect class, which
+    the Engine drives a frame at a time, rather than a function that runs
+    the whole effect itself."""
+    return inspect.isgeneratorfunction(effect) or (
+        isinstance(effect, type) and issubclass(effect, FrameEffect))
+
+
+def _renderer(effect, frames, params):
+    # A render(t, dt) function for a frame effect, returning False when done
+    if isinstance(effect, type):
+        return effect(frames, **params).render
+
+    generator = effect(frames, **params)
+    try:
+        next(generator)
+    except StopIteration:
+        return lambda t, dt: False
+
+    def render(t, dt):
+        try:
+            generator.send((t, dt))
+        except StopIteration:
+            return False
+    return render
+
+
+class Engine:
+    """Runs effects on a set of strips, one at a time.
+
+    A frame effect is a generator function or FrameEffect subclass.  The
+    engine owns its loop: it calls it with the frames to draw into, one
+    pixel_view() per strip, and the effect's parameters, then for each frame
+    sends it (t, dt) -- the seconds since the start and since the previous
+    frame -- shows the strips and sleeps until the next frame is due.  For
+    example:
+
+        def solid(frames, color=0xff0000):
+            while True:
+                t, dt = yield
+                for frame in frames:
+                    frame[:] = array('I', [color]) * len(frame)
+
+    The engine takes duration (default until the effect ends) and fps
+    (default the engine's) out of the parameters.  Any other callable is an
+    existing effect that runs its own loop; it is called with all the
+    parameters, unchanged.
+
+    Effects run in the calling thread with run(), or queued on the
+    engine's own thread with submit(), so only one ever draws at a time.
+    stop() ends the running effect within a frame, see CancelToken.  Given
+    realtime, a Realtime, the engine's thread runs in that real-time mode.
+    """
+
+    def __init__(self, *strips, fps=30, realtime=None):
+        self.strips = [strip for strip in strips if strip]
+        self.fps = fps
+        self.realtime = realtime
+        # Counters for the last effect run, see run()
+        self.stats = {}
+        # Name of the effect running on the engine's thread, if any
+        self.current = None
+        # Called on the engine's thread with the name of each effect it
+        # starts, and with the name and stats of each it finishes, or the
+        # exception it raised
+        self.started = None
+        self.finished = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        # Effects queued or running, and their tokens
+        self._jobs = 0
+        self._tokens = set()
+
+    def run(self, effect, token=None, **params):
+        """Run effect with params in this thread until it ends, its
+        duration has passed or token, a CancelToken, is cancelled.  Token
+        defaults to that of the effect already running in this thread, if
+        any, so an effect can run another.  Returns, and keeps in
+        self.stats, a dict of:
+
+        frames: frames rendered (unchanged frames are skipped)
+        late_frames, skipped_frames, missed_deadlines, jitter_p50,
+            jitter_p90, jitter_p99, jitter_max: the timing of the frames
+            paced by the FrameClocks the effect used, see FrameClock.stats()
+            (None for existing effects that pace themselves)
+        elapsed, fps: seconds the effect ran and frames shown per second
+        mean_compute_time, max_compute_time: seconds spent computing a
+            frame, on average and at most (None for existing effects,
+            whose frames the engine doesn't see)
+        cancelled: True if the effect was stopped
+        stop_latency: seconds from the cancel() to the effect's last frame
+            having been shown, or None
+        """
+        outer = current_token()
+        if token is None:
+            token = outer or CancelToken()
+        controllers = _controllers(self.strips)
+        renders = sum(controller.renders for controller in controllers)
+        outer_clocks = getattr(_local, "clocks", None)
+        clocks = []
+        start = time.monotonic()
+        _local.token = token
+        _local.clocks = clocks
+        try:
+            if is_frame_effect(effect):
+                stats = self._run_frames(effect, params, token)
+            else:
+                stats = {"mean_compute_time": None, "max_compute_time": None}
+                try:
+                    effect(**params)
+                except Cancelled:
+                    # Let the effect that owns the token unwind too
+                    if token is outer:
+                        raise
+        finally:
+            _local.token = outer
+            _local.clocks = outer_clocks
+            if outer_clocks is not None:
+                outer_clocks.extend(clocks)
+            for controller in controllers:
+                controller.wait()
+        end = time.monotonic()
+        if clocks:
+            stats.update(timing_stats(clocks))
+        else:
+            stats.update(dict.fromkeys(timing_stats([]), None))
+        stats["frames"] = sum(controller.renders for controller in controllers) - renders
+        stats["elapsed"] = end - start
+        stats["fps"] = stats["frames"] / stats["elapsed"] if end > start else 0.0
+        stats["cancelled"] = token.cancelled
+        stats["stop_latency"] = end - token.requested if token.cancelled else None
+        self.stats = stats
+        return stats
+
+    def _run_frames(self, effect, params, token):
+        clock = FrameClock(params.pop("fps", None) or self.fps, params.pop("duration", None))
+        frames = [strip.pixel_view() for strip in self.strips]
+        render = _renderer(effect, frames, params)
+
+        count = 0
+        compute = max_compute = 0.0
+        try:
+            while not token.cancelled and clock.tick():
+                began = time.perf_counter()
+                if render(clock.t, clock.dt) is False:
+                    break
+                took = time.perf_counter() - began
+                compute += took
+                max_compute = max(max_compute, took)
+                show_strips(*self.strips)
+                count += 1
+        except Cancelled:
+            pass
+
+        return {
+            "mean_compute_time": compute / count if count else 0.0,
+            "max_compute_time": max_compute,
+        }
+
+    def submit(self, effect, name=None, **params):
+        """Queue effect to run(effect, **params) on the engine's thread,
+        after any effects already queued, as name (default the effect's
+        __name__).
+        """
+        token = CancelToken()
+        with self._lock:
+            self._jobs += 1
+            self._tokens.add(token)
+            self._queue.put((name or getattr(effect, "__name__", repr(effect)), effect, params, token))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._serve, name="Engine", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Stop the effect running on the engine's thread and drop those
+        queued.  Returns at once; the running effect ends within a frame
+        (or at its next sleep() or show_strips()), and finished is called
+        with stats giving its stop_latency.
+        """
+        with self._lock:
+            for token in self._tokens:
+                token.cancel()
+
+    def switch(self, effect, name=None, **params):
+        """stop() then submit(): run effect as soon as the current one has
+        stopped."""
+        self.stop()
+        self.submit(effect, name, **params)
+
+    @property
+    def busy(self):
+        """True while an effect is running on the engine's thread or
+        queued for it."""
+        return self._jobs > 0
+
+    def _serve(self):
+        if self.realtime is not None:
+            self.realtime.apply()
+        while True:
+            name, effect, params, token = self._queue.get()
+            # Effects stopped before they started are dropped
+            result = None
+            if not token.cancelled:
+                self.current = name
+                try:
+                    if self.started is not None:
+                        self.started(name)
+                    if self.realtime is not None:
+                        self.realtime.start_effect()
+                    result = self.run(effect, token, **params)
+                except Exception as e:
+                    result = e
+                finally:
+                    if self.realtime is not None:
+                        self.realtime.end_effect()
+                self.current = None
+            with self._lock:
+                self._jobs -= 1
+                self._tokens.discard(token)
+            if result is not None and self.finished is not None:
+                self.finished(name, result)
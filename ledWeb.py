@@ -5,12 +5,13 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from datetime import datetime
 from LedEffects import *  # Your custom effects like fireflies, matrix, etc.
-from rpi_ws281x import ws, Color, Adafruit_NeoPixel
+from ledEngine import Engine, FrameClock, Realtime
+from rpi_ws281x import ws, Color, MultiChannelPixelStrip, NetworkMultiChannelPixelStrip
 
 import random
-import threading
 import json
 import os
+import time
 
 
 
@@ -37,18 +38,91 @@ LED_2_INVERT = False
 LED_2_CHANNEL = 1
 LED_2_STRIP = ws.SK6812_STRIP_GRBW
 
-strip1 = Adafruit_NeoPixel(LED_1_COUNT, LED_1_PIN, LED_1_FREQ_HZ,
-                           LED_1_DMA, LED_1_INVERT, LED_1_BRIGHTNESS,
-                           LED_1_CHANNEL, LED_1_STRIP)
-strip2 = Adafruit_NeoPixel(LED_2_COUNT, LED_2_PIN, LED_2_FREQ_HZ,
-                           LED_2_DMA, LED_2_INVERT, LED_2_BRIGHTNESS,
-                           LED_2_CHANNEL, LED_2_STRIP)
+LED_CHANNELS = [
+    dict(num=LED_1_COUNT, pin=LED_1_PIN, invert=LED_1_INVERT,
+         brightness=LED_1_BRIGHTNESS, strip_type=LED_1_STRIP),
+    dict(num=LED_2_COUNT, pin=LED_2_PIN, invert=LED_2_INVERT,
+         brightness=LED_2_BRIGHTNESS, strip_type=LED_2_STRIP),
+]
+
+# Both strips are driven from one controller, one PWM channel each, so
+# a single render clocks out both (LED_1_FREQ_HZ and LED_1_DMA apply to both).
+# Set LED_REMOTE to the host running examples/network_receiver.py to run the
+# effects here and send the frames to it instead.
+if os.environ.get("LED_REMOTE"):
+    strips = NetworkMultiChannelPixelStrip(LED_CHANNELS, os.environ["LED_REMOTE"])
+else:
+    strips = MultiChannelPixelStrip(LED_CHANNELS, freq_hz=LED_1_FREQ_HZ, dma=LED_1_DMA)
+strip1, strip2 = strips
 
 # Global effect registry
 EFFECTS = {}
 
-# Currently running effect
-current_effect = {"name": None, "thread": None}
+# Every effect runs on the engine's thread, one at a time, so effects
+# never draw over each other.  Set LED_REALTIME to run it in real-time
+# mode, so the web server being busy doesn't hold up frames, and
+# LED_REALTIME_CPU to pin it to a core (eg. 3, with isolcpus=3 on the
+# kernel command line); it needs root for SCHED_FIFO and mlockall.
+realtime = None
+if os.environ.get("LED_REALTIME"):
+    cpu = os.environ.get("LED_REALTIME_CPU")
+    realtime = Realtime(cpu=int(cpu) if cpu else None, lock_memory=True)
+engine = Engine(strip1, strip2, realtime=realtime)
+# Set once what real-time mode managed to do has been printed
+realtime_reported = False
+
+# Set LED_SPIN_MS to busy-wait the last few milliseconds before each frame
+# rather than sleep through them, if frames start late (see the jitter
+# printed as each effect finishes) and the CPU time can be spared
+if os.environ.get("LED_SPIN_MS"):
+    FrameClock.spin = float(os.environ["LED_SPIN_MS"]) / 1000
+
+# The effect stopped by the last switch from start_effect, and when
+switch = {"requested": None, "stopped": None, "stop_latency": None}
+
+def effect_started(name):
+    global realtime_reported
+    if realtime is not None and not realtime_reported:
+        realtime_reported = True
+        print(f"Real-time mode: {', '.join(realtime.applied)}")
+        for failure in realtime.failed:
+            print(f"Real-time mode failed to set {failure}")
+    print(f"Running effect: {name}")
+    socketio.emit("status_update", {"status": f"Running {name}"})
+    if switch["requested"] is not None:
+        latency = time.monotonic() - switch["requested"]
+        switch["requested"] = None
+        print(f"Switched to {name} in {latency * 1000:.1f} ms")
+        socketio.emit("effect_switched", {
+            "stopped": switch["stopped"],
+            "stop_latency_ms": round((switch["stop_latency"] or 0) * 1000, 1),
+            "switch_latency_ms": round(latency * 1000, 1),
+        })
+
+def effect_finished(name, result):
+    if isinstance(result, Exception):
+        print(f"Error in effect {name}: {result}")
+    elif result["cancelled"]:
+        print(f" Effect: {name} Stopped in {result['stop_latency'] * 1000:.1f} ms")
+        switch["stopped"] = name
+        switch["stop_latency"] = result["stop_latency"]
+    else:
+        print(f" Effect: {name} Completed, {result['frames']} frames at {result['fps']:.1f} fps")
+    if not isinstance(result, Exception) and result["jitter_p99"] is not None:
+        print(f" Effect: {name} jitter p50 {result['jitter_p50'] * 1000:.2f} ms, "
+              f"p99 {result['jitter_p99'] * 1000:.2f} ms, max {result['jitter_max'] * 1000:.2f} ms, "
+              f"{result['missed_deadlines']} deadlines missed")
+        socketio.emit("effect_timing", {
+            "effect": name,
+            "missed_deadlines": result["missed_deadlines"],
+            **{key + "_ms": round(result[key] * 1000, 2)
+               for key in ("jitter_p50", "jitter_p90", "jitter_p99", "jitter_max")},
+        })
+    if not engine.busy:
+        socketio.emit("status_update", {"status": "Idle"})
+
+engine.started = effect_started
+engine.finished = effect_finished
 
 def register_effect(name, params=None):
     def decorator(fn):
@@ -403,10 +477,13 @@ def run_star_snake(duration=20, tail_length=30, speed=60,
 
 
 
-@register_effect("0 Blackout")
-def run_blackout():
-    blackout(strip1)    
-    blackout(strip2)         
+@register_effect("0 Blackout", params={"fade": {"min": 0, "max": 10, "default": 0, "step": 0.5}})
+def run_blackout(fade=0):
+    if fade:
+        fade_out(strip1, strip2, duration=float(fade))
+    else:
+        blackout(strip1)
+        blackout(strip2)
 
 def log_effect_run(effect_name, params, filename="effect_log.json"):
     entry = {"name": effect_name, "params": params}
@@ -461,136 +538,64 @@ def start_effect(data):
         emit("status_update", {"status": "Effect not found"})
         return
 
-    if current_effect["thread"] and current_effect["thread"].is_alive():
-        print(f"Stopping current effect: {current_effect['name']}")
-        # Optional: use threading.Event to signal stop
-
-    def run_effect():
-        print(f"Running effect: {name} with params {params}")
-
-        log_effect_run(name, params)
-        try:
-            EFFECTS[name]["function"](**params)
-        except Exception as e:
-            print(f"Error in effect: {e}")
-        
-        print(f" Effect: {name} Completed")
-        current_effect["name"] = None
-        socketio.emit("status_update", {"status": "Idle"})
+    print(f"Starting effect: {name} with params {params}")
+    log_effect_run(name, params)
+    if engine.busy:
+        # Stop the current effect within a frame rather than letting both
+        # draw to the strips
+        print(f"Stopping current effect: {engine.current}")
+        switch["requested"] = time.monotonic()
+        switch["stopped"] = engine.current
+        switch["stop_latency"] = None
+        engine.switch(EFFECTS[name]["function"], name=name, **params)
+    else:
+        engine.submit(EFFECTS[name]["function"], name=name, **params)
 
-    thread = threading.Thread(target=run_effect)
-    
-    thread.start()
-    current_effect["name"] = name
-    current_effect["thread"] = thread
-    socketio.emit("status_update", {"status": f"Running {name}"})
 
+def queue_sequence(filename, label):
+    """Queue each effect listed in a playback file on the engine."""
+    try:
+        with open(filename, "r") as f:
+            sequence = json.load(f)
+    except Exception as e:
+        print(f"Error loading {filename}: {e}")
+        socketio.emit("status_update", {"status": f"Error: {e}"})
+        return
+
+    for entry in sequence:
+        name = entry.get("name")
+        params = entry.get("params", {})
+        if name in EFFECTS:
+            engine.submit(EFFECTS[name]["function"], name=f"{name} ({label})", **params)
 
 
 @socketio.on("play_file")
 def play_file():
-    
-    if current_effect["thread"] and current_effect["thread"].is_alive():
+    if engine.busy:
         emit("status_update", {"status": "Busy — another effect is running"})
         return
-    try:
-        with open("playback.json", "r") as f:
-            sequence = json.load(f)
+    queue_sequence("playback.json", "from file")
 
-        def run_sequence():
-            for entry in sequence:
-                name = entry.get("name")
-                params = entry.get("params", {})
-                if name in EFFECTS:
-                    print(f"Playing effect from file: {name} with params {params}")
-                    socketio.emit("status_update", {"status": f"Running {name} from file"})
-                    EFFECTS[name]["function"](**params)
-            socketio.emit("status_update", {"status": "Idle"})
-
-        thread = threading.Thread(target=run_sequence)
-        thread.start()
-    except Exception as e:
-        print(f"Error loading or playing file: {e}")
-        socketio.emit("status_update", {"status": f"Error: {e}"})
-
-import threading, json
 
 @socketio.on("play_loserbaby")
 def play_loserbaby():
-    try:
-        with open("loserbaby_playback.json", "r") as f:
-            sequence = json.load(f)
-    except Exception as e:
-        print(f"Error loading Loserbaby JSON: {e}")
-        socketio.emit("status_update", {"status": f"Error: {e}"})
-        return
-
-    def run_sequence():
-        for entry in sequence:
-            name = entry.get("name")
-            params = entry.get("params", {})
-            if name in EFFECTS:
-                socketio.emit("status_update", {"status": f"Running {name} (Loserbaby)"})
-                try:
-                    EFFECTS[name]["function"](**params)
-                except Exception as e:
-                    print(f"Error in {name}: {e}")
-        socketio.emit("status_update", {"status": "Idle"})
-
-    threading.Thread(target=run_sequence).start()
+    queue_sequence("loserbaby_playback.json", "Loserbaby")
 
 
 @socketio.on("play_starwars")
 def play_starwars():
-    if current_effect["thread"] and current_effect["thread"].is_alive():
+    if engine.busy:
         emit("status_update", {"status": "Busy — another effect is running"})
         return
-    try:
-        with open("starwars_playback.json", "r") as f:
-            sequence = json.load(f)
-
-        def run_sequence():
-            for entry in sequence:
-                name = entry.get("name")
-                params = entry.get("params", {})
-                if name in EFFECTS:
-                    print(f"Playing Star Wars effect: {name} with params {params}")
-                    socketio.emit("status_update", {"status": f"Running {name} (Star Wars)"})
-                    EFFECTS[name]["function"](**params)
-            socketio.emit("status_update", {"status": "Idle"})
-
-        thread = threading.Thread(target=run_sequence)
-        thread.start()
-
-    except Exception as e:
-        print(f"Error playing Star Wars file: {e}")
-        socketio.emit("status_update", {"status": f"Error: {e}"})
+    queue_sequence("starwars_playback.json", "Star Wars")
 
 
 @socketio.on("play_champions")
 def play_champions():
-    if current_effect["thread"] and current_effect["thread"].is_alive():
+    if engine.busy:
         emit("status_update", {"status": "Busy — another effect is running"})
         return
-    try:
-        with open("we_are_the_champions_playback.json", "r") as f:
-            sequence = json.load(f)
-
-        def run_sequence():
-            for entry in sequence:
-                name = entry.get("name")
-                params = entry.get("params", {})
-                if name in EFFECTS:
-                    socketio.emit("status_update", {"status": f"Running {name} (Champions)"})
-                    EFFECTS[name]["function"](**params)
-            socketio.emit("status_update", {"status": "Idle"})
-
-        thread = threading.Thread(target=run_sequence)
-        current_effect["thread"] = thread
-        thread.start()
-    except Exception as e:
-        print(f"Error playing Champions file: {e}")
-        socketio.emit("status_update", {"status": f"Error: {e}"}) 
+    queue_sequence("we_are_the_champions_playback.json", "Champions")
 
 SCHEDULED_EFFECT_NAMES = [
     "Aurora Effect",
@@ -623,7 +628,7 @@ SCHEDULED_EFFECT_NAMES = [
 def scheduled_led_trigger():
     now = datetime.now()
 
-    if current_effect["thread"] and current_effect["thread"].is_alive():
+    if engine.busy:
         print(f"[{now.strftime('%H:%M:%S')}] Skipping — effect already running")
         return
 
@@ -639,25 +644,9 @@ def scheduled_led_trigger():
         else:
             params[param_name] = meta.get("default")
 
-    def run_effect():
-        try:
-            EFFECTS[effect]["function"](**params)
-        except Exception as e:
-            print(f"Scheduled effect error: {e}")
-        finally:
-            print(f"[{now.strftime('%H:%M:%S')}] Effect {effect} finished. Sleeping before blackout.")
-            time.sleep(2)
-            try:
-                EFFECTS["0 Blackout"]["function"]()
-                socketio.emit("status_update", {"status": "Idle"})
-            except Exception as e:
-                print(f"Error running blackout: {e}")
-
-    thread = threading.Thread(target=run_effect)
-    current_effect["name"] = effect
-    current_effect["thread"] = thread
-    thread.start()
-    socketio.emit("status_update", {"status": f"Running scheduled {effect}"})
+    # Fade out once it finishes
+    engine.submit(EFFECTS[effect]["function"], name=f"scheduled {effect}", **params)
+    engine.submit(EFFECTS["0 Blackout"]["function"], name="0 Blackout", fade=2.0)
 
 minutes = [0,5,10,15,20,25,30,35,40,45,50,55] # Every 5 minutues
 #minutes = [0,10,20,30,40,50]  # Every 10 minutes
@@ -666,8 +655,11 @@ minutes = [0,5,10,15,20,25,30,35,40,45,50,55] # Every 5 minutues
 
 minute_str = ",".join(str(m) for m in minutes)
 if __name__ == "__main__":
-    strip1.begin()
-    strip2.begin()
+    strips.begin()
+    # Set LED_RECORDING to a file name to record every frame sent to the
+    # strips, for replay with rpi_ws281x.read_frames()
+    if os.environ.get("LED_RECORDING"):
+        strips.start_recording(os.environ["LED_RECORDING"])
     blackout(strip1)
     blackout(strip2)
 
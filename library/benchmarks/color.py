@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# Compare the cost of building a frame of colors with the RGBW class,
+# the cached Color(), plain-int pack_rgbw() and pack_rgbw_array().
+# Runs anywhere: python3 benchmarks/color.py [LED count]
+import sys
+import timeit
+from array import array
+
+from rpi_ws281x import RGBW, Color, pack_rgbw, pack_rgbw_array
+
+LED_COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 1200
+FRAMES = 200
+
+# A frame of a typical effect: mostly background with a few lit pixels.
+pixels = [(0, 0, 0, 0) if i % 10 else (255, i % 256, 0, 0) for i in range(LED_COUNT)]
+red, green, blue, white = (array('B', channel) for channel in zip(*pixels))
+
+cases = [
+    ('RGBW(r, g, b, w)', lambda: [RGBW(*px) for px in pixels]),
+    ('Color(r, g, b, w)', lambda: [Color(*px) for px in pixels]),
+    ('pack_rgbw(r, g, b, w)', lambda: [pack_rgbw(*px) for px in pixels]),
+    ('pack_rgbw_array(array)', lambda: pack_rgbw_array(red, green, blue, white)),
+]
+
+try:
+    import numpy
+    np_red, np_green, np_blue, np_white = (numpy.frombuffer(channel, dtype=numpy.uint8)
+                                           for channel in (red, green, blue, white))
+    cases.append(('pack_rgbw_array(numpy)',
+                  lambda: pack_rgbw_array(np_red, np_green, np_blue, np_white)))
+except ImportError:
+    pass
+
+print('{0} LEDs, best of 5 x {1} frames'.format(LED_COUNT, FRAMES))
+baseline = None
+for name, frame in cases:
+    best = min(timeit.repeat(frame, number=FRAMES, repeat=5)) / FRAMES
+    baseline = baseline or best
+    print('{0:26s} {1:8.1f} us/frame {2:6.1f}x'.format(name, best * 1e6, baseline / best))
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# Per-call cost of the single pixel setters and getters, and of setting a
+# handful of scattered pixels as sparse effects do.
+#
+# Needs real hardware (and root): sudo python3 benchmarks/pixels.py
+# RPI_WS281X_BACKEND=simulator runs it anywhere, but then measures the
+# pure-Python simulator rather than the C extension.
+import timeit
+
+from rpi_ws281x import PixelStrip, Color
+
+LED_COUNT = 600
+LED_PIN = 18
+CALLS = 100000
+
+strip = PixelStrip(LED_COUNT, LED_PIN)
+strip.begin()
+scattered = list(range(0, LED_COUNT, 7))
+set_pixel = strip.set_pixel
+get_pixel = strip.get_pixel
+
+
+def scattered_loop():
+    for i in scattered:
+        strip.setPixelColor(i, 0x01020304)
+
+
+cases = [
+    ('setPixelColor(n, int)', lambda: strip.setPixelColor(5, 0x01020304), CALLS),
+    ('setPixelColor(n, Color(r, g, b, w))', lambda: strip.setPixelColor(5, Color(1, 2, 3, 4)), CALLS),
+    ('setPixelColorRGB(n, r, g, b, w)', lambda: strip.setPixelColorRGB(5, 1, 2, 3, 4), CALLS),
+    ('strip[n] = int', lambda: strip.__setitem__(5, 0x01020304), CALLS),
+    ('getPixelColor(n)', lambda: strip.getPixelColor(5), CALLS),
+    ('set_pixel(n, int)', lambda: set_pixel(5, 0x01020304), CALLS),
+    ('set_pixel(n, (r, g, b, w))', lambda: set_pixel(5, (1, 2, 3, 4)), CALLS),
+    ('get_pixel(n)', lambda: get_pixel(5), CALLS),
+    ('setPixelColor x {0}'.format(len(scattered)), scattered_loop, CALLS // 100),
+    ('set_many({0} indices)'.format(len(scattered)), lambda: strip.set_many(scattered, 0x01020304), CALLS // 100),
+]
+
+for name, call, number in cases:
+    best = min(timeit.repeat(call, number=number, repeat=5)) / number
+    print('{0:40s} {1:9.0f} ns'.format(name, best * 1e9))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# Measure how much work another Python thread gets done while the main
+# thread calls show() in a loop, compared to when it runs alone.  With the
+# GIL released while waiting for DMA, the counter thread should keep most
+# of its idle rate instead of stalling for the length of every frame.
+#
+# Needs real hardware (and root): sudo python3 benchmarks/show_threads.py
+import sys
+import threading
+import time
+
+from rpi_ws281x import PixelStrip, Color, ws
+
+LED_COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+LED_PIN = 18
+DURATION = 3.0
+
+
+def count_for(duration, stop):
+    # Busy loop in Python, so it needs the GIL to make progress.
+    count = 0
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end and not stop.is_set():
+        count += 1
+    return count
+
+
+def run(show=None):
+    stop = threading.Event()
+    result = []
+    thread = threading.Thread(target=lambda: result.append(count_for(DURATION, stop)))
+    frames = 0
+    thread.start()
+    if show is not None:
+        while thread.is_alive():
+            show()
+            frames += 1
+    thread.join()
+    return result[0], frames
+
+
+if __name__ == '__main__':
+    strip = PixelStrip(LED_COUNT, LED_PIN, strip_type=ws.SK6812_STRIP_GRBW)
+    strip.begin()
+    strip[:] = Color(0, 0, 0, 16)
+
+    idle, _ = run()
+    busy, frames = run(strip.show)
+
+    print('{0} LEDs, {1:.1f}s per run'.format(LED_COUNT, DURATION))
+    print('counter thread alone:      {0:12d}'.format(idle))
+    print('counter thread with show(): {0:11d} ({1:.0%}), {2} frames, {3:.1f} fps'.format(
+        busy, busy / idle, frames, frames / DURATION))
+    print('time waiting for DMA:      {0:.2f}s'.format(strip.total_wait_time))
+
+    strip[:] = 0
+    strip.show()
@@ -43,24 +43,478 @@ static int convert_iarray(PyObject *input, uint8_t *ptr, int size) {
 }
 %}
 
-%typemap(in) uint8_t * {
-   /* As a consequence of this malloc, I believe there's a potential memory leak
-   /  which would occur if gamma is set more than once.
-   /  The gamma value is only freed once at cleanup.
-   /  Using a typemap is also risky here, since it would apply to all *uint8_t,
+// Gamma tables live in a registry keyed by their contents, so setting the
+// same table on several channels (or setting it again) shares one copy
+// instead of allocating a new one each time.  The table is the first member
+// of its entry, so a channel's gamma pointer is also the entry's address.
+%{
+typedef struct ws2811_gamma_entry
+{
+    uint8_t table[256];
+    int refcount;
+    struct ws2811_gamma_entry *next;
+} ws2811_gamma_entry_t;
+
+static ws2811_gamma_entry_t *ws2811_gamma_registry = NULL;
+
+static uint8_t *ws2811_gamma_acquire(const uint8_t *table)
+{
+    ws2811_gamma_entry_t *entry;
+
+    for (entry = ws2811_gamma_registry; entry; entry = entry->next)
+    {
+        if (memcmp(entry->table, table, sizeof(entry->table)) == 0)
+        {
+            entry->refcount++;
+            return entry->table;
+        }
+    }
+
+    entry = malloc(sizeof(*entry));
+    if (!entry)
+    {
+        return NULL;
+    }
+
+    memcpy(entry->table, table, sizeof(entry->table));
+    entry->refcount = 1;
+    entry->next = ws2811_gamma_registry;
+    ws2811_gamma_registry = entry;
+
+    return entry->table;
+}
+
+static void ws2811_gamma_release(uint8_t *table)
+{
+    ws2811_gamma_entry_t **link;
+
+    if (!table)
+    {
+        return;
+    }
+
+    for (link = &ws2811_gamma_registry; *link; link = &(*link)->next)
+    {
+        if ((*link)->table == table)
+        {
+            ws2811_gamma_entry_t *entry = *link;
+
+            if (--entry->refcount == 0)
+            {
+                *link = entry->next;
+                free(entry);
+            }
+            return;
+        }
+    }
+
+    // Not from the registry: the identity table ws2811_init() allocates
+    // for a channel without one.
+    free(table);
+}
+%}
+
+%typemap(in) uint8_t * (uint8_t table[256]) {
+   /* Using a typemap is risky here, since it would apply to all *uint8_t,
    /  this type is presently only used for the gamma table.
    */
-   $1 = malloc(sizeof(uint8_t) * 256);
-   if (!convert_iarray($input,$1,256)) {
-      return NULL;
+   if (!convert_iarray($input, table, 256)) {
+      SWIG_fail;
+   }
+   $1 = ws2811_gamma_acquire(table);
+   if (!$1) {
+      PyErr_NoMemory();
+      SWIG_fail;
    }
 }
 
+%typemap(memberin) uint8_t * {
+   ws2811_gamma_release($1);
+   $1 = $input;
+}
+
 // Declare functions which will be exported as anything in the ws2811.h header.
 %{
+#include <math.h>
+
 #include "lib/ws2811.h"
 %}
 
+// Helpers for the bulk LED buffer functions below.
+%{
+static int ws2811_check_range(ws2811_channel_t *channel, int start, int step, int count)
+{
+    long long last = (long long)start + (long long)(count - 1) * step;
+
+    if (channel->leds == NULL)
+    {
+        PyErr_SetString(PyExc_RuntimeError, "LED buffer is not allocated, call begin() first");
+        return 0;
+    }
+
+    if (count < 0 || (count > 0 && (start < 0 || start >= channel->count ||
+                                    last < 0 || last >= channel->count)))
+    {
+        PyErr_SetString(PyExc_IndexError, "LED index out of range");
+        return 0;
+    }
+
+    return 1;
+}
+
+static int ws2811_get_colors(PyObject *input, Py_buffer *view)
+{
+    if (PyObject_GetBuffer(input, view, PyBUF_C_CONTIGUOUS) != 0)
+    {
+        return 0;
+    }
+
+    if ((view->itemsize != 1 && view->itemsize != sizeof(ws2811_led_t)) ||
+        view->len % sizeof(ws2811_led_t) != 0)
+    {
+        PyBuffer_Release(view);
+        PyErr_SetString(PyExc_TypeError, "Expecting a buffer of packed 32-bit colors");
+        return 0;
+    }
+
+    return 1;
+}
+
+static void ws2811_snapshot_update(char **pos, const void *data, size_t len, int *changed)
+{
+    if (!*changed && memcmp(*pos, data, len) != 0)
+    {
+        *changed = 1;
+    }
+
+    if (*changed)
+    {
+        memcpy(*pos, data, len);
+    }
+
+    *pos += len;
+}
+
+// As ws2811_snapshot_update() for an LED buffer, returning the number of
+// LEDs that differ from the snapshot (all of them if changed is set).
+static int ws2811_snapshot_count(char **pos, const ws2811_led_t *leds, int count, int changed)
+{
+    size_t len = count * sizeof(ws2811_led_t);
+    int differ = 0;
+    int i;
+
+    if (changed)
+    {
+        differ = count;
+        memcpy(*pos, leds, len);
+    }
+    else if (memcmp(*pos, leds, len) != 0)
+    {
+        // The snapshot isn't aligned for ws2811_led_t, so compare by memcmp
+        for (i = 0; i < count; i++)
+        {
+            char *old = *pos + i * sizeof(ws2811_led_t);
+
+            if (memcmp(old, &leds[i], sizeof(ws2811_led_t)) != 0)
+            {
+                memcpy(old, &leds[i], sizeof(ws2811_led_t));
+                differ++;
+            }
+        }
+    }
+
+    *pos += len;
+    return differ;
+}
+
+static int ws2811_get_color(PyObject *input, ws2811_led_t *color)
+{
+    PyObject *seq, **items;
+    Py_ssize_t size, i;
+    ws2811_led_t result = 0;
+
+    if (PyLong_Check(input))
+    {
+        unsigned long value = PyLong_AsUnsignedLong(input);
+
+        if (value == (unsigned long)-1 && PyErr_Occurred())
+        {
+            return 0;
+        }
+        if (value > 0xffffffffUL)
+        {
+            PyErr_SetString(PyExc_OverflowError, "Color does not fit in 32 bits");
+            return 0;
+        }
+
+        *color = (ws2811_led_t)value;
+        return 1;
+    }
+
+    // An (r, g, b) or (r, g, b, w) sequence
+    seq = PySequence_Fast(input, "Expecting a 32-bit color or an (r, g, b[, w]) sequence");
+    if (seq == NULL)
+    {
+        return 0;
+    }
+
+    size = PySequence_Fast_GET_SIZE(seq);
+    if (size != 3 && size != 4)
+    {
+        Py_DECREF(seq);
+        PyErr_SetString(PyExc_ValueError, "Expecting an (r, g, b[, w]) sequence");
+        return 0;
+    }
+
+    items = PySequence_Fast_ITEMS(seq);
+    for (i = 0; i < size; i++)
+    {
+        long component = PyLong_AsLong(items[i]);
+
+        if (component == -1 && PyErr_Occurred())
+        {
+            Py_DECREF(seq);
+            return 0;
+        }
+        if (component < 0 || component > 255)
+        {
+            Py_DECREF(seq);
+            PyErr_SetString(PyExc_ValueError, "Color components must be between 0 and 255");
+            return 0;
+        }
+
+        // r, g, b go in bits 16, 8 and 0, w in bits 24
+        result |= (ws2811_led_t)component << (i == 3 ? 24 : 16 - 8 * i);
+    }
+
+    Py_DECREF(seq);
+    *color = result;
+    return 1;
+}
+
+static int ws2811_get_index(ws2811_channel_t *channel, PyObject *input, Py_ssize_t *index)
+{
+    Py_ssize_t value = PyNumber_AsSsize_t(input, PyExc_IndexError);
+
+    if (value == -1 && PyErr_Occurred())
+    {
+        return 0;
+    }
+
+    if (value < 0)
+    {
+        value += channel->count;
+    }
+
+    if (value < 0 || value >= channel->count)
+    {
+        PyErr_SetString(PyExc_IndexError, "LED index out of range");
+        return 0;
+    }
+
+    *index = value;
+    return 1;
+}
+
+// The per-pixel accessors below are builtin functions bound to a capsule
+// holding the channel, so a call skips SWIG's argument conversion.  The
+// capsule context is cleared by ws2811_led_accessor_release() once the
+// channel is freed.
+#define WS2811_ACCESSOR "ws2811_channel_t accessor"
+
+static ws2811_channel_t *ws2811_accessor_channel(PyObject *self)
+{
+    ws2811_channel_t *channel = (ws2811_channel_t *)PyCapsule_GetContext(self);
+
+    if (channel == NULL || channel->leds == NULL)
+    {
+        PyErr_SetString(PyExc_RuntimeError, "LED buffer is not allocated, call begin() first");
+        return NULL;
+    }
+
+    return channel;
+}
+
+#if PY_VERSION_HEX >= 0x03070000
+#define WS2811_ACCESSOR_FLAGS METH_FASTCALL
+#define WS2811_ACCESSOR_ARGS PyObject *const *args, Py_ssize_t nargs
+#define WS2811_ACCESSOR_UNPACK
+#else
+#define WS2811_ACCESSOR_FLAGS METH_VARARGS
+#define WS2811_ACCESSOR_ARGS PyObject *argtuple
+#define WS2811_ACCESSOR_UNPACK \
+    PyObject **args = &PyTuple_GET_ITEM(argtuple, 0); \
+    Py_ssize_t nargs = PyTuple_GET_SIZE(argtuple);
+#endif
+
+static PyObject *ws2811_accessor_set(PyObject *self, WS2811_ACCESSOR_ARGS)
+{
+    WS2811_ACCESSOR_UNPACK
+    ws2811_channel_t *channel;
+    Py_ssize_t index;
+    ws2811_led_t color;
+
+    if (nargs != 2)
+    {
+        PyErr_Format(PyExc_TypeError, "set_pixel() takes 2 arguments (%zd given)", nargs);
+        return NULL;
+    }
+
+    if ((channel = ws2811_accessor_channel(self)) == NULL ||
+        !ws2811_get_index(channel, args[0], &index) ||
+        !ws2811_get_color(args[1], &color))
+    {
+        return NULL;
+    }
+
+    channel->leds[index] = color;
+    Py_RETURN_NONE;
+}
+
+static PyObject *ws2811_accessor_get(PyObject *self, WS2811_ACCESSOR_ARGS)
+{
+    WS2811_ACCESSOR_UNPACK
+    ws2811_channel_t *channel;
+    Py_ssize_t index;
+
+    if (nargs != 1)
+    {
+        PyErr_Format(PyExc_TypeError, "get_pixel() takes 1 argument (%zd given)", nargs);
+        return NULL;
+    }
+
+    if ((channel = ws2811_accessor_channel(self)) == NULL ||
+        !ws2811_get_index(channel, args[0], &index))
+    {
+        return NULL;
+    }
+
+    return PyLong_FromUnsignedLong(channel->leds[index]);
+}
+
+static PyMethodDef ws2811_accessor_set_def = {
+    "set_pixel", (PyCFunction)(void (*)(void))ws2811_accessor_set, WS2811_ACCESSOR_FLAGS,
+    "set_pixel(n, color)\n\nSet LED n to a 32-bit color or an (r, g, b[, w]) tuple."
+};
+
+static PyMethodDef ws2811_accessor_get_def = {
+    "get_pixel", (PyCFunction)(void (*)(void))ws2811_accessor_get, WS2811_ACCESSOR_FLAGS,
+    "get_pixel(n)\n\nReturn the 32-bit color of LED n."
+};
+
+static PyObject *ws2811_accessor_new(ws2811_channel_t *channel, PyMethodDef *def)
+{
+    PyObject *capsule, *function;
+
+    capsule = PyCapsule_New(channel, WS2811_ACCESSOR, NULL);
+    if (capsule == NULL)
+    {
+        return NULL;
+    }
+
+    if (PyCapsule_SetContext(capsule, channel) != 0)
+    {
+        Py_DECREF(capsule);
+        return NULL;
+    }
+
+    function = PyCFunction_New(def, capsule);
+    Py_DECREF(capsule);
+    return function;
+}
+
+#define WS2811_WHITE_NONE 0
+#define WS2811_WHITE_ADD 1
+#define WS2811_WHITE_REPLACE 2
+
+// Correction and remapping for ws2811_render_corrected().  If map is set,
+// output LED i shows input LED map[i], or is off if that is out of range.
+// If tables is set it holds a 256 entry lookup table for each of red,
+// green, blue and white, in that order.
+static void ws2811_correct(const ws2811_led_t *in, ws2811_led_t *out, int count,
+                           const int32_t *map, const uint8_t *tables, int white)
+{
+    const uint8_t *rtable, *gtable, *btable, *wtable;
+    int i;
+
+    if (!tables)
+    {
+        for (i = 0; i < count; i++)
+        {
+            out[i] = (uint32_t)map[i] < (uint32_t)count ? in[map[i]] : 0;
+        }
+        return;
+    }
+
+    rtable = tables;
+    gtable = tables + 256;
+    btable = tables + 512;
+    wtable = tables + 768;
+
+    for (i = 0; i < count; i++)
+    {
+        ws2811_led_t color;
+        int r, g, b, w;
+
+        if (map)
+        {
+            color = (uint32_t)map[i] < (uint32_t)count ? in[map[i]] : 0;
+        }
+        else
+        {
+            color = in[i];
+        }
+
+        r = (color >> 16) & 0xff;
+        g = (color >> 8) & 0xff;
+        b = color & 0xff;
+        w = (color >> 24) & 0xff;
+
+        if (white != WS2811_WHITE_NONE)
+        {
+            int common = r < g ? r : g;
+
+            common = common < b ? common : b;
+            if (white == WS2811_WHITE_REPLACE)
+            {
+                r -= common;
+                g -= common;
+                b -= common;
+            }
+            w = w + common > 255 ? 255 : w + common;
+        }
+
+        out[i] = ((ws2811_led_t)wtable[w] << 24) | ((ws2811_led_t)rtable[r] << 16) |
+                 ((ws2811_led_t)gtable[g] << 8) | btable[b];
+    }
+}
+%}
+
+// Let other Python threads run while ws2811_init() sets up the hardware
+// and ws2811_wait() waits for the DMA transfer to finish.  Neither touches
+// the LED buffers, which are only read by ws2811_render() with the GIL held.
+%define RELEASE_GIL(function)
+%exception function {
+    Py_BEGIN_ALLOW_THREADS
+    $action
+    Py_END_ALLOW_THREADS
+}
+%enddef
+
+RELEASE_GIL(py_ws2811_init)
+RELEASE_GIL(ws2811_wait)
+
+// The library frees each channel's gamma table in ws2811_fini() (and when
+// ws2811_init() fails), and ws2811_set_custom_gamma_factor() rewrites it in
+// place.  Either would break a table shared through the registry above, so
+// these are replaced by versions that go through it.
+%ignore ws2811_init;
+%ignore ws2811_fini;
+%ignore ws2811_set_custom_gamma_factor;
+%rename(ws2811_init) py_ws2811_init;
+%rename(ws2811_fini) py_ws2811_fini;
+%rename(ws2811_set_custom_gamma_factor) py_ws2811_set_custom_gamma_factor;
+
 // Process ws2811.h header and export all included functions.
 %include "lib/ws2811.h"
 
@@ -91,4 +545,534 @@ static int convert_iarray(PyObject *input, uint8_t *ptr, int size) {
     {
         return &ws->channel[channelnum];
     }
+
+    PyObject *ws2811_leds_set(ws2811_channel_t *channel, int offset, PyObject *buffer)
+    {
+        Py_buffer view;
+        Py_ssize_t count;
+
+        if (channel->leds == NULL)
+        {
+            PyErr_SetString(PyExc_RuntimeError, "LED buffer is not allocated, call begin() first");
+            return NULL;
+        }
+
+        if (offset < 0 || offset > channel->count)
+        {
+            PyErr_SetString(PyExc_IndexError, "Offset out of range");
+            return NULL;
+        }
+
+        if (!ws2811_get_colors(buffer, &view))
+        {
+            return NULL;
+        }
+
+        count = view.len / sizeof(ws2811_led_t);
+        if (count > channel->count - offset)
+        {
+            PyBuffer_Release(&view);
+            PyErr_SetString(PyExc_ValueError, "Buffer is larger than the LED buffer");
+            return NULL;
+        }
+
+        memcpy(channel->leds + offset, view.buf, count * sizeof(ws2811_led_t));
+        PyBuffer_Release(&view);
+
+        return PyLong_FromSsize_t(count);
+    }
+
+    PyObject *ws2811_leds_view(ws2811_channel_t *channel)
+    {
+        if (channel->leds == NULL)
+        {
+            PyErr_SetString(PyExc_RuntimeError, "LED buffer is not allocated, call begin() first");
+            return NULL;
+        }
+
+        return PyMemoryView_FromMemory((char *)channel->leds,
+                                       channel->count * sizeof(ws2811_led_t), PyBUF_WRITE);
+    }
+
+    PyObject *ws2811_leds_get_range(ws2811_channel_t *channel, int start, int step, int count)
+    {
+        PyObject *result;
+        ws2811_led_t *colors;
+        int i;
+
+        if (!ws2811_check_range(channel, start, step, count))
+        {
+            return NULL;
+        }
+
+        result = PyBytes_FromStringAndSize(NULL, count * sizeof(ws2811_led_t));
+        if (result == NULL)
+        {
+            return NULL;
+        }
+
+        colors = (ws2811_led_t *)PyBytes_AS_STRING(result);
+        if (step == 1)
+        {
+            memcpy(colors, channel->leds + start, count * sizeof(ws2811_led_t));
+        }
+        else
+        {
+            for (i = 0; i < count; i++)
+            {
+                colors[i] = channel->leds[start + i * step];
+            }
+        }
+
+        return result;
+    }
+
+    PyObject *ws2811_leds_set_range(ws2811_channel_t *channel, int start, int step, int count, PyObject *buffer)
+    {
+        Py_buffer view;
+        const ws2811_led_t *colors;
+        int i;
+
+        if (!ws2811_check_range(channel, start, step, count) ||
+            !ws2811_get_colors(buffer, &view))
+        {
+            return NULL;
+        }
+
+        if (view.len != count * (Py_ssize_t)sizeof(ws2811_led_t))
+        {
+            PyErr_Format(PyExc_ValueError, "attempt to assign %zd colors to a range of %d LEDs",
+                         view.len / (Py_ssize_t)sizeof(ws2811_led_t), count);
+            PyBuffer_Release(&view);
+            return NULL;
+        }
+
+        colors = (const ws2811_led_t *)view.buf;
+        if (step == 1)
+        {
+            memmove(channel->leds + start, colors, count * sizeof(ws2811_led_t));
+        }
+        else
+        {
+            for (i = 0; i < count; i++)
+            {
+                channel->leds[start + i * step] = colors[i];
+            }
+        }
+
+        PyBuffer_Release(&view);
+        Py_RETURN_NONE;
+    }
+
+    PyObject *ws2811_leds_fill_range(ws2811_channel_t *channel, int start, int step, int count, uint32_t color)
+    {
+        int i;
+
+        if (!ws2811_check_range(channel, start, step, count))
+        {
+            return NULL;
+        }
+
+        if (step == 1 && color == (color & 0xff) * 0x01010101u)
+        {
+            // All four bytes are equal, eg. black or full white
+            memset(channel->leds + start, color & 0xff, count * sizeof(ws2811_led_t));
+        }
+        else
+        {
+            for (i = 0; i < count; i++)
+            {
+                channel->leds[start + i * step] = color;
+            }
+        }
+
+        Py_RETURN_NONE;
+    }
+
+    PyObject *ws2811_leds_changed(ws2811_t *ws2811, PyObject *snapshot)
+    {
+        static const uint8_t no_gamma[256];
+        Py_ssize_t size = 0;
+        int changed = 0, resized, any = 0;
+        char *pos;
+        int chan;
+
+        if (!PyByteArray_Check(snapshot))
+        {
+            PyErr_SetString(PyExc_TypeError, "Expecting a bytearray");
+            return NULL;
+        }
+
+        for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
+        {
+            ws2811_channel_t *channel = &ws2811->channel[chan];
+
+            size += sizeof(channel->strip_type) + sizeof(channel->brightness) + sizeof(no_gamma);
+            if (channel->leds)
+            {
+                size += channel->count * sizeof(ws2811_led_t);
+            }
+        }
+
+        resized = PyByteArray_GET_SIZE(snapshot) != size;
+        if (resized && PyByteArray_Resize(snapshot, size) != 0)
+        {
+            return NULL;
+        }
+
+        // Count the LEDs whose output changes: all of a channel's if its
+        // settings changed, else those that differ.
+        pos = PyByteArray_AS_STRING(snapshot);
+        for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
+        {
+            ws2811_channel_t *channel = &ws2811->channel[chan];
+            int settings = resized;
+
+            ws2811_snapshot_update(&pos, &channel->strip_type, sizeof(channel->strip_type), &settings);
+            ws2811_snapshot_update(&pos, &channel->brightness, sizeof(channel->brightness), &settings);
+            ws2811_snapshot_update(&pos, channel->gamma ? channel->gamma : no_gamma, sizeof(no_gamma), &settings);
+            if (channel->leds)
+            {
+                changed += ws2811_snapshot_count(&pos, channel->leds, channel->count, settings);
+            }
+            any |= settings;
+        }
+
+        // A change of settings with no LEDs still counts as a change
+        if (any && changed == 0)
+        {
+            changed = 1;
+        }
+
+        return PyLong_FromLong(changed);
+    }
+
+    PyObject *ws2811_led_setter(ws2811_channel_t *channel)
+    {
+        return ws2811_accessor_new(channel, &ws2811_accessor_set_def);
+    }
+
+    PyObject *ws2811_led_getter(ws2811_channel_t *channel)
+    {
+        return ws2811_accessor_new(channel, &ws2811_accessor_get_def);
+    }
+
+    PyObject *ws2811_led_accessor_release(PyObject *accessor)
+    {
+        PyObject *capsule;
+
+        if (!PyCFunction_Check(accessor) ||
+            !PyCapsule_IsValid(capsule = PyCFunction_GET_SELF(accessor), WS2811_ACCESSOR))
+        {
+            PyErr_SetString(PyExc_TypeError, "Expecting a function from ws2811_led_setter() or ws2811_led_getter()");
+            return NULL;
+        }
+
+        PyCapsule_SetContext(capsule, NULL);
+        Py_RETURN_NONE;
+    }
+
+    PyObject *ws2811_leds_set_many(ws2811_channel_t *channel, PyObject *indices, PyObject *colors)
+    {
+        PyObject *index_seq, *color_seq = NULL;
+        Py_ssize_t count, i, index;
+        ws2811_led_t color = 0;
+        int ok = 0;
+
+        if (channel->leds == NULL)
+        {
+            PyErr_SetString(PyExc_RuntimeError, "LED buffer is not allocated, call begin() first");
+            return NULL;
+        }
+
+        index_seq = PySequence_Fast(indices, "Expecting a sequence of LED indices");
+        if (index_seq == NULL)
+        {
+            return NULL;
+        }
+        count = PySequence_Fast_GET_SIZE(index_seq);
+
+        // Either one color for all the LEDs, or a sequence of one per LED
+        if (PyLong_Check(colors))
+        {
+            if (!ws2811_get_color(colors, &color))
+            {
+                goto done;
+            }
+        }
+        else
+        {
+            color_seq = PySequence_Fast(colors, "Expecting a color or a sequence of colors");
+            if (color_seq == NULL)
+            {
+                goto done;
+            }
+            if (PySequence_Fast_GET_SIZE(color_seq) != count)
+            {
+                PyErr_Format(PyExc_ValueError, "attempt to assign %zd colors to %zd LEDs",
+                             PySequence_Fast_GET_SIZE(color_seq), count);
+                goto done;
+            }
+        }
+
+        for (i = 0; i < count; i++)
+        {
+            if (!ws2811_get_index(channel, PySequence_Fast_GET_ITEM(index_seq, i), &index) ||
+                (color_seq && !ws2811_get_color(PySequence_Fast_GET_ITEM(color_seq, i), &color)))
+            {
+                goto done;
+            }
+            channel->leds[index] = color;
+        }
+        ok = 1;
+
+    done:
+        Py_DECREF(index_seq);
+        Py_XDECREF(color_seq);
+        if (!ok)
+        {
+            return NULL;
+        }
+        Py_RETURN_NONE;
+    }
+    ws2811_return_t py_ws2811_init(ws2811_t *ws2811)
+    {
+        uint8_t *gamma[RPI_PWM_CHANNELS];
+        ws2811_return_t ret;
+        int chan;
+
+        // Hide the shared tables from ws2811_init(), then swap them back in
+        // for the identity tables it allocates in their place.
+        for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
+        {
+            gamma[chan] = ws2811->channel[chan].gamma;
+            ws2811->channel[chan].gamma = NULL;
+        }
+
+        ret = ws2811_init(ws2811);
+
+        for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
+        {
+            ws2811_channel_t *channel = &ws2811->channel[chan];
+
+            if (gamma[chan])
+            {
+                free(channel->gamma);
+                channel->gamma = gamma[chan];
+            }
+        }
+
+        return ret;
+    }
+
+    void py_ws2811_fini(ws2811_t *ws2811)
+    {
+        int chan;
+
+        for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
+        {
+            ws2811_gamma_release(ws2811->channel[chan].gamma);
+            ws2811->channel[chan].gamma = NULL;
+        }
+
+        if (ws2811->device)
+        {
+            ws2811_fini(ws2811);
+        }
+        else
+        {
+            // Buffers from ws2811_leds_alloc()
+            for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
+            {
+                free(ws2811->channel[chan].leds);
+                ws2811->channel[chan].leds = NULL;
+            }
+        }
+    }
+
+    ws2811_return_t ws2811_leds_alloc(ws2811_t *ws2811)
+    {
+        int chan;
+
+        // LED buffers for a controller that is never rendered to the
+        // hardware, eg. one sending its frames over the network, so
+        // ws2811_init() is never called.  py_ws2811_fini() frees them.
+        for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
+        {
+            ws2811_channel_t *channel = &ws2811->channel[chan];
+
+            if (channel->leds || !channel->count)
+            {
+                continue;
+            }
+
+            channel->leds = calloc(channel->count, sizeof(ws2811_led_t));
+            if (!channel->leds)
+            {
+                return WS2811_ERROR_OUT_OF_MEMORY;
+            }
+        }
+
+        return WS2811_SUCCESS;
+    }
+
+    void py_ws2811_set_custom_gamma_factor(ws2811_t *ws2811, double gamma_factor)
+    {
+        uint8_t table[256];
+        int chan, counter;
+
+        for (counter = 0; counter < 256; counter++)
+        {
+            table[counter] = (gamma_factor > 0) ? (int)(pow((float)counter / (float)255.00, gamma_factor) * 255.00 + 0.5) : counter;
+        }
+
+        for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
+        {
+            ws2811_channel_t *channel = &ws2811->channel[chan];
+            uint8_t *shared;
+
+            if (!channel->gamma)
+            {
+                continue;
+            }
+
+            shared = ws2811_gamma_acquire(table);
+            if (!shared)
+            {
+                // Out of memory: keep the current table
+                continue;
+            }
+
+            ws2811_gamma_release(channel->gamma);
+            channel->gamma = shared;
+        }
+    }
+
+    PyObject *ws2811_render_corrected(ws2811_t *ws2811, PyObject *corrections)
+    {
+        Py_buffer tables[RPI_PWM_CHANNELS], map[RPI_PWM_CHANNELS], scratch[RPI_PWM_CHANNELS];
+        ws2811_led_t *leds[RPI_PWM_CHANNELS];
+        PyObject *result = NULL;
+        ws2811_return_t ret;
+        int chan, white;
+
+        if (!PySequence_Check(corrections) || PySequence_Size(corrections) != RPI_PWM_CHANNELS)
+        {
+            PyErr_SetString(PyExc_TypeError, "Expecting a correction or None for each channel");
+            return NULL;
+        }
+
+        for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
+        {
+            tables[chan].obj = NULL;
+            map[chan].obj = NULL;
+            scratch[chan].obj = NULL;
+            leds[chan] = NULL;
+        }
+
+        // Correct and remap each channel into its scratch buffer, then render
+        // from that in place of the LED buffer, which keeps the colors in
+        // the order they were set.
+        for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
+        {
+            ws2811_channel_t *channel = &ws2811->channel[chan];
+            PyObject *item = PySequence_GetItem(corrections, chan);
+            PyObject *table_obj, *map_obj;
+            Py_ssize_t size = channel->count * sizeof(ws2811_led_t);
+            int ok;
+
+            if (item == NULL)
+            {
+                goto done;
+            }
+            if (item == Py_None || channel->leds == NULL)
+            {
+                Py_DECREF(item);
+                continue;
+            }
+
+            ok = PyArg_ParseTuple(item, "OiOw*", &table_obj, &white, &map_obj, &scratch[chan]);
+            Py_DECREF(item);
+            if (!ok)
+            {
+                goto done;
+            }
+
+            if (table_obj != Py_None)
+            {
+                if (PyObject_GetBuffer(table_obj, &tables[chan], PyBUF_SIMPLE) != 0)
+                {
+                    goto done;
+                }
+                if (tables[chan].len != 4 * 256)
+                {
+                    PyErr_SetString(PyExc_ValueError, "Expecting 4 tables of 256 levels");
+                    goto done;
+                }
+            }
+            if (map_obj != Py_None)
+            {
+                if (PyObject_GetBuffer(map_obj, &map[chan], PyBUF_SIMPLE) != 0)
+                {
+                    goto done;
+                }
+                if (map[chan].len != size)
+                {
+                    PyErr_SetString(PyExc_ValueError, "Expecting one 32-bit index per LED");
+                    goto done;
+                }
+            }
+            if (scratch[chan].len < size)
+            {
+                PyErr_SetString(PyExc_ValueError, "Scratch buffer is smaller than the LED buffer");
+                goto done;
+            }
+
+            if (tables[chan].obj || map[chan].obj)
+            {
+                ws2811_correct(channel->leds, scratch[chan].buf, channel->count,
+                               map[chan].obj ? map[chan].buf : NULL,
+                               tables[chan].obj ? tables[chan].buf : NULL, white);
+                leds[chan] = channel->leds;
+            }
+        }
+
+        for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
+        {
+            if (leds[chan])
+            {
+                ws2811->channel[chan].leds = scratch[chan].buf;
+            }
+        }
+
+        ret = ws2811_render(ws2811);
+
+        for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
+        {
+            if (leds[chan])
+            {
+                ws2811->channel[chan].leds = leds[chan];
+            }
+        }
+
+        result = PyLong_FromLong(ret);
+
+    done:
+        for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
+        {
+            if (tables[chan].obj)
+            {
+                PyBuffer_Release(&tables[chan]);
+            }
+            if (map[chan].obj)
+            {
+                PyBuffer_Release(&map[chan]);
+            }
+            if (scratch[chan].obj)
+            {
+                PyBuffer_Release(&scratch[chan]);
+            }
+        }
+        return result;
+    }
 %}
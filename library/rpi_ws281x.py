@@ -221,3 +221,51 @@ def ws2811_led_set(channel, lednum, color):
 
 def ws2811_channel_get(ws, channelnum):
     return _rpi_ws281x.ws2811_channel_get(ws, channelnum)
+
+
+def ws2811_leds_set(channel, offset, buffer):
+    return _rpi_ws281x.ws2811_leds_set(channel, offset, buffer)
+
+
+def ws2811_leds_view(channel):
+    return _rpi_ws281x.ws2811_leds_view(channel)
+
+
+def ws2811_leds_get_range(channel, start, step, count):
+    return _rpi_ws281x.ws2811_leds_get_range(channel, start, step, count)
+
+
+def ws2811_leds_set_range(channel, start, step, count, buffer):
+    return _rpi_ws281x.ws2811_leds_set_range(channel, start, step, count, buffer)
+
+
+def ws2811_leds_fill_range(channel, start, step, count, color):
+    return _rpi_ws281x.ws2811_leds_fill_range(channel, start, step, count, color)
+
+
+def ws2811_leds_changed(ws2811, snapshot):
+    return _rpi_ws281x.ws2811_leds_changed(ws2811, snapshot)
+
+
+def ws2811_led_setter(channel):
+    return _rpi_ws281x.ws2811_led_setter(channel)
+
+
+def ws2811_led_getter(channel):
+    return _rpi_ws281x.ws2811_led_getter(channel)
+
+
+def ws2811_led_accessor_release(accessor):
+    return _rpi_ws281x.ws2811_led_accessor_release(accessor)
+
+
+def ws2811_leds_set_many(channel, indices, colors):
+    return _rpi_ws281x.ws2811_leds_set_many(channel, indices, colors)
+
+
+def ws2811_render_corrected(ws2811, corrections):
+    return _rpi_ws281x.ws2811_render_corrected(ws2811, corrections)
+
+
+def ws2811_leds_alloc(ws2811):
+    return _rpi_ws281x.ws2811_leds_alloc(ws2811)
@@ -1,5 +1,16 @@
 # New canonical package, to support `import rpi_ws281x`
-from .rpi_ws281x import PixelStrip, Adafruit_NeoPixel, Color, RGBW, ws
-from _rpi_ws281x import *
+from .rpi_ws281x import PixelStrip, MultiChannelPixelStrip, PixelStripChannel, Adafruit_NeoPixel, Color, RGBW, ws
+from .rpi_ws281x import ColorCorrection, PixelStripSegment, RAMP_CURVES, RENDER_HISTOGRAM_EDGES
+from .rpi_ws281x import pack_rgbw, pack_rgbw_array, unpack_rgbw_array
+from .rpi_ws281x import gamma_table, GAMMA_IDENTITY, GAMMA_2_2, GAMMA_2_8
+from .rpi_ws281x import reverse_mapping, mirror_mapping, serpentine_mapping, skip_mapping
+from .recorder import FrameRecorder, read_frames
+from .network import NetworkPixelStrip, NetworkMultiChannelPixelStrip, NetworkReceiver
+from .aio import AsyncPixelStrip
+from .rpi_ws281x import _simulated
+if _simulated:
+    from .simulator import *
+else:
+    from _rpi_ws281x import *
 
 __version__ = '5.0.0'
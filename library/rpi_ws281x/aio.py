@@ -0,0 +1,58 @@
+# asyncio support: awaitable show() and wait(), so one event loop can drive
+# the LEDs alongside network and other inputs without a thread per effect.
+import asyncio
+
+
+class AsyncPixelStrip(object):
+    def __init__(self, strip, executor=None):
+        """Wrap strip, a PixelStrip, one of the channels of a
+        MultiChannelPixelStrip or a MultiChannelPixelStrip, so begin(),
+        show() and wait() can be awaited.  Waiting for a frame to be clocked
+        out happens in executor (default the event loop's), where the library
+        releases the GIL, while rendering it happens in the event loop, so
+        the loop is never blocked for longer than a render.  Everything else
+        is passed through to strip, eg. strip[0] = Color(255, 0, 0).
+        frame_ready, if set, is called in the executor.
+        """
+        self.strip = strip
+        self.controller = getattr(strip, 'controller', strip)
+        self.executor = executor
+
+    def __getattr__(self, name):
+        return getattr(self.strip, name)
+
+    def __getitem__(self, pos):
+        return self.strip[pos]
+
+    def __setitem__(self, pos, value):
+        self.strip[pos] = value
+
+    def __len__(self):
+        return len(self.strip)
+
+    def _run(self, function, *args):
+        return asyncio.get_event_loop().run_in_executor(self.executor, function, *args)
+
+    async def begin(self):
+        """As PixelStrip.begin(), which sets up the hardware."""
+        await self._run(self.controller.begin)
+
+    async def show(self, block=True, force=False):
+        """As PixelStrip.show(): returns once the frame has been clocked out,
+        or if block is False once it has been handed to the hardware, so
+        the next one can be computed meanwhile.
+        """
+        # Other tasks may show a frame while this one waits, so wait until
+        # none is in flight rather than once
+        while self.controller._pending:
+            await self.wait()
+        self.controller.show(block=False, force=force)
+        if block:
+            await self.wait()
+
+    async def wait(self):
+        """As PixelStrip.wait(): returns once the last frame shown has been
+        clocked out.
+        """
+        if self.controller._pending:
+            await self._run(self.controller.wait)
@@ -0,0 +1,256 @@
+# Sending frames over UDP, so effects can be computed on another machine
+# and shown on the Pi by a PixelStrip or MultiChannelPixelStrip.
+#
+# Each frame is sent as one or more packets of at most MAX_PACKET bytes, so
+# none is fragmented on an Ethernet link.  A packet is a header followed by
+# packed 32-bit colors, all little endian:
+#
+#   magic (b'WN'), version (u8), flags (u8: 1 = frame sync, set on the last
+#   packet of a frame), frame sequence number (u32), channel (u8),
+#   brightness of the channel (u8), position of the first color (u16)
+#
+# The colors are those the library would render, after any color correction
+# and mapping, as in a recording.  The receiver writes each packet straight
+# into the LED buffer, and shows the frame once the sync packet and every
+# other packet of it have arrived.  Packets of a frame older than the last
+# one seen are dropped, so a late packet never shows a stale frame.
+import socket
+import struct
+import sys
+from array import array
+
+from . import rpi_ws281x
+from .rpi_ws281x import PixelStrip, MultiChannelPixelStrip
+from .simulator import _correct
+
+MAGIC = b'WN'
+VERSION = 1
+FLAG_SYNC = 1
+DEFAULT_PORT = 52811
+# Largest UDP payload that fits a 1500 byte Ethernet frame
+MAX_PACKET = 1472
+
+_HEADER = struct.Struct('<2sBBIBBH')
+PIXELS_PER_PACKET = (MAX_PACKET - _HEADER.size) // 4
+
+# A frame this far behind the last one seen is from a restarted sender, not
+# a late packet
+_RESTART_GAP = 256
+
+
+def _little_endian(colors):
+    if sys.byteorder == 'little':
+        return bytes(colors)
+    words = array('I')
+    words.frombytes(bytes(colors))
+    words.byteswap()
+    return words.tobytes()
+
+
+def _packets(sequence, brightness, frames):
+    chunks = []
+    for channel, (level, colors) in enumerate(zip(brightness, frames)):
+        data = _little_endian(colors)
+        for start in range(0, len(data), 4 * PIXELS_PER_PACKET):
+            chunks.append((channel, level, start // 4, data[start:start + 4 * PIXELS_PER_PACKET]))
+    return [_HEADER.pack(MAGIC, VERSION, FLAG_SYNC if n == len(chunks) - 1 else 0,
+                         sequence, channel, level, offset) + data
+            for n, (channel, level, offset, data) in enumerate(chunks)]
+
+
+class _NetworkController(object):
+    """Rendering for NetworkPixelStrip and NetworkMultiChannelPixelStrip,
+    which take the place of the library's: the LED buffers are allocated
+    without initializing the hardware, and show() sends each frame to a
+    NetworkReceiver rather than clocking it out.
+    """
+
+    def _init_network(self, host, port):
+        self.host = host
+        self.port = port
+        self.sequence = 0
+        self._socket = None
+
+    def reset_stats(self):
+        super(_NetworkController, self).reset_stats()
+        self.packets = 0
+
+    def stats(self):
+        """As PixelStrip.stats(), where a frame is rendered by sending it,
+        plus packets, the number of packets sent.
+        """
+        with self._lock:
+            stats = super(_NetworkController, self).stats()
+            stats['packets'] = self.packets
+            return stats
+
+    def begin(self):
+        """Allocate the LED buffers and open the socket.  Calling it again
+        has no effect.
+        """
+        with self._lock:
+            if self._initialized:
+                return
+
+            resp = rpi_ws281x.ws.ws2811_leds_alloc(self._leds)
+            if resp != 0:
+                str_resp = rpi_ws281x.ws.ws2811_get_return_t_str(resp)
+                raise RuntimeError('ws2811_leds_alloc failed with code {0} ({1})'.format(resp, str_resp))
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._initialized = True
+
+    def _render(self):
+        # Correct and remap into the scratch buffers as
+        # ws2811_render_corrected() would, then send what it would render
+        for strip in self._strips():
+            entry = self._corrections[strip._channum]
+            if entry is not None:
+                tables, white, mapping, scratch = entry
+                scratch[:] = _correct(strip[:], mapping, tables, white).tobytes()
+        self.sequence = (self.sequence + 1) & 0xffffffff
+        for packet in _packets(self.sequence, *self._frame()):
+            self._socket.sendto(packet, (self.host, self.port))
+            self.packets += 1
+        return 0
+
+    def wait(self):
+        """Frames are sent as soon as they are shown, so there is nothing
+        to wait for, but frame_ready is called after each, if set.
+        """
+        with self._lock:
+            pending = self._pending
+            self._pending = False
+        if pending and self.frame_ready is not None:
+            self.frame_ready(self)
+
+    def _close(self):
+        with self._lock:
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+
+
+class NetworkPixelStrip(_NetworkController, PixelStrip):
+    def __init__(self, num, host, port=DEFAULT_PORT, brightness=255):
+        """A strip of num LEDs whose frames are shown by the NetworkReceiver
+        listening on host and port, so effects can run on a faster machine
+        than the one driving the LEDs.  Supports the PixelStrip API;
+        the gamma and strip type that apply are those of the receiving
+        strip, which should have the same number of LEDs.
+        """
+        PixelStrip.__init__(self, num, 0, brightness=brightness)
+        self._init_network(host, port)
+
+    def _cleanup(self):
+        self._close()
+        PixelStrip._cleanup(self)
+
+
+class NetworkMultiChannelPixelStrip(_NetworkController, MultiChannelPixelStrip):
+    def __init__(self, channels, host, port=DEFAULT_PORT):
+        """As NetworkPixelStrip, for the one or two channels of a
+        MultiChannelPixelStrip.  Channels takes the same dicts as
+        MultiChannelPixelStrip, but only num and brightness are used.
+        """
+        MultiChannelPixelStrip.__init__(self, [dict(config, pin=config.get('pin', 0)) for config in channels])
+        self._init_network(host, port)
+
+    def _cleanup(self):
+        self._close()
+        MultiChannelPixelStrip._cleanup(self)
+
+
+class NetworkReceiver(object):
+    def __init__(self, controller, host='', port=DEFAULT_PORT):
+        """Show the frames sent by a NetworkPixelStrip or
+        NetworkMultiChannelPixelStrip on controller, a PixelStrip or
+        MultiChannelPixelStrip with as many channels and LEDs, listening on
+        host and port (port 0 picks a free one, see address).  The
+        controller's begin() must have been called.
+        """
+        self.controller = controller
+        self.strips = controller._strips()
+        self.size = sum(strip.size for strip in self.strips)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind((host, port))
+        self.address = self._socket.getsockname()
+        self.sequence = None
+        # Colors received of the current frame by (channel, position), or
+        # None once it has been shown
+        self._received = None
+        self._sync = False
+        self.frames = 0
+        self.dropped_frames = 0
+        self.dropped_packets = 0
+
+    def handle(self, packet):
+        """Write the colors in packet into the LED buffer, and show the frame
+        if it is complete.  Returns True if a frame was shown.
+        """
+        if len(packet) < _HEADER.size or (len(packet) - _HEADER.size) % 4:
+            self.dropped_packets += 1
+            return False
+        magic, version, flags, sequence, channel, brightness, offset = _HEADER.unpack_from(packet)
+        if magic != MAGIC or version != VERSION or channel >= len(self.strips):
+            self.dropped_packets += 1
+            return False
+
+        if sequence != self.sequence:
+            if self.sequence is not None and 0 < (self.sequence - sequence) & 0xffffffff < _RESTART_GAP:
+                self.dropped_packets += 1
+                return False
+            if self._received:
+                self.dropped_frames += 1
+            self.sequence = sequence
+            self._received = {}
+            self._sync = False
+        elif self._received is None:
+            # A duplicate of a frame already shown
+            self.dropped_packets += 1
+            return False
+
+        strip = self.strips[channel]
+        colors = _little_endian(memoryview(packet)[_HEADER.size:])
+        try:
+            strip.set_pixels(colors, offset)
+        except ValueError:
+            self.dropped_packets += 1
+            return False
+        if strip.getBrightness() != brightness:
+            strip.setBrightness(brightness)
+        self._received[channel, offset] = len(colors) // 4
+        self._sync = self._sync or bool(flags & FLAG_SYNC)
+
+        if not self._sync or sum(self._received.values()) != self.size:
+            return False
+        self._received = None
+        self.controller.show(block=False)
+        self.frames += 1
+        return True
+
+    def poll(self, timeout=None):
+        """Wait up to timeout seconds, or for ever if None, for a packet and
+        handle() it.  Returns True if a frame was shown.
+        """
+        self._socket.settimeout(timeout)
+        try:
+            packet = self._socket.recv(MAX_PACKET)
+        except socket.timeout:
+            return False
+        return self.handle(packet)
+
+    def serve_forever(self):
+        """Show frames as they arrive, for ever."""
+        while True:
+            self.poll()
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,129 @@
+# Recording of the frames rendered by show(), for analysis and replay.
+#
+# A recording is a header followed by one record per frame, all little
+# endian:
+#
+#   header: b'WS28REC', version (u8), flags (u8: 1 = zlib, 2 = delta),
+#           channel count (u8), then the LED count of each channel (u32)
+#   frame:  timestamp in monotonic nanoseconds (u64), payload size (u32),
+#           brightness of each channel (u8), then the payload
+#
+# The payload is the packed 32-bit colors of each channel in turn, as
+# handed to the library (after any color correction and mapping).  With
+# delta, it is XORed with the previous frame's, so unchanged pixels are
+# zero, and with zlib it is then compressed.
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+MAGIC = b'WS28REC'
+VERSION = 1
+FLAG_ZLIB = 1
+FLAG_DELTA = 2
+
+_HEADER = struct.Struct('<7sBBB')
+_FRAME = struct.Struct('<QI')
+
+try:
+    _monotonic_ns = time.monotonic_ns
+except AttributeError:
+    def _monotonic_ns():
+        return int(time.monotonic() * 1e9)
+
+
+def _xor(data, previous):
+    return (int.from_bytes(data, 'little') ^ int.from_bytes(previous, 'little')).to_bytes(len(data), 'little')
+
+
+class FrameRecorder(object):
+    def __init__(self, path, counts, compress=True, delta=True, level=1):
+        """Append frames to a new recording at path, for channels of the
+        given LED counts.  Compress selects zlib compression at the given
+        level, and delta stores each frame as its difference from the one
+        before, which compresses far better when few pixels change.
+        Writes are buffered; close() flushes them.
+        """
+        self.counts = tuple(counts)
+        self.flags = (FLAG_ZLIB if compress else 0) | (FLAG_DELTA if delta else 0)
+        self.level = level
+        self.frames = 0
+        self._previous = bytes(4 * sum(self.counts))
+        self._brightness = struct.Struct('<{0}B'.format(len(self.counts)))
+        self._file = open(path, 'wb', buffering=1 << 16)
+        self._file.write(_HEADER.pack(MAGIC, VERSION, self.flags, len(self.counts)))
+        self._file.write(struct.pack('<{0}I'.format(len(self.counts)), *self.counts))
+
+    def write(self, brightness, frames, timestamp=None):
+        """Append a frame: the brightness of each channel and a buffer of
+        packed colors for each, stamped with timestamp in monotonic
+        nanoseconds (default now).
+        """
+        data = b''.join(bytes(frame) for frame in frames)
+        if sys.byteorder != 'little':
+            colors = array('I')
+            colors.frombytes(data)
+            colors.byteswap()
+            data = colors.tobytes()
+        if len(data) != len(self._previous):
+            raise ValueError('Expecting {0} bytes of colors, got {1}'.format(len(self._previous), len(data)))
+        payload = data
+        if self.flags & FLAG_DELTA:
+            payload = _xor(data, self._previous)
+            self._previous = data
+        if self.flags & FLAG_ZLIB:
+            payload = zlib.compress(payload, self.level)
+        if timestamp is None:
+            timestamp = _monotonic_ns()
+        self._file.write(_FRAME.pack(timestamp, len(payload)))
+        self._file.write(self._brightness.pack(*brightness))
+        self._file.write(payload)
+        self.frames += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_frames(path):
+    """Yield (timestamp, brightness, frames) for each frame of a recording,
+    where brightness is a tuple with one level per channel and frames a
+    list with one array('I') of colors per channel.
+    """
+    with open(path, 'rb') as recording:
+        magic, version, flags, channels = _HEADER.unpack(recording.read(_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('{0} is not a version {1} recording'.format(path, VERSION))
+        counts = struct.unpack('<{0}I'.format(channels), recording.read(4 * channels))
+        previous = bytes(4 * sum(counts))
+
+        while True:
+            header = recording.read(_FRAME.size)
+            if len(header) < _FRAME.size:
+                return
+            timestamp, size = _FRAME.unpack(header)
+            brightness = tuple(recording.read(channels))
+            data = recording.read(size)
+            if flags & FLAG_ZLIB:
+                data = zlib.decompress(data)
+            if flags & FLAG_DELTA:
+                data = _xor(data, previous)
+                previous = data
+
+            frames = []
+            offset = 0
+            for count in counts:
+                colors = array('I')
+                colors.frombytes(data[offset:offset + 4 * count])
+                if sys.byteorder != 'little':
+                    colors.byteswap()
+                frames.append(colors)
+                offset += 4 * count
+            yield timestamp, brightness, frames
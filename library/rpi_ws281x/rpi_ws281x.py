@@ -1,7 +1,25 @@
 # Adafruit NeoPixel library port to the rpi_ws281x library.
 # Author: Tony DiCola (tony@tonydicola.com), Jeremy Garff (jer@jers.net)
-import _rpi_ws281x as ws
 import atexit
+import bisect
+import functools
+import itertools
+import math
+import numbers
+import os
+import sys
+import threading
+import time
+from array import array
+
+from .recorder import FrameRecorder
+
+# Set RPI_WS281X_BACKEND=simulator to run without the hardware.
+_simulated = os.environ.get('RPI_WS281X_BACKEND') == 'simulator'
+if _simulated:
+    from . import simulator as ws
+else:
+    import _rpi_ws281x as ws
 
 
 class RGBW(int):
@@ -30,15 +48,428 @@ class RGBW(int):
         return (self >> 24) & 0xff
 
 
+def pack_rgbw(red, green, blue, white=0):
+    """Pack red, green, blue and white components (0-255) into a 32-bit
+    color value, as a plain int.  Faster than Color() when the r/g/b/w
+    properties are not needed.
+    """
+    return (white << 24) | (red << 16) | (green << 8) | blue
+
+
+@functools.lru_cache(maxsize=4096)
 def Color(red, green, blue, white=0):
     """Convert the provided red, green, blue color to a 24-bit color value.
     Each color component should be a value 0-255 where 0 is the lowest intensity
-    and 255 is the highest intensity.
+    and 255 is the highest intensity.  Recently used colors are cached, so
+    repeated calls return the same RGBW object.
     """
     return RGBW(red, green, blue, white)
 
 
-class PixelStrip:
+def _numpy_for(*values):
+    # Return the numpy module if any of values is a numpy array.  If numpy
+    # has not been imported there can't be any, so don't import it here.
+    numpy = sys.modules.get('numpy')
+    if numpy is not None and any(isinstance(value, numpy.ndarray) for value in values):
+        return numpy
+    return None
+
+
+def pack_rgbw_array(red, green, blue, white=0):
+    """Pack sequences of red, green, blue and white components into 32-bit
+    color values, ready for set_pixels() or slice assignment.  Returns a
+    uint32 numpy array if any input is a numpy array, otherwise an
+    array('I').  Any component may be a single number used for every pixel.
+    """
+    numpy = _numpy_for(red, green, blue, white)
+    if numpy is not None:
+        words = numpy.left_shift(numpy.asarray(white, dtype=numpy.uint32), 24)
+        words = words | numpy.left_shift(numpy.asarray(red, dtype=numpy.uint32), 16)
+        words = words | numpy.left_shift(numpy.asarray(green, dtype=numpy.uint32), 8)
+        return words | numpy.asarray(blue, dtype=numpy.uint32)
+
+    components = [itertools.repeat(value) if isinstance(value, numbers.Integral) else value
+                  for value in (red, green, blue, white)]
+    if all(isinstance(value, itertools.repeat) for value in components):
+        raise TypeError('pack_rgbw_array() needs at least one sequence of components')
+    return array('I', [(w << 24) | (r << 16) | (g << 8) | b for r, g, b, w in zip(*components)])
+
+
+def unpack_rgbw_array(words):
+    """Split 32-bit color values into (red, green, blue, white) components.
+    Returns uint8 numpy arrays if words is a numpy array, otherwise
+    array('B')s.
+    """
+    numpy = _numpy_for(words)
+    if numpy is not None:
+        words = numpy.asarray(words, dtype=numpy.uint32)
+        return tuple(((words >> shift) & 0xff).astype(numpy.uint8) for shift in (16, 8, 0, 24))
+
+    data = array('I', words).tobytes()
+    if sys.byteorder == 'little':
+        # Each color is stored as the bytes b, g, r, w
+        return tuple(array('B', data[offset::4]) for offset in (2, 1, 0, 3))
+    return tuple(array('B', data[offset::4]) for offset in (1, 2, 3, 0))
+
+
+def gamma_table(factor):
+    """Return a 256 entry gamma correction table for the given factor, as
+    ws2811_set_custom_gamma_factor() computes it.  A factor of 0 (or less)
+    gives the identity table.
+    """
+    if factor <= 0:
+        return tuple(range(256))
+    # The library divides in single precision before raising to the power
+    levels = array('f', [counter / 255.0 for counter in range(256)])
+    return tuple(int(level ** factor * 255.0 + 0.5) for level in levels)
+
+
+# Tables are shared by content, so every channel using one of these costs
+# no extra memory.
+GAMMA_IDENTITY = gamma_table(0)
+GAMMA_2_2 = gamma_table(2.2)
+GAMMA_2_8 = gamma_table(2.8)
+
+
+class ColorCorrection(object):
+    """Color correction applied by show() as it renders a strip, so effects
+    can work in linear RGB.  Each component is scaled by balance, a tuple of
+    red, green, blue and optionally white levels (0-255), then mapped
+    through gamma, a factor or a table of 256 levels.  On RGBW strips,
+    white='add' adds the white common to red, green and blue to the white
+    LED, and white='replace' also takes it out of red, green and blue.
+
+    These are fused into one table per component and applied to a copy of
+    the LED buffer in a single pass, so the LED buffer keeps the colors
+    that were set.  The strip's own gamma table still applies afterwards,
+    so leave it as the identity.
+    """
+
+    WHITE_MODES = {None: 0, 'add': 1, 'replace': 2}
+
+    def __init__(self, gamma=None, balance=(255, 255, 255), white=None):
+        if white not in self.WHITE_MODES:
+            raise ValueError('white must be None, \'add\' or \'replace\'')
+        if gamma is None:
+            gamma = GAMMA_IDENTITY
+        elif isinstance(gamma, numbers.Real):
+            gamma = gamma_table(gamma)
+        elif len(gamma) != 256:
+            raise ValueError('gamma must be a factor or a table of 256 levels')
+        if not 3 <= len(balance) <= 4:
+            raise ValueError('balance must have 3 or 4 levels')
+
+        self.gamma = tuple(gamma)
+        self.balance = tuple(balance) + (255,) * (4 - len(balance))
+        self.white = white
+        # Lookup tables for red, green, blue and white, as the library
+        # expects them
+        self.tables = bytes(self.gamma[(level * scale + 127) // 255]
+                            for scale in self.balance for level in range(256))
+
+
+def reverse_mapping(num):
+    """Mapping for PixelStrip.set_mapping() that shows the LED buffer back
+    to front.
+    """
+    return array('i', range(num - 1, -1, -1))
+
+
+def mirror_mapping(num):
+    """Mapping that shows the first half of the LED buffer, then the same
+    pixels mirrored on the second half of the strip.
+    """
+    return array('i', [min(i, num - 1 - i) for i in range(num)])
+
+
+def serpentine_mapping(width, height):
+    """Mapping for a matrix of height rows of width LEDs wired in a zigzag,
+    so the LED buffer can be drawn row by row, all left to right.
+    """
+    return array('i', [row * width + (col if row % 2 == 0 else width - 1 - col)
+                       for row in range(height) for col in range(width)])
+
+
+def skip_mapping(num, dead):
+    """Mapping that leaves the LEDs at the positions in dead off and shows
+    the LED buffer on the others in order, so the last len(dead) pixels of
+    the buffer are not shown.
+    """
+    dead = set(dead)
+    mapping = array('i', [-1] * num)
+    logical = 0
+    for physical in range(num):
+        if physical not in dead:
+            mapping[physical] = logical
+            logical += 1
+    return mapping
+
+
+# Upper bounds in seconds of the buckets of the render time histogram kept
+# by show(); the last bucket counts the rest
+RENDER_HISTOGRAM_EDGES = (0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05)
+
+# Curves for PixelStrip.ramp_brightness(), mapping the fraction of the
+# duration elapsed to the fraction of the change made
+RAMP_CURVES = {
+    'linear': lambda t: t,
+    'ease_in': lambda t: t * t,
+    'ease_out': lambda t: t * (2 - t),
+    'ease': lambda t: t * t * (3 - 2 * t),
+    'sine': lambda t: (1 - math.cos(math.pi * t)) / 2,
+}
+
+
+def _as_colors(value):
+    """Return value as a buffer of packed 32-bit colors, copying it only if
+    it is not one already (eg. a list, or a numpy array of another dtype).
+    """
+    try:
+        view = memoryview(value)
+    except TypeError:
+        return array('I', value)
+    if view.c_contiguous and view.format in ('I', 'L') and view.itemsize == 4:
+        return view
+    return array('I', value)
+
+
+def _new_ws2811_t(freq_hz, dma):
+    # Create a ws2811_t structure with both channels unused.
+    leds = ws.new_ws2811_t()
+
+    for channum in range(2):
+        chan = ws.ws2811_channel_get(leds, channum)
+        ws.ws2811_channel_t_count_set(chan, 0)
+        ws.ws2811_channel_t_gpionum_set(chan, 0)
+        ws.ws2811_channel_t_invert_set(chan, 0)
+        ws.ws2811_channel_t_brightness_set(chan, 0)
+
+    ws.ws2811_t_freq_set(leds, freq_hz)
+    ws.ws2811_t_dmanum_set(leds, dma)
+
+    return leds
+
+
+class _Controller:
+    """Rendering shared by PixelStrip and MultiChannelPixelStrip, which both
+    own a ws2811_t.  The encoded DMA buffer acts as the back buffer: a frame
+    is copied into it when it is rendered, so the LED buffer can be updated
+    while it is being clocked out, and it is only rendered into again once
+    the previous frame has finished.
+
+    The library releases the GIL while it waits for the hardware, so other
+    threads keep running during show() and wait(); a lock stops them from
+    rendering or cleaning up at the same time.
+    """
+
+    def _init_controller(self):
+        self._lock = threading.RLock()
+        self._initialized = False
+        self._pending = False
+        self._snapshot = bytearray()
+        # Render the next frame even if the LED buffer is unchanged, eg.
+        # because a color correction or mapping was set
+        self._stale = False
+        # One entry per PWM channel for ws2811_render_corrected()
+        self._corrections = [None, None]
+        # Brightness ramps in progress by PWM channel, see ramp_brightness()
+        self._ramps = {}
+        self.frame_ready = None
+        self.recorder = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zero the counters returned by stats()."""
+        self.shows = 0
+        self.renders = 0
+        self.skipped_frames = 0
+        self.forced_frames = 0
+        self.render_time = 0.0
+        self.total_render_time = 0.0
+        self.render_histogram = [0] * (len(RENDER_HISTOGRAM_EDGES) + 1)
+        self.changed_pixels = 0
+        self.total_changed_pixels = 0
+        self.library_calls = 0
+        self.wait_time = 0.0
+        self.total_wait_time = 0.0
+
+    def stats(self):
+        """Return a dict of the counters kept by show() and wait() since
+        they were created or reset_stats() was called:
+
+        shows, renders, skipped_frames, forced_frames: show() calls, frames
+            rendered, frames skipped as unchanged, and frames rendered only
+            because of force=True
+        render_time, total_render_time, mean_render_time: seconds spent in
+            the library rendering the last frame, all frames, and on average
+        render_histogram: frames rendered in less than each of
+            RENDER_HISTOGRAM_EDGES seconds (and no less than the one
+            before), then the rest
+        changed_pixels, total_changed_pixels, mean_changed_pixels: LEDs
+            whose output changed in the last frame rendered, all of them,
+            and on average
+        library_calls: calls into the library made by show() and wait()
+        wait_time, total_wait_time: seconds spent waiting for the last
+            frame and all frames to be clocked out
+        """
+        with self._lock:
+            renders = self.renders or 1
+            return {
+                'shows': self.shows,
+                'renders': self.renders,
+                'skipped_frames': self.skipped_frames,
+                'forced_frames': self.forced_frames,
+                'render_time': self.render_time,
+                'total_render_time': self.total_render_time,
+                'mean_render_time': self.total_render_time / renders,
+                'render_histogram': list(self.render_histogram),
+                'changed_pixels': self.changed_pixels,
+                'total_changed_pixels': self.total_changed_pixels,
+                'mean_changed_pixels': self.total_changed_pixels / float(renders),
+                'library_calls': self.library_calls,
+                'wait_time': self.wait_time,
+                'total_wait_time': self.total_wait_time,
+            }
+
+    def start_recording(self, path, compress=True, delta=True):
+        """Record every frame rendered from now on to a new file at path,
+        with a timestamp, as a FrameRecorder.  Compress and delta select
+        zlib compression of each frame and storing only its difference from
+        the previous one; read_frames() reads it back.  Returns the
+        FrameRecorder.
+        """
+        with self._lock:
+            self.stop_recording()
+            self.recorder = FrameRecorder(path, [strip.size for strip in self._strips()],
+                                          compress, delta)
+            return self.recorder
+
+    def stop_recording(self):
+        """Stop recording and close the file, if recording."""
+        with self._lock:
+            if self.recorder is not None:
+                self.recorder.close()
+                self.recorder = None
+
+    def _frame(self):
+        # The brightness of each channel and its colors as handed to the
+        # library: the scratch buffer for a channel that is corrected or
+        # mapped, else the LED buffer
+        brightness = []
+        frames = []
+        for strip in self._strips():
+            entry = self._corrections[strip._channum]
+            if entry is not None:
+                frames.append(memoryview(entry[3])[:4 * strip.size])
+            else:
+                frames.append(ws.ws2811_leds_get_range(strip._channel, 0, 1, strip.size))
+            brightness.append(ws.ws2811_channel_t_brightness_get(strip._channel))
+        return brightness, frames
+
+    def _record(self):
+        self.recorder.write(*self._frame())
+
+    def begin(self):
+        """Initialize library, must be called once before other functions are
+        called.  Calling it again has no effect.
+        """
+        with self._lock:
+            if self._initialized:
+                return
+
+            resp = ws.ws2811_init(self._leds)
+            if resp != 0:
+                str_resp = ws.ws2811_get_return_t_str(resp)
+                raise RuntimeError('ws2811_init failed with code {0} ({1})'.format(resp, str_resp))
+            self._initialized = True
+
+    def show(self, block=True, force=False):
+        """Update the display with the data from the LED buffer.  If block is
+        False, return as soon as the frame has been handed to the DMA engine
+        rather than once it has been clocked out, so the next frame can be
+        computed meanwhile; the following show() or wait() waits for it.
+
+        If neither the LED buffer nor the brightness, gamma or strip type
+        changed since the last frame, nothing is rendered and skipped_frames
+        is incremented, unless force is True.  See stats() for the other
+        counters kept.
+        """
+        with self._lock:
+            self.shows += 1
+            if self._ramps:
+                self._step_ramps()
+            changed = ws.ws2811_leds_changed(self._leds, self._snapshot)
+            self.library_calls += 1
+            if not changed and not self._stale:
+                if not force:
+                    self.skipped_frames += 1
+                    if block:
+                        self.wait()
+                    return
+                self.forced_frames += 1
+
+            # Wait here rather than in ws2811_render(), which holds the GIL.
+            self.wait()
+            start = time.perf_counter()
+            resp = self._render()
+            self.render_time = time.perf_counter() - start
+            self.total_render_time += self.render_time
+            self.render_histogram[bisect.bisect_right(RENDER_HISTOGRAM_EDGES, self.render_time)] += 1
+            self.renders += 1
+            self.changed_pixels = changed
+            self.total_changed_pixels += changed
+            self.library_calls += 1
+            self._stale = False
+            if resp != 0:
+                str_resp = ws.ws2811_get_return_t_str(resp)
+                raise RuntimeError('ws2811_render failed with code {0} ({1})'.format(resp, str_resp))
+            self._pending = True
+            if self.recorder is not None:
+                self._record()
+            if block:
+                self.wait()
+
+    def _render(self):
+        # Hand the frame to the library, returning its ws2811_return_t
+        if any(self._corrections):
+            return ws.ws2811_render_corrected(self._leds, self._corrections)
+        return ws.ws2811_render(self._leds)
+
+    def _step_ramps(self):
+        # Set the brightness of each ramping channel for the current time
+        now = time.monotonic()
+        for channum, (channel, start, target, began, duration, curve) in list(self._ramps.items()):
+            progress = min((now - began) / duration, 1.0) if duration > 0 else 1.0
+            level = int(round(start + (target - start) * curve(progress)))
+            ws.ws2811_channel_t_brightness_set(channel, max(0, min(255, level)))
+            self.library_calls += 1
+            if progress >= 1.0:
+                del self._ramps[channum]
+
+    def wait(self):
+        """Wait until the last frame passed to show() has been clocked out.
+        The time spent waiting is stored in wait_time and added to
+        total_wait_time, then frame_ready is called, if set, with this
+        object.  Does nothing if no frame is in flight.
+        """
+        with self._lock:
+            if not self._pending:
+                return
+
+            start = time.perf_counter()
+            resp = ws.ws2811_wait(self._leds)
+            self.wait_time = time.perf_counter() - start
+            self.library_calls += 1
+            self.total_wait_time += self.wait_time
+            self._pending = False
+        if resp != 0:
+            str_resp = ws.ws2811_get_return_t_str(resp)
+            raise RuntimeError('ws2811_wait failed with code {0} ({1})'.format(resp, str_resp))
+        if self.frame_ready is not None:
+            self.frame_ready(self)
+
+
+class PixelStrip(_Controller):
     def __init__(self, num, pin, freq_hz=800000, dma=10, invert=False,
             brightness=255, channel=0, strip_type=None, gamma=None):
         """Class to represent a SK6812/WS281x LED display.  Num should be the
@@ -50,6 +481,18 @@ class PixelStrip:
         channel, the PWM channel to use (defaults to 0).
         """
 
+        # Create ws2811_t structure and fill in parameters.
+        self._leds = _new_ws2811_t(freq_hz, dma)
+        self._init_controller()
+        self.controller = self
+
+        # Initialize the channel in use
+        self._setup_channel(channel, num, pin, invert, brightness, strip_type, gamma)
+
+        # Substitute for __del__, traps an exit condition and cleans up properly
+        atexit.register(self._cleanup)
+
+    def _setup_channel(self, channel, num, pin, invert, brightness, strip_type, gamma):
         if gamma is None:
             # Support gamma in place of strip_type for back-compat with
             # previous version of forked library
@@ -57,23 +500,11 @@ class PixelStrip:
                 gamma = strip_type
                 strip_type = None
             else:
-                gamma = list(range(256))
+                gamma = GAMMA_IDENTITY
 
         if strip_type is None:
             strip_type = ws.WS2811_STRIP_GRB
 
-        # Create ws2811_t structure and fill in parameters.
-        self._leds = ws.new_ws2811_t()
-
-        # Initialize the channels to zero
-        for channum in range(2):
-            chan = ws.ws2811_channel_get(self._leds, channum)
-            ws.ws2811_channel_t_count_set(chan, 0)
-            ws.ws2811_channel_t_gpionum_set(chan, 0)
-            ws.ws2811_channel_t_invert_set(chan, 0)
-            ws.ws2811_channel_t_brightness_set(chan, 0)
-
-        # Initialize the channel in use
         self._channel = ws.ws2811_channel_get(self._leds, channel)
 
         ws.ws2811_channel_t_gamma_set(self._channel, gamma)
@@ -83,92 +514,243 @@ class PixelStrip:
         ws.ws2811_channel_t_brightness_set(self._channel, brightness)
         ws.ws2811_channel_t_strip_type_set(self._channel, strip_type)
 
-        # Initialize the controller
-        ws.ws2811_t_freq_set(self._leds, freq_hz)
-        ws.ws2811_t_dmanum_set(self._leds, dma)
-
         self.size = num
-
-        # Substitute for __del__, traps an exit condition and cleans up properly
-        atexit.register(self._cleanup)
+        self._views = None
+        self._channum = channel
+        self.color_correction = None
+        self.mapping = None
+
+        # Per-pixel accessors bound to the channel in C, for effects that set
+        # a few scattered pixels at a time: set_pixel(n, color) and
+        # get_pixel(n).  Color may be a 32-bit value or an (r, g, b[, w])
+        # tuple, and n may be negative.
+        self.set_pixel = ws.ws2811_led_setter(self._channel)
+        self.get_pixel = ws.ws2811_led_getter(self._channel)
 
     def __getitem__(self, pos):
         """Return the 24-bit RGB color value at the provided position or slice
         of positions.
         """
-        # Handle if a slice of positions are passed in by grabbing all the values
-        # and returning them in a list.
+        # Handle if a slice of positions are passed in by copying all the values
+        # into an array('I') with one call into the library.
         if isinstance(pos, slice):
-            return [ws.ws2811_led_get(self._channel, n) for n in range(*pos.indices(self.size))]
+            start, stop, step = pos.indices(self.size)
+            count = len(range(start, stop, step))
+            return array('I', ws.ws2811_leds_get_range(self._channel, start, step, count))
         # Else assume the passed in value is a number to the position.
         else:
-            return ws.ws2811_led_get(self._channel, pos)
+            return self.get_pixel(pos)
 
     def __setitem__(self, pos, value):
         """Set the 24-bit RGB color value at the provided position or slice of
-        positions.
+        positions.  A slice may be assigned a single color, or a sequence of
+        colors of the same length (list, array('I'), numpy array, ...).
         """
         # Handle if a slice of positions are passed in by setting the appropriate
-        # LED data values to the provided value.
+        # LED data values to the provided value(s) with one call into the library.
         if isinstance(pos, slice):
-            for n in range(*pos.indices(self.size)):
-                ws.ws2811_led_set(self._channel, n, value)
+            start, stop, step = pos.indices(self.size)
+            count = len(range(start, stop, step))
+            if isinstance(value, numbers.Integral):
+                ws.ws2811_leds_fill_range(self._channel, start, step, count, int(value))
+            else:
+                ws.ws2811_leds_set_range(self._channel, start, step, count, _as_colors(value))
         # Else assume the passed in value is a number to the position.
         else:
-            return ws.ws2811_led_set(self._channel, pos, value)
+            self.set_pixel(pos, value)
 
     def __len__(self):
         return ws.ws2811_channel_t_count_get(self._channel)
 
+    def _strips(self):
+        return [self]
+
     def _cleanup(self):
         # Clean up memory used by the library when not needed anymore.
-        if self._leds is not None:
-            ws.ws2811_fini(self._leds)
-            ws.delete_ws2811_t(self._leds)
-            self._leds = None
-            self._channel = None
+        self.stop_recording()
+        self._release_views()
+        with self._lock:
+            if self._leds is not None:
+                ws.ws2811_fini(self._leds)
+                ws.delete_ws2811_t(self._leds)
+                self._leds = None
+                self._channel = None
+
+    def _release_views(self):
+        # Views handed out by pixel_view() and the per-pixel accessors point
+        # straight at memory owned by the library, so drop them before it is
+        # freed.
+        if self._channel is not None:
+            ws.ws2811_led_accessor_release(self.set_pixel)
+            ws.ws2811_led_accessor_release(self.get_pixel)
+        if self._views is not None:
+            for view in reversed(self._views):
+                try:
+                    view.release()
+                except BufferError:
+                    # Still exported, eg. wrapped by a numpy array
+                    pass
+            self._views = None
 
     def setGamma(self, gamma):
-        if type(gamma) is list and len(gamma) == 256:
+        if isinstance(gamma, (list, tuple)) and len(gamma) == 256:
             ws.ws2811_channel_t_gamma_set(self._channel, gamma)
 
-    def begin(self):
-        """Initialize library, must be called once before other functions are
-        called.
+    def set_custom_gamma_factor(self, factor):
+        """Correct this strip with a gamma curve of the given factor, eg. 2.8
+        (see GAMMA_2_2 and GAMMA_2_8).  A factor of 0 turns correction off.
         """
+        self.setGamma(gamma_table(factor))
 
-        resp = ws.ws2811_init(self._leds)
-        if resp != 0:
-            str_resp = ws.ws2811_get_return_t_str(resp)
-            raise RuntimeError('ws2811_init failed with code {0} ({1})'.format(resp, str_resp))
-
-    def show(self):
-        """Update the display with the data from the LED buffer."""
-        resp = ws.ws2811_render(self._leds)
-        if resp != 0:
-            str_resp = ws.ws2811_get_return_t_str(resp)
-            raise RuntimeError('ws2811_render failed with code {0} ({1})'.format(resp, str_resp))
+    def set_color_correction(self, correction):
+        """Apply correction, a ColorCorrection, to this strip from the next
+        show() on, or stop correcting it if correction is None.
+        """
+        with self.controller._lock:
+            self.color_correction = correction
+            self._update_correction()
+
+    def set_mapping(self, mapping):
+        """Remap the LED buffer as show() renders it, so effects can draw
+        in logical order whatever the wiring: mapping[i] is the position
+        in the LED buffer shown on physical LED i, or -1 to leave it off.
+        It must have one entry per LED; reverse_mapping(),
+        mirror_mapping(), serpentine_mapping() and skip_mapping() build
+        common ones.  A mapping of None turns remapping off.
+        """
+        if mapping is not None:
+            mapping = array('i', mapping)
+            if len(mapping) != self.size:
+                raise ValueError('mapping must have one entry per LED')
+            if any(not -1 <= index < self.size for index in mapping):
+                raise IndexError('LED index out of range')
+        with self.controller._lock:
+            self.mapping = mapping
+            self._update_correction()
+
+    def _update_correction(self):
+        # Set what ws2811_render_corrected() does to this channel: the
+        # color correction lookup tables and white mode, the mapping and a
+        # scratch buffer for the result
+        correction, mapping = self.color_correction, self.mapping
+        if correction is None and mapping is None:
+            entry = None
+        elif correction is None:
+            entry = (None, 0, mapping, bytearray(4 * self.size))
+        else:
+            entry = (correction.tables, ColorCorrection.WHITE_MODES[correction.white],
+                     mapping, bytearray(4 * self.size))
+        self.controller._corrections[self._channum] = entry
+        self.controller._stale = True
 
     def setPixelColor(self, n, color):
         """Set LED at position n to the provided 24-bit color value (in RGB order).
         """
-        self[n] = color
+        self.set_pixel(n, color)
+
+    def set_many(self, indices, colors):
+        """Set the LEDs at each of the positions in indices to a color, with
+        a single call into the library.  Colors may be one color for all of
+        them, or a sequence with one color per position; a color is either a
+        32-bit value or an (r, g, b[, w]) tuple.
+        """
+        ws.ws2811_leds_set_many(self._channel, indices, colors)
+
+    def set_pixels(self, buffer, offset=0):
+        """Copy a buffer of packed 32-bit WRGB colors into the LED buffer,
+        starting at position offset, with a single call into the library.
+        Any object supporting the buffer protocol can be passed, such as
+        bytes, bytearray, array('I') or a memoryview.  Returns the number
+        of pixels written.
+        """
+        return ws.ws2811_leds_set(self._channel, offset, buffer)
+
+    def fill(self, color, start=0, end=None):
+        """Set the LEDs from position start up to, but not including, end
+        (default the end of the strip) to color, with a single call into the
+        library.  Color may be a 32-bit color value or an (r, g, b[, w])
+        tuple.
+        """
+        if not isinstance(color, numbers.Integral):
+            color = pack_rgbw(*color)
+        start, end, _ = slice(start, end).indices(self.size)
+        ws.ws2811_leds_fill_range(self._channel, start, 1, max(end - start, 0), int(color))
+
+    def clear(self):
+        """Turn all LEDs off in the LED buffer."""
+        self.fill(0)
+
+    def fill_and_show(self, color, start=0, end=None):
+        """fill() then show()."""
+        self.fill(color, start, end)
+        self.show()
+
+    def pixel_view(self, as_bytes=False):
+        """Return a writable memoryview of the LED buffer without copying.
+        The view holds one unsigned 32-bit WRGB color per pixel, or if
+        as_bytes is True a (num, 4) view of the individual color bytes in
+        native byte order.  Writes go straight to the buffer sent by show().
+        The view is only valid between begin() and cleanup.
+        """
+        if self._views is None:
+            raw = ws.ws2811_leds_view(self._channel)
+            self._views = (raw, raw.cast('I'), raw.cast('B', (self.size, 4)))
+        return self._views[2] if as_bytes else self._views[1]
+
+    def pixel_array(self, as_bytes=False):
+        """Return pixel_view() as a numpy array sharing the LED buffer, with
+        dtype uint32, or uint8 and shape (num, 4) if as_bytes is True.
+        """
+        import numpy
+        return numpy.asarray(self.pixel_view(as_bytes))
+
+    def segment(self, start, stop=None, reverse=False):
+        """Return a PixelStripSegment for the LEDs from position start up to,
+        but not including, stop (default the end of the strip), indexed from
+        0 like a strip of its own, and from stop - 1 if reverse is True.
+        """
+        return PixelStripSegment(self, start, stop, reverse)
 
     def setPixelColorRGB(self, n, red, green, blue, white=0):
         """Set LED at position n to the provided red, green, and blue color.
         Each color component should be a value from 0 to 255 (where 0 is the
         lowest intensity and 255 is the highest intensity).
         """
-        self.setPixelColor(n, Color(red, green, blue, white))
+        self.set_pixel(n, (white << 24) | (red << 16) | (green << 8) | blue)
 
     def getBrightness(self):
         return ws.ws2811_channel_t_brightness_get(self._channel)
 
     def setBrightness(self, brightness):
         """Scale each LED in the buffer by the provided brightness.  A brightness
-        of 0 is the darkest and 255 is the brightest.
+        of 0 is the darkest and 255 is the brightest.  Cancels any
+        ramp_brightness() in progress.
         """
-        ws.ws2811_channel_t_brightness_set(self._channel, brightness)
+        with self.controller._lock:
+            self.controller._ramps.pop(self._channum, None)
+            ws.ws2811_channel_t_brightness_set(self._channel, brightness)
+
+    def ramp_brightness(self, target, duration, curve='linear'):
+        """Change the brightness to target (0-255) over duration seconds.
+        Each show() in that time sets the brightness for the time it is
+        called, so fades and pulses don't need the pixels rewritten, but
+        show() must keep being called until ramping is False.  Curve is one
+        of RAMP_CURVES, 'linear', 'ease_in', 'ease_out', 'ease' or 'sine'
+        (half a sine wave, for breathing), or a function mapping the fraction of the duration elapsed (0-1) to the
+        fraction of the change made.
+        """
+        if not callable(curve):
+            if curve not in RAMP_CURVES:
+                raise ValueError('Unknown ramp curve {0!r}'.format(curve))
+            curve = RAMP_CURVES[curve]
+        with self.controller._lock:
+            self.controller._ramps[self._channum] = (
+                self._channel, self.getBrightness(), int(target), time.monotonic(), duration, curve)
+
+    @property
+    def ramping(self):
+        """True while a ramp_brightness() is in progress."""
+        return self._channum in self.controller._ramps
 
     def getPixels(self):
         """Return an object which allows access to the LED display data as if
@@ -182,13 +764,257 @@ class PixelStrip:
 
     def getPixelColor(self, n):
         """Get the 24-bit RGB color value for the LED at position n."""
-        return self[n]
+        return self.get_pixel(n)
 
     def getPixelColorRGB(self, n):
-        return RGBW(self[n])
+        return RGBW(self.get_pixel(n))
 
     def getPixelColorRGBW(self, n):
-        return RGBW(self[n])
+        return RGBW(self.get_pixel(n))
+
+
+class PixelStripSegment(object):
+    def __init__(self, strip, start, stop=None, reverse=False):
+        """A range of the LEDs of a PixelStrip, addressed as a strip of its
+        own, so different effects can run on different zones.  Supports the
+        pixel API of PixelStrip; writes go straight to the strip's LED
+        buffer, and slices and bulk writes are a single call into the
+        library.  show() shows the whole strip.
+        """
+        start, stop, _ = slice(start, stop).indices(len(strip))
+        self.strip = strip
+        self.start = start
+        self.stop = max(start, stop)
+        self.reverse = reverse
+        self.size = self.stop - self.start
+        # Position in the strip of pixel 0, and the step to pixel 1
+        self._first = self.stop - 1 if reverse else self.start
+        self._step = -1 if reverse else 1
+
+    def _index(self, n):
+        if n < 0:
+            n += self.size
+        if not 0 <= n < self.size:
+            raise IndexError('LED index out of range')
+        return self._first + n * self._step
+
+    def _range(self, pos):
+        # Map a slice of the segment to start, step and count in the strip
+        start, stop, step = pos.indices(self.size)
+        count = len(range(start, stop, step))
+        return self._first + start * self._step, step * self._step, count
+
+    def __getitem__(self, pos):
+        """Return the color at the provided position or slice of positions."""
+        if isinstance(pos, slice):
+            start, step, count = self._range(pos)
+            return array('I', ws.ws2811_leds_get_range(self.strip._channel, start, step, count))
+        return self.strip.get_pixel(self._index(pos))
+
+    def __setitem__(self, pos, value):
+        """Set the color at the provided position or slice of positions, as
+        PixelStrip does.
+        """
+        if isinstance(pos, slice):
+            start, step, count = self._range(pos)
+            if isinstance(value, numbers.Integral):
+                ws.ws2811_leds_fill_range(self.strip._channel, start, step, count, int(value))
+            else:
+                ws.ws2811_leds_set_range(self.strip._channel, start, step, count, _as_colors(value))
+        else:
+            self.strip.set_pixel(self._index(pos), value)
+
+    def __len__(self):
+        return self.size
+
+    def begin(self):
+        self.strip.begin()
+
+    def show(self, block=True, force=False):
+        self.strip.show(block, force)
+
+    def wait(self):
+        self.strip.wait()
+
+    def segment(self, start, stop=None, reverse=False):
+        """Return a PixelStripSegment for part of this segment, positioned
+        as for PixelStrip.segment().
+        """
+        start, stop, _ = slice(start, stop).indices(self.size)
+        stop = max(start, stop)
+        if self.reverse:
+            return PixelStripSegment(self.strip, self._first - stop + 1, self._first - start + 1,
+                                     not reverse)
+        return PixelStripSegment(self.strip, self.start + start, self.start + stop, reverse)
+
+    def set_pixel(self, n, color):
+        """Set the LED at position n to a 32-bit color or (r, g, b[, w])."""
+        self.strip.set_pixel(self._index(n), color)
+
+    def get_pixel(self, n):
+        """Get the 32-bit color of the LED at position n."""
+        return self.strip.get_pixel(self._index(n))
+
+    def setPixelColor(self, n, color):
+        """Set LED at position n to the provided 24-bit color value (in RGB order).
+        """
+        self.strip.set_pixel(self._index(n), color)
+
+    def setPixelColorRGB(self, n, red, green, blue, white=0):
+        """Set LED at position n to the provided red, green, and blue color."""
+        self.strip.set_pixel(self._index(n), (white << 24) | (red << 16) | (green << 8) | blue)
+
+    def set_many(self, indices, colors):
+        """Set the LEDs at each of the positions in indices to a color, as
+        PixelStrip.set_many() does.
+        """
+        ws.ws2811_leds_set_many(self.strip._channel, [self._index(n) for n in indices], colors)
+
+    def set_pixels(self, buffer, offset=0):
+        """Copy a buffer of packed 32-bit WRGB colors into the segment,
+        starting at position offset, with a single copy in the library.
+        Returns the number of pixels written.
+        """
+        count = memoryview(buffer).nbytes // 4
+        if not 0 <= offset <= self.size:
+            raise IndexError('Offset out of range')
+        if count > self.size - offset:
+            raise ValueError('Buffer is larger than the segment')
+        ws.ws2811_leds_set_range(self.strip._channel, self._first + offset * self._step,
+                                 self._step, count, buffer)
+        return count
+
+    def fill(self, color, start=0, end=None):
+        """Set the LEDs from position start up to, but not including, end
+        (default the end of the segment) to color, with a single call into
+        the library.
+        """
+        if not isinstance(color, numbers.Integral):
+            color = pack_rgbw(*color)
+        self[start:end] = int(color)
+
+    def clear(self):
+        """Turn all LEDs of the segment off in the LED buffer."""
+        self.fill(0)
+
+    def fill_and_show(self, color, start=0, end=None):
+        """fill() then show()."""
+        self.fill(color, start, end)
+        self.show()
+
+    def pixel_view(self, as_bytes=False):
+        """Return a writable memoryview of the segment's part of the strip's
+        pixel_view(), in segment order.
+        """
+        view = self.strip.pixel_view(as_bytes)[self.start:self.stop]
+        return view[::-1] if self.reverse else view
+
+    def pixel_array(self, as_bytes=False):
+        """Return pixel_view() as a numpy array sharing the LED buffer."""
+        import numpy
+        return numpy.asarray(self.pixel_view(as_bytes))
+
+    def getPixels(self):
+        return self[:]
+
+    def numPixels(self):
+        """Return the number of pixels in the segment."""
+        return self.size
+
+    def getPixelColor(self, n):
+        """Get the 24-bit RGB color value for the LED at position n."""
+        return self.strip.get_pixel(self._index(n))
+
+    def getPixelColorRGB(self, n):
+        return RGBW(self.get_pixel(n))
+
+    def getPixelColorRGBW(self, n):
+        return RGBW(self.get_pixel(n))
+
+
+class PixelStripChannel(PixelStrip):
+    def __init__(self, controller, channel, num, pin, invert=False,
+            brightness=255, strip_type=None, gamma=None):
+        """One channel of a MultiChannelPixelStrip.  Supports the same pixel
+        API as PixelStrip, but begin() and show() act on the shared
+        controller, so showing any one channel updates all of them.
+        """
+        self.controller = controller
+        self._leds = controller._leds
+        self._setup_channel(channel, num, pin, invert, brightness, strip_type, gamma)
+
+    def _cleanup(self):
+        self.controller._cleanup()
+
+    def begin(self):
+        self.controller.begin()
+
+    def show(self, block=True, force=False):
+        self.controller.show(block, force)
+
+    def wait(self):
+        self.controller.wait()
+
+    def stats(self):
+        return self.controller.stats()
+
+    def reset_stats(self):
+        self.controller.reset_stats()
+
+    def start_recording(self, path, compress=True, delta=True):
+        return self.controller.start_recording(path, compress, delta)
+
+    def stop_recording(self):
+        self.controller.stop_recording()
+
+
+class MultiChannelPixelStrip(_Controller):
+    def __init__(self, channels, freq_hz=800000, dma=10):
+        """Class to represent two SK6812/WS281x LED displays driven by the
+        two PWM channels of a single controller, so that one show() clocks
+        out both in the same DMA transfer.  Channels should be a list of one
+        or two dicts of PixelStrip parameters for each channel: num and pin,
+        and optionally invert, brightness, strip_type and gamma.  The
+        channels can be indexed or unpacked, eg.
+        strip1, strip2 = MultiChannelPixelStrip([...]), and support the
+        PixelStrip API.  Optional parameters freq and dma apply to both.
+        """
+        if not 1 <= len(channels) <= 2:
+            raise ValueError('MultiChannelPixelStrip supports one or two channels')
+
+        self._leds = _new_ws2811_t(freq_hz, dma)
+        self._init_controller()
+        self.channels = [PixelStripChannel(self, channum, **config)
+                         for channum, config in enumerate(channels)]
+
+        # Substitute for __del__, traps an exit condition and cleans up properly
+        atexit.register(self._cleanup)
+
+    def __getitem__(self, channel):
+        return self.channels[channel]
+
+    def __iter__(self):
+        return iter(self.channels)
+
+    def __len__(self):
+        return len(self.channels)
+
+    def _strips(self):
+        return self.channels
+
+    def _cleanup(self):
+        # Clean up memory used by the library when not needed anymore.
+        self.stop_recording()
+        for strip in self.channels:
+            strip._release_views()
+            strip._leds = None
+            strip._channel = None
+        with self._lock:
+            if self._leds is not None:
+                ws.ws2811_fini(self._leds)
+                ws.delete_ws2811_t(self._leds)
+                self._leds = None
+
 
 # Shim for back-compatibility
 class Adafruit_NeoPixel(PixelStrip):
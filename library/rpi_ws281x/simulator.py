@@ -0,0 +1,553 @@
+# Hardware-free stand-in for the _rpi_ws281x extension module.
+#
+# Implements the same functions and constants as the SWIG wrapper, so
+# PixelStrip and friends run unchanged on any machine.  Select it by
+# setting RPI_WS281X_BACKEND=simulator before importing rpi_ws281x.
+#
+# ws2811_render() encodes each channel the way the C library does
+# (brightness, gamma and colour order are applied) into channel.output,
+# and the time taken to clock a frame out is modelled from the LED count,
+# strip type and frequency: 600 GRBW LEDs at 800kHz take 24ms plus the
+# 300us reset.  Set realtime to False to skip the sleeps and only keep
+# track of the modelled time in ws2811_t.wire_time.
+import operator
+import time
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+realtime = True
+
+WS2811_TARGET_FREQ = 800000
+
+SK6812_STRIP_RGBW = 0x18100800
+SK6812_STRIP_RBGW = 0x18100008
+SK6812_STRIP_GRBW = 0x18081000
+SK6812_STRIP_GBRW = 0x18080010
+SK6812_STRIP_BRGW = 0x18001008
+SK6812_STRIP_BGRW = 0x18000810
+SK6812_SHIFT_WMASK = 0xf0000000
+
+WS2811_STRIP_RGB = 0x00100800
+WS2811_STRIP_RBG = 0x00100008
+WS2811_STRIP_GRB = 0x00081000
+WS2811_STRIP_GBR = 0x00080010
+WS2811_STRIP_BRG = 0x00001008
+WS2811_STRIP_BGR = 0x00000810
+
+WS2812_STRIP = WS2811_STRIP_GRB
+SK6812_STRIP = WS2811_STRIP_GRB
+SK6812W_STRIP = SK6812_STRIP_GRBW
+
+_RETURN_STATES = [
+    (0, 'WS2811_SUCCESS', 'Success'),
+    (-1, 'WS2811_ERROR_GENERIC', 'Generic failure'),
+    (-2, 'WS2811_ERROR_OUT_OF_MEMORY', 'Out of memory'),
+    (-3, 'WS2811_ERROR_HW_NOT_SUPPORTED', 'Hardware revision is not supported'),
+    (-4, 'WS2811_ERROR_MEM_LOCK', 'Memory lock failed'),
+    (-5, 'WS2811_ERROR_MMAP', 'mmap() failed'),
+    (-6, 'WS2811_ERROR_MAP_REGISTERS', 'Unable to map registers into userspace'),
+    (-7, 'WS2811_ERROR_GPIO_INIT', 'Unable to initialize GPIO'),
+    (-8, 'WS2811_ERROR_PWM_SETUP', 'Unable to initialize PWM'),
+    (-9, 'WS2811_ERROR_MAILBOX_DEVICE', 'Failed to create mailbox device'),
+    (-10, 'WS2811_ERROR_DMA', 'DMA error'),
+    (-11, 'WS2811_ERROR_ILLEGAL_GPIO', 'Selected GPIO not possible'),
+    (-12, 'WS2811_ERROR_PCM_SETUP', 'Unable to initialize PCM'),
+    (-13, 'WS2811_ERROR_SPI_SETUP', 'Unable to initialize SPI'),
+    (-14, 'WS2811_ERROR_SPI_TRANSFER', 'SPI transfer error'),
+]
+
+WS2811_SUCCESS = 0
+WS2811_ERROR_GENERIC = -1
+WS2811_ERROR_OUT_OF_MEMORY = -2
+WS2811_ERROR_HW_NOT_SUPPORTED = -3
+WS2811_ERROR_MEM_LOCK = -4
+WS2811_ERROR_MMAP = -5
+WS2811_ERROR_MAP_REGISTERS = -6
+WS2811_ERROR_GPIO_INIT = -7
+WS2811_ERROR_PWM_SETUP = -8
+WS2811_ERROR_MAILBOX_DEVICE = -9
+WS2811_ERROR_DMA = -10
+WS2811_ERROR_ILLEGAL_GPIO = -11
+WS2811_ERROR_PCM_SETUP = -12
+WS2811_ERROR_SPI_SETUP = -13
+WS2811_ERROR_SPI_TRANSFER = -14
+WS2811_RETURN_STATE_COUNT = len(_RETURN_STATES)
+
+RPI_PWM_CHANNELS = 2
+
+# Time the data line is held low after a frame so the LEDs latch it, in us.
+LED_RESET_WAIT_TIME = 300
+
+# GPIOs usable for channel 0 on a 40 pin Pi, and for channel 1 when
+# channel 0 is unused, as checked by ws2811_init().
+_CHANNEL0_GPIOS = (10, 12, 18, 21)
+_CHANNEL1_GPIOS = (13, 19)
+
+
+class ws2811_channel_t(object):
+    def __init__(self):
+        self.gpionum = 0
+        self.invert = 0
+        self.count = 0
+        self.strip_type = 0
+        self.leds = None
+        self.brightness = 0
+        self.wshift = 0
+        self.rshift = 0
+        self.gshift = 0
+        self.bshift = 0
+        self.gamma = None
+        # Bytes sent to the LEDs by the last render, in wire order
+        self.output = bytes()
+
+
+class ws2811_t(object):
+    def __init__(self):
+        self.render_wait_time = 0
+        self.device = None
+        self.rpi_hw = None
+        self.freq = 0
+        self.dmanum = 0
+        self.channel = [ws2811_channel_t() for _ in range(RPI_PWM_CHANNELS)]
+        # Modelled time spent clocking out frames, in seconds
+        self.wire_time = 0.0
+        self.frames = 0
+
+
+class _device(object):
+    def __init__(self, driver_mode):
+        self.driver_mode = driver_mode
+        self.busy_until = 0.0
+        self.previous_timestamp = 0.0
+
+
+def _accessors(cls, name, convert=None):
+    def get(obj):
+        return getattr(obj, name)
+
+    def set(obj, value):
+        setattr(obj, name, convert(value) if convert else value)
+
+    globals()['{0}_{1}_get'.format(cls, name)] = get
+    globals()['{0}_{1}_set'.format(cls, name)] = set
+
+
+def _uint8(value):
+    return int(value) & 0xff
+
+
+for _name in ('gpionum', 'invert', 'count', 'strip_type', 'leds'):
+    _accessors('ws2811_channel_t', _name, int if _name != 'leds' else None)
+for _name in ('brightness', 'wshift', 'rshift', 'gshift', 'bshift'):
+    _accessors('ws2811_channel_t', _name, _uint8)
+for _name in ('render_wait_time', 'device', 'rpi_hw', 'freq', 'dmanum', 'channel'):
+    _accessors('ws2811_t', _name)
+del _name
+
+
+def ws2811_channel_t_gamma_set(channel, gamma):
+    try:
+        size = len(gamma)
+    except TypeError:
+        raise TypeError('Expecting a sequence')
+    if size != 256:
+        raise ValueError('Sequence size mismatch')
+    # Tables are shared between channels by the extension, so never
+    # modified in place
+    channel.gamma = bytes(gamma)
+
+
+def ws2811_channel_t_gamma_get(channel):
+    return list(channel.gamma) if channel.gamma is not None else None
+
+
+def new_ws2811_channel_t():
+    return ws2811_channel_t()
+
+
+def delete_ws2811_channel_t(channel):
+    pass
+
+
+def new_ws2811_t():
+    return ws2811_t()
+
+
+def delete_ws2811_t(ws2811):
+    pass
+
+
+def ws2811_channel_get(ws2811, channelnum):
+    return ws2811.channel[channelnum]
+
+
+def ws2811_get_return_t_str(state):
+    index = -state
+    if 0 <= index < len(_RETURN_STATES):
+        return _RETURN_STATES[index][2]
+    return ''
+
+
+def ws2811_init(ws2811):
+    channel0, channel1 = ws2811.channel
+    if channel0.count == 0 and channel1.count > 0:
+        gpionum = channel1.gpionum
+        if gpionum not in _CHANNEL1_GPIOS:
+            return WS2811_ERROR_ILLEGAL_GPIO
+    else:
+        gpionum = channel0.gpionum
+        if gpionum not in _CHANNEL0_GPIOS:
+            return WS2811_ERROR_ILLEGAL_GPIO
+
+    driver_mode = {10: 'spi', 21: 'pcm'}.get(gpionum, 'pwm')
+    ws2811.device = _device(driver_mode)
+
+    for channel in ws2811.channel:
+        channel.leds = array('I', bytes(4 * channel.count))
+        if channel.gamma is None:
+            channel.gamma = bytes(range(256))
+        channel.wshift = (channel.strip_type >> 24) & 0xff
+        channel.rshift = (channel.strip_type >> 16) & 0xff
+        channel.gshift = (channel.strip_type >> 8) & 0xff
+        channel.bshift = (channel.strip_type >> 0) & 0xff
+
+    return WS2811_SUCCESS
+
+
+def ws2811_fini(ws2811):
+    if ws2811.device is not None:
+        ws2811_wait(ws2811)
+    ws2811.device = None
+    for channel in ws2811.channel:
+        channel.leds = None
+        channel.gamma = None
+
+
+def ws2811_leds_alloc(ws2811):
+    # LED buffers for a controller that is never rendered, without
+    # ws2811_init().
+    for channel in ws2811.channel:
+        if channel.leds is None and channel.count:
+            channel.leds = array('I', bytes(4 * channel.count))
+    return WS2811_SUCCESS
+
+
+def _sleep_until(deadline):
+    delay = deadline - time.perf_counter()
+    if realtime and delay > 0:
+        time.sleep(delay)
+
+
+def _protocol_time(channel, freq):
+    # Time to clock out the channel in seconds, as the C library: 8 bits per
+    # colour, 3 colours (4 for RGBW strips), at the configured frequency.
+    array_size = 4 if channel.strip_type & SK6812_SHIFT_WMASK else 3
+    return channel.count * array_size * 8 / float(freq or WS2811_TARGET_FREQ)
+
+
+def _encode(channel):
+    array_size = 4 if channel.strip_type & SK6812_SHIFT_WMASK else 3
+    shifts = (channel.rshift, channel.gshift, channel.bshift, channel.wshift)[:array_size]
+    scale = (channel.brightness & 0xff) + 1
+    table = bytes(channel.gamma[(value * scale) >> 8] for value in range(256))
+
+    if numpy is not None:
+        leds = numpy.frombuffer(channel.leds, dtype=numpy.uint32)
+        lut = numpy.frombuffer(table, dtype=numpy.uint8)
+        out = numpy.empty((channel.count, array_size), dtype=numpy.uint8)
+        for j, shift in enumerate(shifts):
+            out[:, j] = lut[(leds >> shift) & 0xff]
+        return out.tobytes()
+
+    return bytes(table[(led >> shift) & 0xff] for led in channel.leds for shift in shifts)
+
+
+def ws2811_render(ws2811):
+    device = ws2811.device
+    protocol_time = 0.0
+
+    for channel in ws2811.channel:
+        if channel.leds is None:
+            continue
+        protocol_time = max(protocol_time, _protocol_time(channel, ws2811.freq))
+        channel.output = _encode(channel)
+
+    # Wait for any previous transfer to complete.
+    ret = ws2811_wait(ws2811)
+    if ret != WS2811_SUCCESS:
+        return ret
+
+    if ws2811.render_wait_time != 0:
+        _sleep_until(device.previous_timestamp + ws2811.render_wait_time / 1e6)
+
+    now = time.perf_counter()
+    device.busy_until = now + protocol_time
+    if device.driver_mode == 'spi':
+        # The SPI transfer happens synchronously within render.
+        _sleep_until(device.busy_until)
+
+    device.previous_timestamp = now
+    ws2811.render_wait_time = int(protocol_time * 1e6) + LED_RESET_WAIT_TIME
+    ws2811.wire_time += protocol_time
+    ws2811.frames += 1
+
+    return WS2811_SUCCESS
+
+
+def _correct(leds, mapping, tables, white):
+    # As ws2811_render_corrected(): LED i shows leds[mapping[i]], or is off
+    # for an index out of range, then the lookup tables for red, green, blue
+    # and white are applied after extracting white: 1 adds the white common
+    # to red, green and blue, 2 also takes it out of them.
+    count = len(leds)
+    if numpy is not None:
+        leds = numpy.frombuffer(leds, dtype=numpy.uint32)
+        if mapping is not None:
+            mapping = numpy.frombuffer(mapping, dtype=numpy.int32)
+            valid = (mapping >= 0) & (mapping < count)
+            leds = numpy.where(valid, leds[numpy.where(valid, mapping, 0)], 0).astype(numpy.uint32)
+        if tables is None:
+            return array('I', leds.tobytes())
+        luts = numpy.frombuffer(tables, dtype=numpy.uint8).reshape(4, 256)
+        r, g, b, w = ((leds >> shift) & 0xff for shift in (16, 8, 0, 24))
+        if white:
+            common = numpy.minimum(numpy.minimum(r, g), b)
+            if white == 2:
+                r, g, b = r - common, g - common, b - common
+            w = numpy.minimum(w + common, 255)
+        out = luts[3][w].astype(numpy.uint32) << 24
+        out |= luts[0][r].astype(numpy.uint32) << 16
+        out |= luts[1][g].astype(numpy.uint32) << 8
+        out |= luts[2][b]
+        return array('I', out.tobytes())
+
+    if mapping is not None:
+        leds = array('I', [leds[index] if 0 <= index < count else 0
+                           for index in memoryview(mapping).cast('B').cast('i')])
+    if tables is None:
+        return array('I', leds)
+    out = array('I', bytes(4 * count))
+    for i, led in enumerate(leds):
+        r, g, b, w = (led >> 16) & 0xff, (led >> 8) & 0xff, led & 0xff, led >> 24
+        if white:
+            common = min(r, g, b)
+            if white == 2:
+                r, g, b = r - common, g - common, b - common
+            w = min(w + common, 255)
+        out[i] = (tables[768 + w] << 24) | (tables[r] << 16) | (tables[256 + g] << 8) | tables[512 + b]
+    return out
+
+
+def ws2811_render_corrected(ws2811, corrections):
+    if len(corrections) != RPI_PWM_CHANNELS:
+        raise TypeError('Expecting a correction or None for each channel')
+    leds = []
+    try:
+        for channel, correction in zip(ws2811.channel, corrections):
+            if correction is None or channel.leds is None:
+                continue
+            tables, white, mapping, scratch = correction
+            if tables is not None and len(tables) != 4 * 256:
+                raise ValueError('Expecting 4 tables of 256 levels')
+            if mapping is not None and memoryview(mapping).nbytes != 4 * channel.count:
+                raise ValueError('Expecting one 32-bit index per LED')
+            if tables is None and mapping is None:
+                continue
+            leds.append((channel, channel.leds))
+            channel.leds = _correct(channel.leds, mapping, tables, white)
+            scratch[:4 * channel.count] = channel.leds.tobytes()
+        return ws2811_render(ws2811)
+    finally:
+        for channel, saved in leds:
+            channel.leds = saved
+
+
+def ws2811_wait(ws2811):
+    if ws2811.device is None:
+        return WS2811_ERROR_GENERIC
+    _sleep_until(ws2811.device.busy_until)
+    return WS2811_SUCCESS
+
+
+def ws2811_set_custom_gamma_factor(ws2811, gamma_factor):
+    # The library divides in single precision before raising to the power
+    levels = array('f', [counter / 255.0 for counter in range(256)])
+    table = bytes(int(level ** gamma_factor * 255.0 + 0.5) if gamma_factor > 0 else counter
+                  for counter, level in enumerate(levels))
+    for channel in ws2811.channel:
+        if channel.gamma is not None:
+            channel.gamma = table
+
+
+def ws2811_led_get(channel, lednum):
+    if lednum >= channel.count:
+        return 0xffffffff
+    return _leds(channel)[lednum]
+
+
+def ws2811_led_set(channel, lednum, color):
+    if lednum >= channel.count:
+        return -1
+    _leds(channel)[lednum] = color & 0xffffffff
+    return 0
+
+
+def _leds(channel):
+    if channel.leds is None:
+        raise RuntimeError('LED buffer is not allocated, call begin() first')
+    return channel.leds
+
+
+def _check_range(channel, start, step, count):
+    # Return the slice of the LED buffer addressed by start, step and count.
+    _leds(channel)
+    last = start + (count - 1) * step
+    if count < 0 or (count > 0 and not (0 <= start < channel.count and 0 <= last < channel.count)):
+        raise IndexError('LED index out of range')
+    if count == 0:
+        return slice(0, 0)
+    stop = last + (1 if step > 0 else -1)
+    return slice(start, stop if stop >= 0 else None, step)
+
+
+def _colors(buffer):
+    try:
+        view = memoryview(buffer)
+    except TypeError:
+        raise TypeError("a bytes-like object is required, not '{0}'".format(type(buffer).__name__))
+    if not view.c_contiguous:
+        raise BufferError('memoryview: underlying buffer is not C-contiguous')
+    if view.itemsize not in (1, 4) or view.nbytes % 4 != 0:
+        raise TypeError('Expecting a buffer of packed 32-bit colors')
+    return view.cast('B').cast('I')
+
+
+def _color(value):
+    # A 32-bit color, or an (r, g, b) or (r, g, b, w) sequence
+    if isinstance(value, int):
+        if not 0 <= value <= 0xffffffff:
+            raise OverflowError('Color does not fit in 32 bits')
+        return value
+    if len(value) not in (3, 4):
+        raise ValueError('Expecting an (r, g, b[, w]) sequence')
+    if not all(0 <= component <= 255 for component in value):
+        raise ValueError('Color components must be between 0 and 255')
+    red, green, blue = value[:3]
+    white = value[3] if len(value) == 4 else 0
+    return (white << 24) | (red << 16) | (green << 8) | blue
+
+
+def _index(channel, index):
+    index = operator.index(index)
+    if index < 0:
+        index += channel.count
+    if not 0 <= index < channel.count:
+        raise IndexError('LED index out of range')
+    return index
+
+
+def ws2811_led_setter(channel):
+    def set_pixel(n, color):
+        """Set LED n to a 32-bit color or an (r, g, b[, w]) tuple."""
+        _leds(channel)[_index(channel, n)] = _color(color)
+    return set_pixel
+
+
+def ws2811_led_getter(channel):
+    def get_pixel(n):
+        """Return the 32-bit color of LED n."""
+        return _leds(channel)[_index(channel, n)]
+    return get_pixel
+
+
+def ws2811_led_accessor_release(accessor):
+    # Channels are never freed here, and ws2811_fini() drops their LEDs.
+    pass
+
+
+def ws2811_leds_set_many(channel, indices, colors):
+    leds = _leds(channel)
+    indices = list(indices)
+    if isinstance(colors, int):
+        colors = [colors] * len(indices)
+    elif len(colors) != len(indices):
+        raise ValueError('attempt to assign {0} colors to {1} LEDs'.format(len(colors), len(indices)))
+    for index, color in zip(indices, colors):
+        leds[_index(channel, index)] = _color(color)
+
+
+def ws2811_leds_set(channel, offset, buffer):
+    leds = _leds(channel)
+    if not 0 <= offset <= channel.count:
+        raise IndexError('Offset out of range')
+    colors = _colors(buffer)
+    if len(colors) > channel.count - offset:
+        raise ValueError('Buffer is larger than the LED buffer')
+    leds[offset:offset + len(colors)] = array('I', colors)
+    return len(colors)
+
+
+def ws2811_leds_view(channel):
+    return memoryview(_leds(channel)).cast('B')
+
+
+def ws2811_leds_get_range(channel, start, step, count):
+    return channel.leds[_check_range(channel, start, step, count)].tobytes()
+
+
+def ws2811_leds_set_range(channel, start, step, count, buffer):
+    positions = _check_range(channel, start, step, count)
+    colors = _colors(buffer)
+    if len(colors) != count:
+        raise ValueError('attempt to assign {0} colors to a range of {1} LEDs'.format(len(colors), count))
+    channel.leds[positions] = array('I', colors)
+
+
+def ws2811_leds_fill_range(channel, start, step, count, color):
+    positions = _check_range(channel, start, step, count)
+    channel.leds[positions] = array('I', [color & 0xffffffff]) * count
+
+
+def ws2811_leds_changed(ws2811, snapshot):
+    # Returns the number of LEDs whose output changed since the snapshot:
+    # all of a channel's if its settings changed, else those that differ.
+    if not isinstance(snapshot, bytearray):
+        raise TypeError('Expecting a bytearray')
+    parts = []
+    for channel in ws2811.channel:
+        settings = channel.strip_type.to_bytes(4, 'little', signed=True) + bytes([channel.brightness])
+        settings += channel.gamma if channel.gamma is not None else bytes(256)
+        parts.append((settings, channel.leds))
+    size = sum(len(settings) + (4 * len(leds) if leds is not None else 0) for settings, leds in parts)
+    resized = len(snapshot) != size
+    old = bytes(snapshot) if not resized else bytes(size)
+
+    changed = 0
+    any_settings = False
+    pos = 0
+    for settings, leds in parts:
+        changed_settings = resized or old[pos:pos + len(settings)] != settings
+        pos += len(settings)
+        if leds is not None:
+            if changed_settings:
+                changed += len(leds)
+            else:
+                previous = array('I', old[pos:pos + 4 * len(leds)])
+                changed += sum(1 for a, b in zip(previous, leds) if a != b)
+            pos += 4 * len(leds)
+        any_settings = any_settings or changed_settings
+
+    snapshot[:] = b''.join(settings + (leds.tobytes() if leds is not None else b'')
+                           for settings, leds in parts)
+    if any_settings and changed == 0:
+        changed = 1
+    return changed
+
+
+__all__ = [name for name in globals()
+           if name.startswith(('ws2811', 'new_', 'delete_', 'WS281', 'SK6812'))]
@@ -1,6 +1,8 @@
+import importlib
 import pytest
 import mock
 import sys
+from array import array
 
 _mock_rpi_ws281x = mock.MagicMock()
 channels = {}
@@ -14,7 +16,7 @@ def ws2811_channel_get(new_ws2811_t, ch):
 
 def ws2811_channel_t_count_set(ch, count):
     ch['count'] = count
-    ch['leds'] = [0 for _ in range(count)]
+    ch['leds'] = array('I', [0 for _ in range(count)])
 
 
 def ws2811_channel_t_count_get(ch):
@@ -29,16 +31,102 @@ def ws2811_led_get(ch, n):
     return ch['leds'][n]
 
 
+def ws2811_leds_set(ch, offset, buffer):
+    words = memoryview(buffer).cast('B').cast('I')
+    if offset + len(words) > ch['count']:
+        raise ValueError('Buffer is larger than the LED buffer')
+    ch['leds'][offset:offset + len(words)] = array('I', words)
+    return len(words)
+
+
+def ws2811_leds_get_range(ch, start, step, count):
+    return array('I', [ch['leds'][start + i * step] for i in range(count)]).tobytes()
+
+
+def ws2811_leds_set_range(ch, start, step, count, buffer):
+    words = memoryview(buffer).cast('B').cast('I')
+    if len(words) != count:
+        raise ValueError('attempt to assign {0} colors to a range of {1} LEDs'.format(len(words), count))
+    for i in range(count):
+        ch['leds'][start + i * step] = words[i]
+
+
+def ws2811_leds_fill_range(ch, start, step, count, color):
+    for i in range(count):
+        ch['leds'][start + i * step] = color
+
+
+def ws2811_leds_view(ch):
+    return memoryview(ch['leds']).cast('B')
+
+
+def ws2811_led_setter(ch):
+    def set_pixel(n, color):
+        if not isinstance(color, int):
+            color = (color[3] << 24 if len(color) > 3 else 0) | (color[0] << 16) | (color[1] << 8) | color[2]
+        ch['leds'][n] = color
+    return set_pixel
+
+
+def ws2811_led_getter(ch):
+    return ch['leds'].__getitem__
+
+
+def ws2811_leds_set_many(ch, indices, colors):
+    if isinstance(colors, int):
+        colors = [colors] * len(indices)
+    for n, color in zip(indices, colors):
+        ws2811_led_setter(ch)(n, color)
+
+
+def ws2811_channel_t_brightness_set(ch, brightness):
+    ch['brightness'] = brightness
+
+
+def ws2811_channel_t_brightness_get(ch):
+    return ch['brightness']
+
+
+def ws2811_leds_changed(new_ws2811_t, snapshot):
+    state = bytearray()
+    for ch in channels.values():
+        if ch['new_ws2811_t'] is new_ws2811_t:
+            state += bytes([ch.get('brightness', 0)]) + ch.get('leds', array('I')).tobytes()
+    if state == snapshot:
+        return 0
+    if len(state) != len(snapshot) or state[0] != snapshot[0]:
+        changed = max(len(state) // 4, 1)
+    else:
+        changed = sum(1 for i in range(1, len(state), 4) if state[i:i + 4] != snapshot[i:i + 4])
+    snapshot[:] = state
+    return changed
+
+
 _mock_rpi_ws281x.ws2811_channel_t_count_set = ws2811_channel_t_count_set
 _mock_rpi_ws281x.ws2811_channel_t_count_get = ws2811_channel_t_count_get
 _mock_rpi_ws281x.ws2811_channel_get = ws2811_channel_get
 _mock_rpi_ws281x.ws2811_led_set = ws2811_led_set
 _mock_rpi_ws281x.ws2811_led_get = ws2811_led_get
+_mock_rpi_ws281x.ws2811_leds_set = ws2811_leds_set
+_mock_rpi_ws281x.ws2811_leds_view = ws2811_leds_view
+_mock_rpi_ws281x.ws2811_leds_get_range = ws2811_leds_get_range
+_mock_rpi_ws281x.ws2811_leds_set_range = ws2811_leds_set_range
+_mock_rpi_ws281x.ws2811_leds_fill_range = ws2811_leds_fill_range
+_mock_rpi_ws281x.ws2811_channel_t_brightness_set = ws2811_channel_t_brightness_set
+_mock_rpi_ws281x.ws2811_channel_t_brightness_get = ws2811_channel_t_brightness_get
+_mock_rpi_ws281x.ws2811_leds_changed = ws2811_leds_changed
+_mock_rpi_ws281x.ws2811_led_setter = ws2811_led_setter
+_mock_rpi_ws281x.ws2811_led_getter = ws2811_led_getter
+_mock_rpi_ws281x.ws2811_leds_set_many = ws2811_leds_set_many
 
 
 @pytest.fixture(scope='function', autouse=False)
 def _rpi_ws281x():
     _mock_rpi_ws281x.ws2811_init.return_value = 0
+    _mock_rpi_ws281x.ws2811_render.return_value = 0
+    _mock_rpi_ws281x.ws2811_render_corrected.return_value = 0
+    _mock_rpi_ws281x.ws2811_wait.return_value = 0
+    _mock_rpi_ws281x.ws2811_leds_alloc.return_value = 0
     sys.modules['_rpi_ws281x'] = _mock_rpi_ws281x
 
     yield _mock_rpi_ws281x
@@ -53,3 +141,11 @@ def rpi_ws281x(_rpi_ws281x):
         sys.path.append(".")
     yield None
     del sys.modules['rpi_ws281x']
+
+
+@pytest.fixture()
+def simulator(monkeypatch):
+    from rpi_ws281x import simulator
+    monkeypatch.setattr(importlib.import_module('rpi_ws281x.rpi_ws281x'), 'ws', simulator)
+    monkeypatch.setattr(simulator, 'realtime', False)
+    yield simulator
@@ -0,0 +1,83 @@
+from array import array
+
+
+def _receive(receiver):
+    for _ in range(10):
+        if receiver.poll(1.0):
+            return True
+    return False
+
+
+def test_network_round_trip(simulator):
+    from rpi_ws281x import MultiChannelPixelStrip, NetworkMultiChannelPixelStrip, NetworkReceiver
+    config = [dict(num=600, pin=18), dict(num=600, pin=13, brightness=64)]
+    strips = MultiChannelPixelStrip(config)
+    strips.begin()
+    with NetworkReceiver(strips, '127.0.0.1', 0) as receiver:
+        remote = NetworkMultiChannelPixelStrip(config, '127.0.0.1', receiver.address[1])
+        remote.begin()
+        remote[0][:] = list(range(600))
+        remote[1][:] = list(range(600, 1200))
+        remote[1].setBrightness(32)
+        remote.show()
+        assert _receive(receiver)
+        assert strips[0][:] == array('I', range(600))
+        assert strips[1][:] == array('I', range(600, 1200))
+        assert strips[1].getBrightness() == 32
+        assert remote.stats()['packets'] == 4
+        assert strips.renders == 1
+
+        remote.show()
+        assert remote.skipped_frames == 1
+        remote._cleanup()
+    strips._cleanup()
+
+
+def test_network_mapping(simulator):
+    from rpi_ws281x import PixelStrip, NetworkPixelStrip, NetworkReceiver, reverse_mapping
+    strip = PixelStrip(4, 18)
+    strip.begin()
+    with NetworkReceiver(strip, '127.0.0.1', 0) as receiver:
+        remote = NetworkPixelStrip(4, '127.0.0.1', receiver.address[1])
+        remote.begin()
+        remote.set_mapping(reverse_mapping(4))
+        remote[:] = [1, 2, 3, 4]
+        remote.show()
+        assert _receive(receiver)
+        assert strip[:].tolist() == [4, 3, 2, 1]
+        remote._cleanup()
+    strip._cleanup()
+
+
+def test_network_drops_stale_frames(simulator):
+    from rpi_ws281x import MultiChannelPixelStrip, NetworkReceiver
+    from rpi_ws281x.network import _packets
+    strips = MultiChannelPixelStrip([dict(num=600, pin=18), dict(num=10, pin=13)])
+    strips.begin()
+    with NetworkReceiver(strips, '127.0.0.1', 0) as receiver:
+        first = _packets(1, [255, 255], [array('I', [1] * 600), array('I', [1] * 10)])
+        second = _packets(2, [255, 255], [array('I', [2] * 600), array('I', [2] * 10)])
+        assert len(first) == 3
+
+        # The sync packet alone does not complete a frame, and a newer frame
+        # abandons it
+        assert not receiver.handle(first[2])
+        assert not receiver.handle(second[0])
+        assert receiver.dropped_frames == 1
+        assert not receiver.handle(first[0])
+        assert receiver.dropped_packets == 1
+        assert not receiver.handle(second[2])
+        assert receiver.handle(second[1])
+        assert strips[0][:].tolist() == [2] * 600
+        assert strips[1][:].tolist() == [2] * 10
+
+        # Duplicates of a frame already shown are dropped too
+        assert not receiver.handle(second[1])
+        assert receiver.dropped_packets == 2
+        assert receiver.frames == 1
+
+        # A sender restarting its sequence numbers is followed
+        assert not receiver.handle(b'WN')
+        restart = _packets((2 - 1000) & 0xffffffff, [255, 255], [array('I', [3] * 600), array('I', [3] * 10)])
+        assert [receiver.handle(packet) for packet in restart] == [False, False, True]
+    strips._cleanup()
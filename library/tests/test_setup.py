@@ -1,4 +1,5 @@
 import pytest
+from array import array
 
 
 def test_setup(_rpi_ws281x):
@@ -41,7 +42,7 @@ def test_set_multiple(_rpi_ws281x):
     strip = PixelStrip(10, 20)
     strip.begin()
     strip[:] = RGBW(255, 0, 0)
-    assert strip[:] == [RGBW(255, 0, 0)] * 10
+    assert strip[:].tolist() == [RGBW(255, 0, 0)] * 10
 
 
 def test_set_odd(_rpi_ws281x):
@@ -49,4 +50,376 @@ def test_set_odd(_rpi_ws281x):
     strip = PixelStrip(10, 20)
     strip.begin()
     strip[::2] = RGBW(255, 0, 0)
-    assert strip[:] == [RGBW(255, 0, 0), RGBW(0, 0, 0)] * 5
+    assert strip[:].tolist() == [RGBW(255, 0, 0), RGBW(0, 0, 0)] * 5
+
+
+def test_set_sequence(_rpi_ws281x):
+    from array import array
+    from rpi_ws281x import PixelStrip, RGBW
+    strip = PixelStrip(10, 20)
+    strip.begin()
+    strip[::3] = [RGBW(1, 0, 0), RGBW(2, 0, 0), RGBW(3, 0, 0), RGBW(4, 0, 0)]
+    assert strip[::3] == array('I', [RGBW(1, 0, 0), RGBW(2, 0, 0), RGBW(3, 0, 0), RGBW(4, 0, 0)])
+    strip[:2] = array('I', [5, 6])
+    assert strip[1::-1].tolist() == [6, 5]
+    with pytest.raises(ValueError):
+        strip[:5] = [1, 2]
+
+
+def test_set_pixels(_rpi_ws281x):
+    from array import array
+    from rpi_ws281x import PixelStrip, RGBW
+    strip = PixelStrip(10, 20)
+    strip.begin()
+    assert strip.set_pixels(array('I', [RGBW(255, 0, 0)] * 10)) == 10
+    assert strip[:].tolist() == [RGBW(255, 0, 0)] * 10
+    assert strip.set_pixels(array('I', [RGBW(0, 0, 255)] * 2).tobytes(), offset=8) == 2
+    assert strip[8:].tolist() == [RGBW(0, 0, 255)] * 2
+    with pytest.raises(ValueError):
+        strip.set_pixels(array('I', [0] * 11))
+
+
+def test_pixel_view(_rpi_ws281x):
+    from rpi_ws281x import PixelStrip, RGBW
+    strip = PixelStrip(10, 20)
+    strip.begin()
+    view = strip.pixel_view()
+    assert len(view) == 10
+    view[3] = RGBW(0, 255, 0)
+    assert strip[3] == RGBW(0, 255, 0)
+    strip[4] = RGBW(1, 2, 3, 4)
+    assert strip.pixel_view(as_bytes=True).tolist()[4] == [3, 2, 1, 4]
+    strip._cleanup()
+    with pytest.raises(ValueError):
+        view[0]
+
+
+def test_multi_channel(_rpi_ws281x):
+    from rpi_ws281x import MultiChannelPixelStrip, RGBW
+    strips = MultiChannelPixelStrip([dict(num=10, pin=18), dict(num=5, pin=13)])
+    strip1, strip2 = strips
+    strip1.begin()
+    strip2.begin()
+    assert _rpi_ws281x.ws2811_init.call_count == 1
+    strip1[:] = RGBW(255, 0, 0)
+    strip2[:] = RGBW(0, 255, 0)
+    assert len(strip1) == 10 and len(strip2) == 5
+    assert strip1[0] == RGBW(255, 0, 0)
+    assert strip2[0] == RGBW(0, 255, 0)
+    strips.show()
+    strip2[0] = RGBW(0, 0, 255)
+    strip2.show()
+    assert _rpi_ws281x.ws2811_render.call_count == 2
+
+
+def test_show_non_blocking(_rpi_ws281x):
+    from rpi_ws281x import PixelStrip
+    strip = PixelStrip(10, 20)
+    strip.begin()
+    frames = []
+    strip.frame_ready = frames.append
+    strip.show(block=False)
+    assert _rpi_ws281x.ws2811_render.call_count == 1
+    assert _rpi_ws281x.ws2811_wait.call_count == 0
+    strip.show(block=False, force=True)
+    assert _rpi_ws281x.ws2811_wait.call_count == 1
+    assert frames == [strip]
+    strip.wait()
+    strip.wait()
+    assert _rpi_ws281x.ws2811_wait.call_count == 2
+    strip[0] = 0xff
+    strip.show()
+    assert _rpi_ws281x.ws2811_wait.call_count == 3
+    assert len(frames) == 3
+    assert strip.total_wait_time >= strip.wait_time >= 0
+
+
+def test_show_wait_fail(_rpi_ws281x):
+    from rpi_ws281x import PixelStrip
+    _rpi_ws281x.ws2811_wait.return_value = 1
+    strip = PixelStrip(10, 20)
+    strip.begin()
+    strip.show(block=False)
+    with pytest.raises(RuntimeError):
+        strip.wait()
+    strip.wait()
+
+
+def test_show_unchanged(_rpi_ws281x):
+    from rpi_ws281x import PixelStrip, RGBW
+    strip = PixelStrip(10, 20)
+    strip.begin()
+    strip.show()
+    strip.show()
+    assert _rpi_ws281x.ws2811_render.call_count == 1
+    assert strip.skipped_frames == 1
+    strip[:] = RGBW(255, 0, 0)
+    strip.show()
+    strip[:] = RGBW(255, 0, 0)
+    strip.show()
+    assert _rpi_ws281x.ws2811_render.call_count == 2
+    strip.pixel_view()[3] = RGBW(0, 255, 0)
+    strip.show()
+    strip.setBrightness(10)
+    strip.show()
+    strip.show(force=True)
+    assert _rpi_ws281x.ws2811_render.call_count == 5
+    assert strip.skipped_frames == 2
+
+
+def test_pack_rgbw(_rpi_ws281x):
+    from rpi_ws281x import Color, RGBW, pack_rgbw
+    assert pack_rgbw(1, 2, 3, 4) == RGBW(1, 2, 3, 4) == 0x04010203
+    assert type(pack_rgbw(1, 2, 3)) is int
+    assert Color(1, 2, 3) is Color(1, 2, 3)
+    assert Color(1, 2, 3, 4).w == 4
+
+
+def test_pack_rgbw_array(_rpi_ws281x):
+    from array import array
+    from rpi_ws281x import pack_rgbw, pack_rgbw_array, unpack_rgbw_array
+    words = pack_rgbw_array([1, 5], array('B', [2, 6]), [3, 7], 4)
+    assert words.tolist() == [pack_rgbw(1, 2, 3, 4), pack_rgbw(5, 6, 7, 4)]
+    assert [c.tolist() for c in unpack_rgbw_array(words)] == [[1, 5], [2, 6], [3, 7], [4, 4]]
+    with pytest.raises(TypeError):
+        pack_rgbw_array(1, 2, 3, 4)
+
+
+def test_pack_rgbw_array_numpy(_rpi_ws281x):
+    numpy = pytest.importorskip('numpy')
+    from rpi_ws281x import pack_rgbw, pack_rgbw_array, unpack_rgbw_array
+    words = pack_rgbw_array(numpy.array([1, 5], dtype=numpy.uint8), [2, 6], 3)
+    assert words.dtype == numpy.uint32
+    assert words.tolist() == [pack_rgbw(1, 2, 3), pack_rgbw(5, 6, 3)]
+    red, green, blue, white = unpack_rgbw_array(words)
+    assert red.dtype == numpy.uint8
+    assert red.tolist() == [1, 5] and blue.tolist() == [3, 3] and white.tolist() == [0, 0]
+
+
+def test_fill(_rpi_ws281x):
+    from rpi_ws281x import PixelStrip, RGBW
+    strip = PixelStrip(10, 20)
+    strip.begin()
+    strip.fill((1, 2, 3))
+    assert strip[:].tolist() == [RGBW(1, 2, 3)] * 10
+    strip.fill(RGBW(4, 5, 6, 7), 2, -2)
+    assert strip[:].tolist() == [RGBW(1, 2, 3)] * 2 + [RGBW(4, 5, 6, 7)] * 6 + [RGBW(1, 2, 3)] * 2
+    strip.fill(0, 8, 2)
+    strip.clear()
+    assert strip[:].tolist() == [0] * 10
+    strip.fill_and_show(0xff, end=1)
+    assert strip[0] == 0xff
+    assert _rpi_ws281x.ws2811_render.call_count == 1
+
+
+def test_set_many(_rpi_ws281x):
+    from rpi_ws281x import PixelStrip, RGBW
+    strip = PixelStrip(10, 20)
+    strip.begin()
+    strip.set_pixel(1, (1, 2, 3, 4))
+    assert strip.get_pixel(1) == RGBW(1, 2, 3, 4)
+    strip.set_many([0, 5], [RGBW(255, 0, 0), (0, 255, 0)])
+    strip.set_many(range(7, 10), 0xff)
+    assert strip[:].tolist() == [RGBW(255, 0, 0), RGBW(1, 2, 3, 4), 0, 0, 0, RGBW(0, 255, 0), 0, 0xff, 0xff, 0xff]
+
+
+def test_gamma(_rpi_ws281x):
+    from rpi_ws281x import PixelStrip, gamma_table, GAMMA_IDENTITY, GAMMA_2_8
+    assert GAMMA_IDENTITY == tuple(range(256))
+    assert gamma_table(-1) == GAMMA_IDENTITY
+    assert GAMMA_2_8[0] == 0 and GAMMA_2_8[128] == 37 and GAMMA_2_8[255] == 255
+    strip = PixelStrip(10, 20)
+    _rpi_ws281x.ws2811_channel_t_gamma_set.assert_called_with(strip._channel, GAMMA_IDENTITY)
+    strip.set_custom_gamma_factor(2.8)
+    _rpi_ws281x.ws2811_channel_t_gamma_set.assert_called_with(strip._channel, GAMMA_2_8)
+
+
+def test_color_correction(_rpi_ws281x):
+    from rpi_ws281x import PixelStrip, ColorCorrection, GAMMA_2_8
+    correction = ColorCorrection(gamma=2.8, balance=(255, 128, 0), white='replace')
+    assert correction.tables[:256] == bytes(GAMMA_2_8)
+    assert correction.tables[256 + 255] == GAMMA_2_8[128]
+    assert correction.tables[512:768] == bytes(256)
+    assert correction.tables[768:] == bytes(GAMMA_2_8)
+    with pytest.raises(ValueError):
+        ColorCorrection(white='rgbw')
+
+    strip = PixelStrip(10, 20)
+    strip.begin()
+    strip.show()
+    strip.set_color_correction(correction)
+    strip.show()
+    assert strip.skipped_frames == 0
+    corrections = _rpi_ws281x.ws2811_render_corrected.call_args[0][1]
+    assert corrections[0][:2] == (correction.tables, 2)
+    assert corrections[1] is None
+    strip.set_color_correction(None)
+    strip.show()
+    assert _rpi_ws281x.ws2811_render.call_count == 2
+    assert _rpi_ws281x.ws2811_render_corrected.call_count == 1
+
+
+def test_segment(_rpi_ws281x):
+    from rpi_ws281x import PixelStrip
+    strip = PixelStrip(10, 20)
+    strip.begin()
+    forward = strip.segment(2, 6)
+    backward = strip.segment(6, None, reverse=True)
+    assert len(forward) == 4 and len(backward) == 4
+    forward[0] = 1
+    forward[-1] = 2
+    backward[0] = 3
+    backward[1:3] = [4, 5]
+    assert list(strip[:]) == [0, 0, 1, 0, 0, 2, 0, 5, 4, 3]
+    assert list(backward[:]) == [3, 4, 5, 0]
+    with pytest.raises(IndexError):
+        forward[4] = 1
+
+    assert backward.set_pixels(array('I', [6, 7]), 2) == 2
+    assert list(strip[6:]) == [7, 6, 4, 3]
+    with pytest.raises(ValueError):
+        forward.set_pixels(array('I', [0] * 5))
+    forward.fill(8)
+    backward.set_many([0, 3], 9)
+    assert list(strip[:]) == [0, 0, 8, 8, 8, 8, 9, 6, 4, 9]
+
+    inner = backward.segment(1, 3, reverse=True)
+    assert list(inner[:]) == [6, 4]
+    assert list(inner.pixel_view()) == [6, 4]
+    inner.clear()
+    assert list(backward[:]) == [9, 0, 0, 9]
+
+
+def test_mapping(_rpi_ws281x):
+    from rpi_ws281x import PixelStrip, reverse_mapping, mirror_mapping, serpentine_mapping, skip_mapping
+    assert list(reverse_mapping(4)) == [3, 2, 1, 0]
+    assert list(mirror_mapping(5)) == [0, 1, 2, 1, 0]
+    assert list(serpentine_mapping(3, 2)) == [0, 1, 2, 5, 4, 3]
+    assert list(skip_mapping(5, [1, 3])) == [0, -1, 1, -1, 2]
+
+    strip = PixelStrip(4, 20)
+    strip.begin()
+    with pytest.raises(ValueError):
+        strip.set_mapping([0, 1])
+    with pytest.raises(IndexError):
+        strip.set_mapping([0, 1, 2, 4])
+    strip.set_mapping(reverse_mapping(4))
+    strip.show()
+    corrections = _rpi_ws281x.ws2811_render_corrected.call_args[0][1]
+    assert corrections[0][:3] == (None, 0, array('i', [3, 2, 1, 0]))
+    strip.set_mapping(None)
+    strip.show()
+    assert _rpi_ws281x.ws2811_render.call_count == 1
+
+
+def test_ramp_brightness(_rpi_ws281x, monkeypatch):
+    from rpi_ws281x import PixelStrip
+    now = [100.0]
+    monkeypatch.setattr('time.monotonic', lambda: now[0])
+    strip = PixelStrip(10, 20, brightness=200)
+    strip.begin()
+    with pytest.raises(ValueError):
+        strip.ramp_brightness(0, 1.0, 'bounce')
+    strip.ramp_brightness(0, 2.0)
+    assert strip.ramping
+    now[0] += 0.5
+    strip.show()
+    assert strip.getBrightness() == 150
+    now[0] += 1.0
+    strip.show()
+    assert strip.getBrightness() == 50
+    assert _rpi_ws281x.ws2811_render.call_count == 2
+    now[0] += 1.0
+    strip.show()
+    assert strip.getBrightness() == 0
+    assert not strip.ramping
+
+    strip.ramp_brightness(255, 1.0, 'ease')
+    strip.setBrightness(10)
+    strip.show()
+    assert strip.getBrightness() == 10
+    assert not strip.ramping
+
+
+def test_stats(_rpi_ws281x):
+    from rpi_ws281x import PixelStrip, MultiChannelPixelStrip, RENDER_HISTOGRAM_EDGES
+    strip = PixelStrip(10, 20)
+    strip.begin()
+    strip.show()
+    strip[2:5] = 1
+    strip.show()
+    strip.show()
+    strip.show(force=True)
+    stats = strip.stats()
+    assert stats['shows'] == 4
+    assert stats['renders'] == 3
+    assert stats['skipped_frames'] == 1
+    assert stats['forced_frames'] == 1
+    assert stats['changed_pixels'] == 0
+    assert stats['total_changed_pixels'] == 10 + 3
+    assert sum(stats['render_histogram']) == 3
+    assert len(stats['render_histogram']) == len(RENDER_HISTOGRAM_EDGES) + 1
+    assert stats['library_calls'] == 4 + 3 + 3
+    strip.reset_stats()
+    assert strip.stats()['shows'] == 0
+
+    strips = MultiChannelPixelStrip([dict(num=10, pin=18)])
+    strips[0].show()
+    assert strips[0].stats()['renders'] == strips.stats()['renders'] == 1
+
+
+@pytest.mark.parametrize('compress,delta', [(True, True), (False, False)])
+def test_recording(_rpi_ws281x, tmp_path, compress, delta):
+    from rpi_ws281x import PixelStrip, read_frames
+    path = str(tmp_path / 'show.rec')
+    strip = PixelStrip(10, 20, brightness=100)
+    strip.begin()
+    recorder = strip.start_recording(path, compress, delta)
+    strip[0] = 0x112233
+    strip.show()
+    strip.show()
+    strip[9] = 0xff000000
+    strip.show()
+    strip.stop_recording()
+    strip[1] = 1
+    strip.show()
+    assert recorder.frames == 2
+
+    frames = list(read_frames(path))
+    assert len(frames) == 2
+    assert frames[0][0] <= frames[1][0]
+    assert frames[0][1] == (100,)
+    assert list(frames[0][2][0]) == [0x112233] + [0] * 9
+    assert list(frames[1][2][0]) == [0x112233] + [0] * 8 + [0xff000000]
+
+
+def test_async_strip(_rpi_ws281x):
+    import asyncio
+    import threading
+    from rpi_ws281x import MultiChannelPixelStrip, AsyncPixelStrip
+    strips = MultiChannelPixelStrip([dict(num=10, pin=18), dict(num=10, pin=13)])
+    strip1, strip2 = (AsyncPixelStrip(strip) for strip in strips)
+    threads = []
+    strips.frame_ready = lambda controller: threads.append(threading.current_thread())
+
+    async def effect(strip, color):
+        for n in range(len(strip)):
+            strip[n] = color
+            await strip.show(block=False)
+
+    async def main():
+        await strip1.begin()
+        await asyncio.gather(effect(strip1, 0xff0000), effect(strip2, 0x00ff00))
+        await strip1.wait()
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(main())
+    finally:
+        loop.close()
+    assert strips[0][:].tolist() == [0xff0000] * 10
+    assert strip2[:].tolist() == [0x00ff00] * 10
+    assert _rpi_ws281x.ws2811_render.call_count == strips.renders
+    assert _rpi_ws281x.ws2811_wait.call_count == strips.renders
+    assert threading.current_thread() not in threads
+    assert not strips._pending
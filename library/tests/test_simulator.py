@@ -0,0 +1,126 @@
+from array import array
+import pytest
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_simulator_render(simulator, monkeypatch, use_numpy):
+    from rpi_ws281x import PixelStrip, RGBW
+    if not use_numpy:
+        monkeypatch.setattr(simulator, 'numpy', None)
+    strip = PixelStrip(3, 18, brightness=127, strip_type=simulator.WS2811_STRIP_GRB)
+    strip.begin()
+    strip[0] = RGBW(255, 0, 0)
+    strip[1] = RGBW(0, 128, 0)
+    strip[2] = RGBW(0, 0, 64, 255)
+    strip.show()
+    channel = strip._channel
+    assert channel.output == bytes([0, 127, 0, 64, 0, 0, 0, 0, 32])
+    strip._cleanup()
+
+
+def test_simulator_wire_time(simulator):
+    from rpi_ws281x import PixelStrip, Color
+    strip = PixelStrip(600, 18, strip_type=simulator.SK6812_STRIP_GRBW)
+    strip.begin()
+    strip[:] = Color(1, 2, 3, 4)
+    strip.show(block=False)
+    assert strip._leds.wire_time == pytest.approx(0.024)
+    assert strip._leds.render_wait_time == 24300
+    strip._cleanup()
+
+
+def test_simulator_illegal_gpio(simulator):
+    from rpi_ws281x import PixelStrip
+    strip = PixelStrip(10, 20)
+    with pytest.raises(RuntimeError, match='Selected GPIO not possible'):
+        strip.begin()
+
+
+def test_simulator_slices(simulator):
+    from rpi_ws281x import PixelStrip
+    strip = PixelStrip(10, 18)
+    strip.begin()
+    strip[:] = list(range(10))
+    assert strip[::-1].tolist() == list(range(9, -1, -1))
+    strip[8::-3] = 0
+    assert strip[:].tolist() == [0, 1, 0, 3, 4, 0, 6, 7, 0, 9]
+    strip._cleanup()
+
+
+def test_simulator_skips_unchanged(simulator):
+    from rpi_ws281x import PixelStrip
+    strip = PixelStrip(10, 18)
+    strip.begin()
+    strip.show()
+    strip.show()
+    strip.setGamma(list(range(255, -1, -1)))
+    strip.show()
+    assert strip._leds.frames == 2
+    assert strip.skipped_frames == 1
+    strip._cleanup()
+
+
+def test_simulator_set_pixel(simulator):
+    from rpi_ws281x import PixelStrip, RGBW
+    strip = PixelStrip(10, 18)
+    with pytest.raises(RuntimeError):
+        strip.set_pixel(0, 0)
+    strip.begin()
+    strip.set_pixel(-1, (1, 2, 3))
+    strip[0] = RGBW(4, 5, 6, 7)
+    assert strip.get_pixel(9) == RGBW(1, 2, 3)
+    assert strip.getPixelColorRGBW(0).w == 7
+    with pytest.raises(IndexError):
+        strip.set_pixel(10, 0)
+    with pytest.raises(ValueError):
+        strip.set_pixel(0, (256, 0, 0))
+    with pytest.raises(ValueError):
+        strip.set_many([1, 2], [0])
+    strip.set_many([1, 2], [(1, 1, 1), 5])
+    assert strip[1:3].tolist() == [RGBW(1, 1, 1), 5]
+    strip._cleanup()
+
+
+def test_simulator_gamma(simulator):
+    from rpi_ws281x import PixelStrip, gamma_table
+    strip = PixelStrip(10, 18)
+    strip.begin()
+    strip.set_custom_gamma_factor(2.2)
+    gamma = simulator.ws2811_channel_t_gamma_get(strip._channel)
+    simulator.ws2811_set_custom_gamma_factor(strip._leds, 2.2)
+    assert simulator.ws2811_channel_t_gamma_get(strip._channel) == gamma == list(gamma_table(2.2))
+    strip._cleanup()
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_simulator_color_correction(simulator, monkeypatch, use_numpy):
+    from rpi_ws281x import PixelStrip, ColorCorrection, RGBW
+    if not use_numpy:
+        monkeypatch.setattr(simulator, 'numpy', None)
+    strip = PixelStrip(2, 18, strip_type=simulator.SK6812_STRIP_RGBW)
+    strip.begin()
+    strip.set_color_correction(ColorCorrection(balance=(255, 128, 255), white='replace'))
+    strip[0] = RGBW(255, 128, 64)
+    strip[1] = RGBW(0, 0, 200, 10)
+    strip.show()
+    assert strip._channel.output == bytes([191, 32, 0, 64, 0, 0, 200, 10])
+    assert strip[:] == array('I', [RGBW(255, 128, 64), RGBW(0, 0, 200, 10)])
+    strip._cleanup()
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_simulator_mapping(simulator, monkeypatch, use_numpy):
+    from rpi_ws281x import PixelStrip, ColorCorrection, mirror_mapping
+    if not use_numpy:
+        monkeypatch.setattr(simulator, 'numpy', None)
+    strip = PixelStrip(5, 18, strip_type=simulator.WS2811_STRIP_RGB)
+    strip.begin()
+    strip[:] = [0x010203, 0x040506, 0x070809, 0xffffff, 0xffffff]
+    strip.set_mapping([0, 1, 2, 1, -1])
+    strip.show()
+    assert strip._channel.output == bytes([1, 2, 3, 4, 5, 6, 7, 8, 9, 4, 5, 6, 0, 0, 0])
+    strip.set_mapping(mirror_mapping(5))
+    strip.set_color_correction(ColorCorrection(balance=(0, 255, 255)))
+    strip.show()
+    assert strip._channel.output == bytes([0, 2, 3, 0, 5, 6, 0, 8, 9, 0, 5, 6, 0, 2, 3])
+    strip._cleanup()
@@ -6,7 +6,7 @@
 import time
 import random
 
-from rpi_ws281x import ws, Color, Adafruit_NeoPixel
+from rpi_ws281x import ws, Color, MultiChannelPixelStrip
 
 # LED strip configuration:
 LED_1_COUNT = 600       # Number of LED pixels.
@@ -37,17 +37,18 @@ from rpi_ws281x import Color
 # Main program logic follows:
 if __name__ == '__main__':
     # Create NeoPixel objects with appropriate configuration for each strip.
-    strip1 = Adafruit_NeoPixel(LED_1_COUNT, LED_1_PIN, LED_1_FREQ_HZ,
-                               LED_1_DMA, LED_1_INVERT, LED_1_BRIGHTNESS,
-                               LED_1_CHANNEL, LED_1_STRIP)
-
-    strip2 = Adafruit_NeoPixel(LED_2_COUNT, LED_2_PIN, LED_2_FREQ_HZ,
-                               LED_2_DMA, LED_2_INVERT, LED_2_BRIGHTNESS,
-                               LED_2_CHANNEL, LED_2_STRIP)
+    # Both strips are driven from one controller, one PWM channel each, so
+    # a single render clocks out both (LED_1_FREQ_HZ and LED_1_DMA apply to both).
+    strips = MultiChannelPixelStrip([
+        dict(num=LED_1_COUNT, pin=LED_1_PIN, invert=LED_1_INVERT,
+             brightness=LED_1_BRIGHTNESS, strip_type=LED_1_STRIP),
+        dict(num=LED_2_COUNT, pin=LED_2_PIN, invert=LED_2_INVERT,
+             brightness=LED_2_BRIGHTNESS, strip_type=LED_2_STRIP),
+    ], freq_hz=LED_1_FREQ_HZ, dma=LED_1_DMA)
+    strip1, strip2 = strips
 
     # Intialize the library (must be called once before other functions).
-    strip1.begin()
-    strip2.begin()
+    strips.begin()
 
     print('Press Ctrl-C to quit.')
 